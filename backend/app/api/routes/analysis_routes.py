@@ -2,6 +2,8 @@
 
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from ...services.speech_analyzer import SpeechAnalyzer
+from ...services.upload_spool import UploadSpool, UploadTooLarge
+from ...core.config import get_settings
 import logging
 import tempfile
 import os
@@ -13,32 +15,41 @@ router = APIRouter(
     tags=["analysis"]
 )
 
+settings = get_settings()
+
 analyzer = SpeechAnalyzer()
 
+# Uploads are streamed to disk here and deleted once analysed
+upload_spool = UploadSpool(
+    settings.UPLOAD_SPOOL_DIR or os.path.join(tempfile.gettempdir(), "intreview", "uploads"),
+    settings.UPLOAD_MAX_BYTES,
+    settings.UPLOAD_CHUNK_BYTES,
+    settings.UPLOAD_STALE_SECONDS
+)
+
 @router.post("/speech")  # -> final path is "/analysis/speech"
 async def analyze_speech(audio: UploadFile = File(...)):
     """Analyze speech from uploaded audio file"""
     logger.info(f"Received audio file for analysis: {audio.filename}")
 
     try:
-        # Read the audio file content
-        audio_content = await audio.read()
-        if not audio_content:
-            raise HTTPException(status_code=400, detail="Empty audio file")
-
-        # Save to temporary file and analyze
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-            temp_audio.write(audio_content)
-            temp_audio.flush()
+        # Stream the upload to the spool; the file is removed on the way out
+        async with upload_spool.spool(audio, suffix='.wav') as spooled:
+            if spooled.size == 0:
+                raise HTTPException(status_code=400, detail="Empty audio file")
 
-            logger.info(f"Analyzing speech from temporary file: {temp_audio.name}")
-            results = await analyzer.analyze_speech(temp_audio.name)
+            logger.info(f"Analyzing speech from spooled file: {spooled.path} ({spooled.size} bytes)")
+            results = await analyzer.analyze_speech(spooled.path, spooled.sha256)
 
             if not results:
                 raise HTTPException(status_code=500, detail="Speech analysis failed")
 
             return results
 
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Speech analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -5,12 +5,10 @@ from bson import ObjectId
 from app.db.models.user_models import UserCreate, User, Token
 from app.services.auth_service import AuthService
 from app.core.config import get_settings
-from motor.motor_asyncio import AsyncIOMotorClient
+from app.db.database import database
 
 settings = get_settings()
-client = AsyncIOMotorClient(settings.MONGODB_URL)
-db = client[settings.DATABASE_NAME]
-auth_service = AuthService(db)
+auth_service = AuthService(database.db)
 
 router = APIRouter()
 
@@ -41,7 +39,8 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
             headers={"WWW-Authenticate": "Bearer"},
         )
     access_token = auth_service.create_access_token(
-        data={"sub": user.email}
+        data={"sub": user.email},
+        user=user
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
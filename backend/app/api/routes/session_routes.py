@@ -1,17 +1,20 @@
-from fastapi import APIRouter, WebSocket, HTTPException, Depends, UploadFile, File, Response
-from typing import Dict, List
+from fastapi import APIRouter, WebSocket, HTTPException, Depends, UploadFile, File, Response, Request, Query
+from fastapi.responses import StreamingResponse, JSONResponse
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Optional
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from bson import ObjectId
-import base64
 
-from app.services.websocket_handler import handle_websocket, analysis_manager  # Add analysis_manager import
-from app.services.recording_storage import RecordingStorage
-from app.db.models.analysis_models import AnalysisStorage
-from app.services.auth_service import AuthService
+from app.services.websocket_handler import handle_websocket, session_registry, recording_storage
+from app.db.database import database
+from app.db.models.analysis_models import AnalysisStorage, InterviewAnalysis
 from app.db.models.user_models import User
 from app.core.config import get_settings
+from app.utils.http_range import parse_range, RangeNotSatisfiable
+from app.utils.pagination import encode_cursor, decode_cursor, InvalidCursor
 from ..routes.analysis_routes import analyze_speech
+from ..routes.auth_routes import auth_service
 import tempfile
 import logging
 
@@ -21,10 +24,9 @@ settings = get_settings()
 
 router = APIRouter()
 
-# Initialize services
-recording_storage = RecordingStorage(settings.MONGODB_URL, settings.DATABASE_NAME)
-analysis_storage = AnalysisStorage(recording_storage.db)
-auth_service = AuthService(recording_storage.db)
+# Initialize services (recording_storage is shared with the WebSocket
+# handler, auth_service with the auth routes so they share its caches)
+analysis_storage = AnalysisStorage(database.db)
 
 # In-memory storage for active sessions
 active_sessions: Dict[str, Dict] = {}
@@ -32,11 +34,15 @@ active_sessions: Dict[str, Dict] = {}
 # --- Non-authenticated endpoints --- #
 
 @router.websocket("/ws/video")
-async def websocket_video_endpoint(websocket: WebSocket):
+async def websocket_video_endpoint(
+    websocket: WebSocket,
+    session_id: Optional[str] = None,
+    profile: Optional[str] = None
+):
     """WebSocket endpoint for real-time video processing - No auth required"""
     logger.info("WebSocket connection initiated")
     try:
-        await handle_websocket(websocket)
+        await handle_websocket(websocket, session_id, profile)
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
 
@@ -73,9 +79,21 @@ async def start_session(current_user: User = Depends(auth_service.get_current_us
 @router.get("/sessions/{session_id}/analysis")
 async def get_session_analysis(
     session_id: str,
-    current_user: User = Depends(auth_service.get_current_user)
+    fields: Optional[str] = None,
+    current_user: User = Depends(auth_service.get_current_user_claims)
 ):
-    """Get analysis results for a specific session"""
+    """Get analysis results for a specific session. `fields` optionally
+    limits the response to a comma-separated list of (dotted) fields, such
+    as overall_metrics,speech_analysis.words_per_minute"""
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    if field_list is not None:
+        unknown = [field for field in field_list if field.split(".")[0] not in InterviewAnalysis.model_fields]
+        if unknown or not field_list:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown analysis fields: {', '.join(unknown) or fields}"
+            )
+
     try:
         # Check if session belongs to user
         session = await recording_storage.db.recordings.find_one({
@@ -89,34 +107,61 @@ async def get_session_analysis(
                 detail="Session not found or access denied"
             )
         
-        # Get all analyses for the session
-        analyses = await analysis_storage.get_session_analyses(session_id)
+        # Only the most recent analysis is read
+        if field_list is None:
+            latest_analysis = await analysis_storage.get_latest_analysis(session_id)
+            analysis = latest_analysis.dict() if latest_analysis else None
+        else:
+            analysis = await analysis_storage.get_latest_analysis_fields(session_id, field_list)
         
-        if not analyses:
+        if not analysis:
             raise HTTPException(
                 status_code=404,
                 detail="No analysis found for this session"
             )
         
-        # Return the most recent analysis
-        latest_analysis = max(analyses, key=lambda x: x.timestamp)
-        
         return {
             "session_id": session_id,
-            "analysis": latest_analysis.dict(),
-            "timestamp": latest_analysis.timestamp
+            "analysis": analysis,
+            "timestamp": analysis["timestamp"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving analysis: {str(e)}"
         )
 
+@router.get("/sessions/{session_id}/live")
+async def get_live_session_metrics(
+    session_id: str,
+    current_user: User = Depends(auth_service.get_current_user_claims)
+):
+    """Scores so far for a session that is still being recorded"""
+    session = await recording_storage.db.recordings.find_one({
+        "session_id": session_id,
+        "user_id": current_user.id
+    })
+    if not session:
+        raise HTTPException(
+            status_code=404,
+            detail="Session not found or access denied"
+        )
+
+    analysis_manager = session_registry.get(session_id)
+    if not analysis_manager:
+        raise HTTPException(
+            status_code=404,
+            detail="Session is not live"
+        )
+    return await analysis_manager.get_session_snapshot()
+
 @router.get("/sessions/{session_id}/recording")
 async def get_session_recording(
     session_id: str,
-    current_user: User = Depends(auth_service.get_current_user)
+    current_user: User = Depends(auth_service.get_current_user_claims)
 ):
     """Get recording data for a specific session"""
     try:
@@ -134,11 +179,8 @@ async def get_session_recording(
             
         recording_id = str(recording["_id"])
         
-        # Get chunks for preview/playback
-        video_chunks = await recording_storage.get_recording_chunks(recording_id, "video")
-        
-        # Return every 10th frame for preview
-        preview_frames = video_chunks[::10]
+        # Thumbnails were built when the session ended: one small read
+        preview = await recording_storage.get_preview_index(session_id)
         
         return {
             "session_id": session_id,
@@ -146,71 +188,128 @@ async def get_session_recording(
             "duration": recording.get("duration", 0),
             "start_time": recording.get("start_time"),
             "end_time": recording.get("end_time"),
-            "frame_count": len(video_chunks),
-            "preview_frames": preview_frames[:10]  # First 10 sampled frames
+            "frame_count": preview["frame_count"] if preview else 0,
+            "preview": _preview_index_response(session_id, preview) if preview else None,
+            "recording_status": "finalizing" if session_registry.is_finalizing(session_id) else "ready"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving recording: {str(e)}"
         )
 
+@router.get("/sessions/{session_id}/preview")
+async def get_session_preview(
+    session_id: str,
+    request: Request,
+    current_user: User = Depends(auth_service.get_current_user_claims)
+):
+    """
+    Thumbnail index of a recording: thumbnail i is the tile at row
+    i // columns, column i % columns of the sprite, and shows `offsets[i]`
+    seconds into the session
+    """
+    await _check_recording_owner(session_id, current_user)
+    preview = await recording_storage.get_preview_index(session_id)
+    if not preview:
+        raise HTTPException(status_code=404, detail="Preview not found")
+
+    headers = _preview_cache_headers(preview)
+    if _not_modified(request, headers["ETag"], preview["created_at"].replace(tzinfo=timezone.utc)):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(_preview_index_response(session_id, preview), headers=headers)
+
+@router.get("/sessions/{session_id}/preview/sprite.jpg")
+async def get_session_preview_sprite(
+    session_id: str,
+    request: Request,
+    current_user: User = Depends(auth_service.get_current_user_claims)
+):
+    """Thumbnail sprite image of a recording"""
+    await _check_recording_owner(session_id, current_user)
+    preview = await recording_storage.get_preview_sprite(session_id)
+    if not preview:
+        raise HTTPException(status_code=404, detail="Preview not found")
+
+    headers = _preview_cache_headers(preview)
+    if _not_modified(request, headers["ETag"], preview["created_at"].replace(tzinfo=timezone.utc)):
+        return Response(status_code=304, headers=headers)
+    return Response(content=preview["sprite"], media_type="image/jpeg", headers=headers)
+
+async def _check_recording_owner(session_id: str, current_user: User):
+    recording = await recording_storage.db.recordings.find_one(
+        {"session_id": session_id, "user_id": current_user.id},
+        {"_id": 1}
+    )
+    if not recording:
+        raise HTTPException(status_code=404, detail="Recording not found or access denied")
+
+def _preview_cache_headers(preview: Dict) -> Dict[str, str]:
+    # Previews are written once per session, so the document id identifies the content
+    created = preview["created_at"].replace(tzinfo=timezone.utc)
+    return {
+        "ETag": f'"{preview["_id"]}-{int(created.timestamp())}"',
+        "Last-Modified": formatdate(created.timestamp(), usegmt=True),
+        "Cache-Control": "private, max-age=86400"
+    }
+
+def _preview_index_response(session_id: str, preview: Dict) -> Dict:
+    return {
+        "sprite_url": f"/api/sessions/{session_id}/preview/sprite.jpg",
+        "interval": preview["interval"],
+        "thumb_width": preview["thumb_width"],
+        "thumb_height": preview["thumb_height"],
+        "columns": preview["columns"],
+        "count": preview["count"],
+        "offsets": preview["offsets"],
+        "frame_count": preview["frame_count"]
+    }
+
 @router.get("/sessions/history")
 async def get_session_history(
-    skip: int = 0,
-    limit: int = 10,
-    current_user: User = Depends(auth_service.get_current_user)
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(auth_service.get_current_user_claims)
 ):
-    """Get session history for current user"""
+    """Get session history for current user, newest first. Pass the
+    returned next_cursor to get the following page"""
     try:
-        # Get all sessions for the user
-        sessions = await recording_storage.db.recordings.find({
-            "user_id": current_user.id
-        }).sort("start_time", -1).skip(skip).limit(limit).to_list(length=limit)
-        
-        if not sessions:
-            return {
-                "sessions": [],
-                "total": 0,
-                "page": 1,
-                "pages": 0
-            }
-        
-        # Get analysis results for each session
+        before = decode_cursor(cursor) if cursor else None
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    try:
+        # One extra row tells whether another page follows
+        sessions = await recording_storage.get_session_history(current_user.id, limit + 1, before)
+        has_more = len(sessions) > limit
+        sessions = sessions[:limit]
+
         session_data = []
         for session in sessions:
-            session_id = session["session_id"]
-            
-            # Get latest analysis for the session
-            analyses = await analysis_storage.get_session_analyses(session_id)
-            latest_analysis = max(analyses, key=lambda x: x.timestamp) if analyses else None
-            
+            latest_analysis = session.get("latest_analysis")
             session_data.append({
-                "session_id": session_id,
+                "session_id": session["session_id"],
                 "start_time": session["start_time"],
                 "end_time": session.get("end_time"),
                 "duration": session.get("duration", 0),
                 "status": session.get("status", "unknown"),
                 "has_analysis": latest_analysis is not None,
                 "analysis_summary": {
-                    "overall_metrics": latest_analysis.overall_metrics if latest_analysis else None,
-                    "timestamp": latest_analysis.timestamp if latest_analysis else None
+                    "overall_metrics": latest_analysis.get("overall_metrics"),
+                    "timestamp": latest_analysis.get("timestamp")
                 } if latest_analysis else None
             })
-        
-        # Get total count for pagination
-        total_sessions = await recording_storage.db.recordings.count_documents({
-            "user_id": current_user.id
-        })
-        
+
+        last = sessions[-1] if sessions else None
         return {
             "sessions": session_data,
-            "total": total_sessions,
-            "page": skip // limit + 1,
-            "pages": (total_sessions + limit - 1) // limit
+            "limit": limit,
+            "next_cursor": encode_cursor(last["start_time"], last["_id"]) if has_more else None
         }
-        
+
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -239,7 +338,7 @@ async def end_session(
         
         # Get video analysis summary and log it
         logger.info("Fetching video analysis summary...")
-        summary = await analysis_manager.get_session_summary()
+        summary = await session_registry.get_session_summary(session_id)
         video_metrics = summary["video_metrics"]
         logger.info(f"Raw video metrics: {video_metrics}")
 
@@ -275,10 +374,9 @@ async def end_session(
             logger.warning(f"Error creating key moments: {e}")
             key_moments = []
 
-        # Store the recording frames from the WebSocket session
-        video_data = await analysis_manager.get_recorded_frames()
-        for idx, frame in enumerate(video_data):
-            await recording_storage.store_frame(session_id, frame, idx / 30.0)
+        # Frames were written during the session; the last batch, the video
+        # and the preview are finished in the background (see recording_status)
+        finalizing = session_registry.finalize(session_id)
 
         # Generate key moments from filler words and transcript
         key_moments = []
@@ -313,11 +411,14 @@ async def end_session(
 
         response_data = {
             "message": "Session ended successfully",
-            "analysis": combined_results
+            "analysis": combined_results,
+            "recording_status": "finalizing" if finalizing else "ready"
         }
         logger.info(f"Sending response: {response_data}")
         return response_data
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in end_session: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -326,8 +427,16 @@ async def end_session(
         )
 
 @router.get("/sessions/{session_id}/video")
-async def get_session_video(session_id: str, current_user: User = Depends(auth_service.get_current_user)):
-    """Get the session video recording"""
+async def get_session_video(
+    session_id: str,
+    request: Request,
+    current_user: User = Depends(auth_service.get_current_user_claims)
+):
+    """
+    Stream the session video recording. Supports single byte ranges (206),
+    conditional requests (ETag / Last-Modified) and reads the file from
+    storage block by block.
+    """
     try:
         # Verify ownership
         recording = await recording_storage.db.recordings.find_one({
@@ -338,20 +447,69 @@ async def get_session_video(session_id: str, current_user: User = Depends(auth_s
         if not recording:
             raise HTTPException(status_code=404, detail="Recording not found")
         
-        # Get video data
-        video_data = await recording_storage.get_session_video(session_id)
-        if not video_data:
+        video = await recording_storage.open_session_video(session_id)
+        if video is None:
             raise HTTPException(status_code=404, detail="Video data not found")
-        
-        # Return as streaming response
-        return Response(
-            content=video_data,
-            media_type="video/webm",
-            headers={
-                "Content-Disposition": f"inline; filename={session_id}.webm",
-                "Cache-Control": "max-age=3600"
-            }
+
+        uploaded = video.upload_date.replace(tzinfo=timezone.utc)
+        etag = f'"{video._id}-{video.length}"'
+        metadata = video.metadata or {}
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(uploaded.timestamp(), usegmt=True),
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "private, max-age=3600",
+            "Content-Disposition": f"inline; filename={video.filename}"
+        }
+
+        if _not_modified(request, etag, uploaded):
+            return Response(status_code=304, headers=headers)
+
+        # A stale If-Range validator means the client's partial copy is outdated
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if if_range and if_range != etag:
+            range_header = None
+
+        try:
+            byte_range = parse_range(range_header, video.length)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=416,
+                headers={**headers, "Content-Range": f"bytes */{video.length}"}
+            )
+
+        status_code = 200
+        start, end = 0, video.length - 1
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{video.length}"
+        headers["Content-Length"] = str(end - start + 1)
+
+        return StreamingResponse(
+            recording_storage.iter_video_range(video, start, end),
+            status_code=status_code,
+            media_type=metadata.get("content_type", "video/webm"),
+            headers=headers
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting video: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """Whether the client's cached copy is still current"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
\ No newline at end of file
@@ -8,8 +8,109 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "your-secret-key"  # Change this in production
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Decoded tokens and user records are cached per process for up to the
+    # TTL. Read-only endpoints trust the user profile signed into the token
+    # when enabled; the API has no path that changes or deactivates users,
+    # so a user deactivated in the database then keeps read access until
+    # their token expires (ACCESS_TOKEN_EXPIRE_MINUTES)
+    AUTH_CACHE_SIZE: int = 1024
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+
+    # bcrypt cost factor for new password hashes (existing hashes keep
+    # theirs) and how many hashes may run at once
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_CONCURRENCY: int = 2
     ASSEMBLY_AI_API_KEY: str
 
+    # AssemblyAI transcription jobs: at most this many run at once per
+    # process; each HTTP request and each whole job has a timeout
+    TRANSCRIPTION_CONCURRENCY: int = 4
+    TRANSCRIPTION_REQUEST_TIMEOUT_SECONDS: float = 30
+    TRANSCRIPTION_UPLOAD_TIMEOUT_SECONDS: float = 300
+    TRANSCRIPTION_POLL_INTERVAL_SECONDS: float = 3
+    TRANSCRIPTION_JOB_TIMEOUT_SECONDS: float = 900
+
+    # Finished transcripts cached on disk by audio content + options (empty
+    # dir: a folder in the system temp dir; 0 bytes disables the cache)
+    TRANSCRIPT_CACHE_DIR: str = ""
+    TRANSCRIPT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Uploaded audio is streamed to this directory in chunks (empty: a
+    # folder in the system temp dir) and rejected past the size cap. Files
+    # older than the stale age are left over from a crashed process and are
+    # removed at startup; keep it above the transcription job timeout, since
+    # workers share the directory
+    UPLOAD_SPOOL_DIR: str = ""
+    UPLOAD_MAX_BYTES: int = 200 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    UPLOAD_STALE_SECONDS: float = 3600
+
+    # MongoDB client shared by the whole process (app/db/database.py).
+    # Compressors are tried in order; zstd and snappy need the zstandard /
+    # python-snappy packages. A socket timeout of 0 means none
+    MONGODB_MAX_POOL_SIZE: int = 50
+    MONGODB_MIN_POOL_SIZE: int = 5
+    MONGODB_CONNECT_TIMEOUT_MS: int = 5000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGODB_SOCKET_TIMEOUT_MS: int = 0
+    MONGODB_COMPRESSORS: str = "zlib"
+
+    # MongoDB indexes for the hot queries (app/db/indexes.py) are created at
+    # startup; the plan check explains each query and logs collection scans
+    MONGODB_ENSURE_INDEXES: bool = True
+    MONGODB_CHECK_QUERY_PLANS: bool = False
+
+    # Live analysis sessions
+    VIDEO_PROCESSOR_POOL_SIZE: int = 4
+    SESSION_IDLE_TIMEOUT_SECONDS: int = 300
+    SESSION_REAP_INTERVAL_SECONDS: int = 30
+    MAX_RECORDED_FRAMES: int = 18000  # 30 minutes at 10 FPS
+    SUMMARY_WINDOW_FRAMES: int = 300  # Recent-window stats in live snapshots
+
+    # FaceMesh inference worker processes (0 runs inference in-process)
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_THREADS_PER_WORKER: int = 1
+    INFERENCE_PREWARM_PER_WORKER: int = 2
+
+    # Analysis profile for sessions that don't request one: "fast", "balanced"
+    # or "accurate" (see app/services/analysis_profiles.py). The profile sets
+    # landmark refinement, input resolution, ROI size and inference cadence
+    ANALYSIS_PROFILE: str = "balanced"
+
+    # Motion gating: between the profile's full inferences, FaceMesh only runs
+    # when the frame changed by more than the threshold (mean gray levels)
+    MOTION_GATE_THRESHOLD: float = 4.0
+
+    # Padding around the last face for ROI cropping, as a fraction of its size
+    FACE_ROI_PADDING: float = 0.5
+
+    # Recording write-behind: frames are queued and written in batches of up to
+    # this many frames / bytes, at least every flush interval
+    RECORDING_QUEUE_FRAMES: int = 600
+    RECORDING_BATCH_FRAMES: int = 50
+    RECORDING_BATCH_BYTES: int = 4 * 1024 * 1024
+    RECORDING_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Session video encoded while recording (0 FPS disables it). Codecs:
+    # VP80 / VP90 (WebM) or mp4v (MP4). Wider frames are scaled down to the
+    # max width (0 keeps the camera resolution)
+    RECORDING_VIDEO_FPS: float = 10
+    RECORDING_VIDEO_CODEC: str = "VP80"
+    RECORDING_VIDEO_MAX_WIDTH: int = 640
+
+    # Recording previews: one thumbnail every N seconds (0 disables them),
+    # packed into a single sprite image
+    PREVIEW_INTERVAL_SECONDS: float = 5
+    PREVIEW_THUMBNAIL_WIDTH: int = 160
+
+    # Live feedback: frames waiting longer than this are dropped, not analysed.
+    # Audio chunks are transcribed in order; past this many waiting per
+    # connection, new chunks are rejected
+    FRAME_LATENCY_BUDGET_MS: int = 500
+    AUDIO_QUEUE_CHUNKS: int = 8
+
     class Config:
         env_file = ".env"
 
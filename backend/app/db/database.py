@@ -0,0 +1,71 @@
+import logging
+from typing import List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+class Database:
+    """
+    The process's single MongoDB client and connection pool.
+
+    Services receive `db` when they are constructed at import time, but the
+    client doesn't touch the network until `connect()`, which the app
+    lifespan calls at startup: it checks the server with a ping and lets the
+    pool open its minimum connections. `close()` shuts the pool down.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        database_name: str,
+        max_pool_size: int = 50,
+        min_pool_size: int = 0,
+        connect_timeout_ms: int = 5000,
+        server_selection_timeout_ms: int = 5000,
+        socket_timeout_ms: Optional[int] = None,
+        compressors: Optional[List[str]] = None
+    ):
+        options = {
+            "maxPoolSize": max_pool_size,
+            "minPoolSize": min_pool_size,
+            "connectTimeoutMS": connect_timeout_ms,
+            "serverSelectionTimeoutMS": server_selection_timeout_ms,
+            "socketTimeoutMS": socket_timeout_ms,
+        }
+        if compressors:
+            options["compressors"] = ",".join(compressors)
+        self.client = AsyncIOMotorClient(url, connect=False, **options)
+        self.db: AsyncIOMotorDatabase = self.client[database_name]
+        self.connected = False
+
+    async def connect(self):
+        """Open the pool and check the server is reachable"""
+        await self.client.admin.command("ping")
+        self.connected = True
+        logger.info(f"Connected to MongoDB database {self.db.name}")
+
+    def close(self):
+        self.client.close()
+        self.connected = False
+
+def create_database() -> Database:
+    """The Database configured by the MONGODB_ settings"""
+    compressors = [name.strip() for name in settings.MONGODB_COMPRESSORS.split(",") if name.strip()]
+    return Database(
+        settings.MONGODB_URL,
+        settings.DATABASE_NAME,
+        max_pool_size=settings.MONGODB_MAX_POOL_SIZE,
+        min_pool_size=settings.MONGODB_MIN_POOL_SIZE,
+        connect_timeout_ms=settings.MONGODB_CONNECT_TIMEOUT_MS,
+        server_selection_timeout_ms=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        socket_timeout_ms=settings.MONGODB_SOCKET_TIMEOUT_MS or None,
+        compressors=compressors
+    )
+
+# Shared by every route and service in the process
+database = create_database()
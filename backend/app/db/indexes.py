@@ -0,0 +1,126 @@
+"""
+Index declarations for the hot queries, and a query-plan check.
+
+ensure_indexes runs from the app lifespan. The check can also be run by
+hand from the backend directory to flag collection scans:
+
+    python -m app.db.indexes [--check]
+"""
+import asyncio
+import logging
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+logger = logging.getLogger(__name__)
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "recordings": [
+        # Ownership checks: find_one({session_id, user_id})
+        IndexModel([("session_id", ASCENDING), ("user_id", ASCENDING)], name="session_user"),
+        # Session history: find({user_id}).sort(start_time, -1), keyset on _id
+        IndexModel(
+            [("user_id", ASCENDING), ("start_time", DESCENDING), ("_id", DESCENDING)],
+            name="user_start_time"
+        ),
+    ],
+    "recording_chunks": [
+        # Post-processing: find({recording_id, type}).sort(timestamp)
+        IndexModel(
+            [("recording_id", ASCENDING), ("type", ASCENDING), ("timestamp", ASCENDING)],
+            name="recording_type_timestamp"
+        ),
+    ],
+    "interview_analyses": [
+        # find({session_id}), newest first
+        IndexModel([("session_id", ASCENDING), ("timestamp", DESCENDING)], name="session_timestamp"),
+    ],
+    "recording_previews": [
+        IndexModel([("session_id", ASCENDING)], name="session", unique=True),
+    ],
+    "session_videos.files": [
+        IndexModel(
+            [("metadata.session_id", ASCENDING), ("uploadDate", DESCENDING)],
+            name="session_upload_date"
+        ),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email"),
+    ],
+}
+
+# (collection, filter, sort) for each hot query; values are placeholders,
+# only the shape matters to the planner
+HOT_QUERIES: List[Tuple[str, Dict, Optional[List[Tuple[str, int]]]]] = [
+    ("recordings", {"session_id": "probe", "user_id": "probe"}, None),
+    ("recordings", {"user_id": "probe"}, [("start_time", DESCENDING), ("_id", DESCENDING)]),
+    ("recording_chunks", {"recording_id": ObjectId(), "type": "video"}, [("timestamp", ASCENDING)]),
+    ("interview_analyses", {"session_id": "probe"}, [("timestamp", DESCENDING)]),
+    ("recording_previews", {"session_id": "probe"}, None),
+    ("session_videos.files", {"metadata.session_id": "probe"}, [("uploadDate", DESCENDING)]),
+    ("users", {"email": "probe"}, None),
+]
+
+async def ensure_indexes(db) -> List[str]:
+    """Create every declared index that doesn't exist yet; returns their names"""
+    created = []
+    for collection, indexes in INDEXES.items():
+        created.extend(await db[collection].create_indexes(indexes))
+    logger.info(f"Ensured {len(created)} indexes")
+    return created
+
+async def check_query_plans(db) -> List[Dict]:
+    """Explain each hot query and report the ones whose winning plan scans a whole collection"""
+    report = []
+    for collection, query, sort in HOT_QUERIES:
+        cursor = db[collection].find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = await cursor.explain()
+        winning_plan = plan.get("queryPlanner", {}).get("winningPlan", {})
+        stages = plan_stages(winning_plan)
+        collscan = "COLLSCAN" in stages
+        if collscan:
+            logger.warning(f"Collection scan for {collection}.find({query}) sort={sort}: {stages}")
+        report.append({
+            "collection": collection,
+            "filter": query,
+            "sort": sort,
+            "stages": stages,
+            "collscan": collscan
+        })
+    return report
+
+def plan_stages(plan: Dict) -> List[str]:
+    """Stage names in an explain() plan tree, outermost first"""
+    stages = []
+    if "stage" in plan:
+        stages.append(plan["stage"])
+    # Classic plans nest inputStage(s); slot-based plans wrap them in queryPlan
+    children = [plan.get("queryPlan"), plan.get("inputStage")] + plan.get("inputStages", [])
+    for child in children:
+        if child:
+            stages.extend(plan_stages(child))
+    return stages
+
+async def main(check: bool):
+    from app.db.database import create_database
+
+    database = create_database()
+    try:
+        await database.connect()
+        print(f"Created/verified: {await ensure_indexes(database.db)}")
+        report = await check_query_plans(database.db) if check else []
+    finally:
+        database.close()
+    for entry in report:
+        status = "COLLSCAN" if entry["collscan"] else "ok"
+        print(f"[{status}] {entry['collection']} {entry['filter']} sort={entry['sort']}: {' <- '.join(entry['stages'])}")
+    if any(entry["collscan"] for entry in report):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main("--check" in sys.argv))
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional
 from pydantic import BaseModel, Field
 from bson import ObjectId
 
@@ -80,9 +80,28 @@ class AnalysisStorage:
         doc = await self.collection.find_one({"_id": ObjectId(analysis_id)})
         return InterviewAnalysis(**doc) if doc else None
         
-    async def get_session_analyses(self, session_id: str) -> List[InterviewAnalysis]:
-        """Get all analyses for a session"""
-        analyses = []
-        async for doc in self.collection.find({"session_id": session_id}):
-            analyses.append(InterviewAnalysis(**doc))
-        return analyses
\ No newline at end of file
+    async def get_latest_analysis(self, session_id: str) -> Optional[InterviewAnalysis]:
+        """Most recent analysis for a session (uses the session_id/timestamp index)"""
+        doc = await self.collection.find_one({"session_id": session_id}, sort=[("timestamp", -1)])
+        return InterviewAnalysis(**doc) if doc else None
+
+    async def get_latest_analysis_fields(self, session_id: str, fields: Iterable[str]) -> Optional[Dict]:
+        """
+        Only the given fields of a session's most recent analysis, e.g.
+        ["overall_metrics", "speech_analysis.words_per_minute"], so large
+        sub-documents like the transcript or timelines aren't read. Returns
+        a plain dict, with the timestamp always included. A path inside
+        another requested one (speech_analysis.words_per_minute next to
+        speech_analysis) is folded into it, as MongoDB rejects the overlap.
+        """
+        paths = []
+        for field in sorted(set(fields) | {"timestamp"}, key=len):
+            if not any(field == path or field.startswith(path + ".") for path in paths):
+                paths.append(field)
+        projection = {path: 1 for path in paths}
+        projection["_id"] = 0
+        return await self.collection.find_one(
+            {"session_id": session_id},
+            projection,
+            sort=[("timestamp", -1)]
+        )
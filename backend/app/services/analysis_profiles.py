@@ -0,0 +1,47 @@
+from typing import Dict, NamedTuple, Optional
+
+class AnalysisProfile(NamedTuple):
+    """
+    Speed/accuracy trade-off for live video analysis.
+
+    FaceMesh has no model complexity setting, so the cost levers are iris
+    refinement, the resolution the model sees (full-frame input width and
+    face ROI size), how often it runs (full_inference_interval, with the
+    motion gate tracking landmarks in between) and the confidence thresholds.
+    """
+    name: str
+    refine_landmarks: bool
+    max_input_width: Optional[int]  # Full-frame inference input, None keeps the decoded size
+    roi_size: Optional[int]         # Face ROI side length, None always uses the full frame
+    full_inference_interval: int
+    min_detection_confidence: float
+    min_tracking_confidence: float
+
+    def face_mesh_options(self) -> Dict:
+        return {
+            "max_num_faces": 1,
+            "refine_landmarks": self.refine_landmarks,
+            "min_detection_confidence": self.min_detection_confidence,
+            "min_tracking_confidence": self.min_tracking_confidence
+        }
+
+PROFILES = {
+    profile.name: profile for profile in (
+        # Iris landmarks are never read, so only "accurate" pays for them
+        AnalysisProfile("fast", False, 320, 160, 4, 0.5, 0.5),
+        AnalysisProfile("balanced", False, 480, 256, 3, 0.3, 0.3),
+        # Every frame at full resolution: the original behaviour
+        AnalysisProfile("accurate", True, None, None, 1, 0.3, 0.3),
+    )
+}
+
+def get_profile(name: str) -> AnalysisProfile:
+    """Look up a profile by name, raising ValueError for unknown names"""
+    profile = PROFILES.get(name)
+    if profile is None:
+        raise ValueError(f"Unknown analysis profile: {name} (expected one of {', '.join(PROFILES)})")
+    return profile
+
+def all_face_mesh_options() -> Dict[str, Dict]:
+    """FaceMesh options of every profile, keyed by profile name"""
+    return {name: profile.face_mesh_options() for name, profile in PROFILES.items()}
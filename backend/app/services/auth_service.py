@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
-from typing import Optional
-from passlib.context import CryptContext
+from typing import Dict, Optional
+import time
 from jose import JWTError, jwt
 from bson import ObjectId
 from fastapi import Depends, HTTPException, status
@@ -9,21 +9,31 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.core.config import get_settings
 from app.db.models.user_models import UserInDB, User, Token
+from app.services.password_hasher import PasswordHasher
+from app.utils.ttl_cache import TTLCache
 
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs on its own bounded thread pool, never on the event loop
+password_hasher = PasswordHasher(settings.BCRYPT_ROUNDS, settings.PASSWORD_HASH_CONCURRENCY)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 class AuthService:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.users = db.users
+        # Decoded tokens and user records, so authenticated requests don't
+        # each cost a JWT decode and a users lookup
+        self._token_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+        self._user_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+        # When each recently invalidated user was invalidated; tokens issued
+        # before then can't be trusted on their claims alone
+        self._invalidated = TTLCache(settings.AUTH_CACHE_SIZE, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(plain_password, hashed_password)
 
-    def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+    async def get_password_hash(self, password: str) -> str:
+        return await password_hasher.hash(password)
 
     async def get_user(self, email: str) -> Optional[UserInDB]:
         user_dict = await self.users.find_one({"email": email})
@@ -37,7 +47,7 @@ class AuthService:
         user = await self.get_user(email)
         if not user:
             return None
-        if not self.verify_password(password, user.hashed_password):
+        if not await self.verify_password(password, user.hashed_password):
             return None
         return User(
             id=user.id,
@@ -47,16 +57,34 @@ class AuthService:
             is_active=user.is_active
         )
 
-    def create_access_token(self, data: dict) -> str:
+    def create_access_token(self, data: dict, user: Optional[User] = None) -> str:
+        """Signed token for `data`. With a user, its profile is included as
+        claims so read-only endpoints can skip the database (see
+        get_current_user_claims)"""
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        to_encode.update({"exp": expire})
+        to_encode.update({"exp": expire, "iat": time.time()})
+        if user is not None:
+            to_encode.update({
+                "uid": user.id,
+                "name": user.name,
+                "created_at": user.created_at.isoformat(),
+                "active": user.is_active
+            })
         return jwt.encode(
             to_encode, 
             settings.JWT_SECRET_KEY, 
             algorithm=settings.JWT_ALGORITHM
         )
 
+    def invalidate_user(self, email: str):
+        """Forget the cached record of a user who was changed or deactivated;
+        their current tokens fall back to a database read. Only affects this
+        process, and no endpoint changes users yet: whatever adds one must
+        call this"""
+        self._user_cache.pop(email)
+        self._invalidated.set(email, time.time())
+
     async def create_user(self, email: str, password: str, name: str) -> User:
         # Check if user already exists
         existing_user = await self.get_user(email)
@@ -71,7 +99,7 @@ class AuthService:
             "_id": ObjectId(),  # MongoDB document ID
             "email": email,
             "name": name,
-            "hashed_password": self.get_password_hash(password),
+            "hashed_password": await self.get_password_hash(password),
             "created_at": datetime.utcnow(),
             "is_active": True
         }
@@ -89,31 +117,79 @@ class AuthService:
         )
 
     async def get_current_user(self, token: str = Depends(oauth2_scheme)) -> User:
-        credentials_exception = HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        payload = self._decode_token(token)
+        return await self._load_user(payload["sub"])
+
+    async def get_current_user_claims(self, token: str = Depends(oauth2_scheme)) -> User:
+        """
+        Like get_current_user, for read-only endpoints: when the token carries
+        the user's profile and the user hasn't been invalidated since it was
+        issued, the signed claims are trusted and no database read happens.
+        Off by default (AUTH_TRUST_TOKEN_CLAIMS)
+        """
+        payload = self._decode_token(token)
+        if settings.AUTH_TRUST_TOKEN_CLAIMS:
+            user = self._user_from_claims(payload)
+            if user is not None:
+                return user
+        return await self._load_user(payload["sub"])
+
+    def _decode_token(self, token: str) -> Dict:
+        payload = self._token_cache.get(token)
+        if payload is not None:
+            return payload
         try:
             payload = jwt.decode(
                 token, 
                 settings.JWT_SECRET_KEY, 
                 algorithms=[settings.JWT_ALGORITHM]
             )
-            email: str = payload.get("sub")
-            if email is None:
-                raise credentials_exception
         except JWTError:
-            raise credentials_exception
+            raise self._credentials_exception()
+        if payload.get("sub") is None:
+            raise self._credentials_exception()
+        # Never cache a token past its expiry
+        self._token_cache.set(token, payload, ttl=payload["exp"] - time.time() if "exp" in payload else None)
+        return payload
 
-        user = await self.get_user(email)
+    async def _load_user(self, email: str) -> User:
+        user = self._user_cache.get(email)
         if user is None:
-            raise credentials_exception
-            
+            user_in_db = await self.get_user(email)
+            if user_in_db is None:
+                raise self._credentials_exception()
+            user = User(
+                id=user_in_db.id,
+                email=user_in_db.email,
+                name=user_in_db.name,
+                created_at=user_in_db.created_at,
+                is_active=user_in_db.is_active
+            )
+            self._user_cache.set(email, user)
+        if not user.is_active:
+            raise self._credentials_exception()
+        return user
+
+    def _user_from_claims(self, payload: Dict) -> Optional[User]:
+        """The user described by a token's claims, or None if they're missing or stale"""
+        if not all(claim in payload for claim in ("uid", "name", "created_at", "active", "iat")):
+            return None
+        invalidated_at = self._invalidated.get(payload["sub"])
+        if invalidated_at is not None and payload["iat"] <= invalidated_at:
+            return None
+        if not payload["active"]:
+            raise self._credentials_exception()
         return User(
-            id=user.id,
-            email=user.email,
-            name=user.name,
-            created_at=user.created_at,
-            is_active=user.is_active
-        )
\ No newline at end of file
+            id=payload["uid"],
+            email=payload["sub"],
+            name=payload["name"],
+            created_at=datetime.fromisoformat(payload["created_at"]),
+            is_active=True
+        )
+
+    def _credentials_exception(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
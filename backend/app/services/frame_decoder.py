@@ -0,0 +1,101 @@
+import logging
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# libjpeg-turbo bindings are optional; OpenCV's reduced decode is the fallback
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+except ImportError:
+    TurboJPEG = None
+
+# Scale denominators libjpeg can apply during the inverse DCT
+REDUCED_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# Start-of-frame markers (baseline, progressive, lossless, arithmetic), which
+# carry the image size
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def jpeg_size(jpeg) -> Optional[Tuple[int, int]]:
+    """(width, height) from a JPEG's frame header, or None if it can't be found"""
+    data = memoryview(jpeg).cast("B")
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    pos = 2
+    while pos + 9 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+        elif marker in SOF_MARKERS:
+            height = data[pos + 5] << 8 | data[pos + 6]
+            width = data[pos + 7] << 8 | data[pos + 8]
+            return width, height
+        elif marker == 0x01 or 0xD0 <= marker <= 0xD7:  # Markers without a length
+            pos += 2
+        else:
+            pos += 2 + (data[pos + 2] << 8 | data[pos + 3])
+    return None
+
+class FrameDecoder:
+    """
+    Decodes JPEG frames no larger than the analysis needs.
+
+    libjpeg can scale by 1/2, 1/4 or 1/8 inside the inverse DCT, which is
+    much cheaper than decoding at full size and resizing. The largest
+    reduction that keeps the frame at least `target_width` wide is used;
+    target_width=None always decodes at full size.
+    """
+
+    def __init__(self, target_width: Optional[int] = None, use_turbojpeg: bool = True):
+        self.target_width = target_width
+        self._turbojpeg = None
+        if use_turbojpeg and TurboJPEG is not None:
+            try:
+                self._turbojpeg = TurboJPEG()
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"libjpeg-turbo unavailable, using OpenCV decode: {e}")
+
+    def scale_for(self, width: int) -> int:
+        """Largest supported reduction that keeps `width` at or above the target"""
+        if not self.target_width:
+            return 1
+        for scale in (8, 4, 2):
+            if width // scale >= self.target_width:
+                return scale
+        return 1
+
+    def decode(self, jpeg: np.ndarray) -> Tuple[Optional[np.ndarray], int]:
+        """
+        Decode a JPEG (uint8 array) to a BGR frame. Returns (frame, scale),
+        where the frame is 1/scale of the source size, or (None, 1) if the
+        data can't be decoded.
+        """
+        size = jpeg_size(jpeg)
+        scale = self.scale_for(size[0]) if size else 1
+
+        if self._turbojpeg is not None:
+            try:
+                frame = self._turbojpeg.decode(
+                    jpeg,
+                    pixel_format=TJPF_BGR,
+                    scaling_factor=(1, scale) if scale > 1 else None
+                )
+                return frame, scale
+            except (OSError, ValueError):
+                return None, 1
+
+        frame = cv2.imdecode(jpeg, REDUCED_FLAGS[scale])
+        if frame is None:
+            return None, 1
+        return frame, scale
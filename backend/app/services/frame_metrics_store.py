@@ -0,0 +1,127 @@
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ATTENTION_STATUSES = ["centered", "looking away", "poor posture", "no valid frame", "error"]
+SENTIMENTS = ["neutral", "positive", "negative"]
+
+ATTENTION_CODES = {status: code for code, status in enumerate(ATTENTION_STATUSES)}
+SENTIMENT_CODES = {sentiment: code for code, sentiment in enumerate(SENTIMENTS)}
+
+CENTERED = ATTENTION_CODES["centered"]
+
+COLUMNS = {
+    "timestamp": np.float64,
+    "face_detected": np.bool_,
+    "x_offset": np.int32,
+    "y_offset": np.int32,
+    "attention": np.uint8,
+    "sentiment": np.uint8,
+}
+
+class FrameMetricsStore:
+    """
+    Append-only, NumPy-backed columns of per-frame feedback.
+
+    A frame costs 19 bytes instead of a dict, and timeline metrics are
+    computed with vectorized operations over the columns. Columns grow by
+    doubling, so appends are amortised O(1). Session scores come from
+    SessionAggregator, not from here.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._size = 0
+        self._columns = {
+            name: np.zeros(max(capacity, 1), dtype=dtype)
+            for name, dtype in COLUMNS.items()
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._view("timestamp")
+
+    @property
+    def face_detected(self) -> np.ndarray:
+        return self._view("face_detected")
+
+    @property
+    def x_offset(self) -> np.ndarray:
+        return self._view("x_offset")
+
+    @property
+    def y_offset(self) -> np.ndarray:
+        return self._view("y_offset")
+
+    @property
+    def attention(self) -> np.ndarray:
+        return self._view("attention")
+
+    @property
+    def sentiment(self) -> np.ndarray:
+        return self._view("sentiment")
+
+    def clear(self):
+        self._size = 0
+
+    def append(self, feedback: Dict, timestamp: Optional[float] = None):
+        """Add one frame of real-time feedback"""
+        if self._size == len(self._columns["timestamp"]):
+            self._grow()
+
+        position = feedback.get("face_position") or {}
+        row = self._size
+        self._columns["timestamp"][row] = time.time() if timestamp is None else timestamp
+        self._columns["face_detected"][row] = bool(feedback.get("face_detected"))
+        self._columns["x_offset"][row] = position.get("x", 0)
+        self._columns["y_offset"][row] = position.get("y", 0)
+        self._columns["attention"][row] = ATTENTION_CODES.get(
+            feedback.get("attention_status"), ATTENTION_CODES["error"]
+        )
+        self._columns["sentiment"][row] = SENTIMENT_CODES.get(feedback.get("sentiment"), 0)
+        self._size += 1
+
+    def expression_changes(self) -> int:
+        """Number of frame-to-frame sentiment changes"""
+        return int(np.count_nonzero(np.diff(self.sentiment)))
+
+    def dominant_sentiment(self) -> str:
+        """Most frequent sentiment, "neutral" for an empty store"""
+        if not self._size:
+            return "neutral"
+        counts = np.bincount(self.sentiment, minlength=len(SENTIMENTS))
+        return SENTIMENTS[int(np.argmax(counts))]
+
+    def sentiment_runs(self) -> List[Dict]:
+        """Consecutive frames with the same sentiment, in order"""
+        if not self._size:
+            return []
+        sentiment = self.sentiment
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(sentiment)) + 1))
+        ends = np.concatenate((starts[1:], [self._size]))
+        return [
+            {
+                "sentiment": SENTIMENTS[code],
+                "start_frame": start,
+                "end_frame": end - 1,
+                "duration": end - start
+            }
+            for code, start, end in zip(
+                sentiment[starts].tolist(), starts.tolist(), ends.tolist()
+            )
+        ]
+
+    def _view(self, name: str) -> np.ndarray:
+        # Read-only view of the filled part of a column
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def _grow(self):
+        for name, column in self._columns.items():
+            grown = np.zeros(len(column) * 2, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
@@ -0,0 +1,65 @@
+"""
+Binary WebSocket message format for live capture.
+
+Every binary message starts with a fixed 16 byte little-endian header,
+followed by the raw payload (JPEG bytes for video):
+
+    offset  size  field
+    0       1     protocol version (currently 1)
+    1       1     message type (1 = video, 2 = audio)
+    2       2     reserved, must be 0
+    4       4     sequence number (uint32, wraps)
+    8       8     capture timestamp in ms since the epoch (float64)
+
+Text messages keep using the legacy JSON format with base64 payloads.
+"""
+import base64
+import struct
+from typing import NamedTuple
+
+import numpy as np
+
+PROTOCOL_VERSION = 1
+
+MESSAGE_VIDEO = 1
+MESSAGE_AUDIO = 2
+
+HEADER = struct.Struct("<BBHId")
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+class FrameMessage(NamedTuple):
+    message_type: int
+    sequence: int
+    timestamp_ms: float
+    payload: np.ndarray  # uint8 view into the received buffer, not a copy
+
+
+def decode_message(data: bytes) -> FrameMessage:
+    """Parse a binary message without copying its payload"""
+    if len(data) < HEADER.size:
+        raise ProtocolError(f"Message too short: {len(data)} bytes")
+
+    version, message_type, _, sequence, timestamp_ms = HEADER.unpack_from(data)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported protocol version {version}")
+    if message_type not in (MESSAGE_VIDEO, MESSAGE_AUDIO):
+        raise ProtocolError(f"Unknown message type {message_type}")
+
+    payload = np.frombuffer(data, dtype=np.uint8, offset=HEADER.size)
+    return FrameMessage(message_type, sequence, timestamp_ms, payload)
+
+
+def encode_message(message_type: int, sequence: int, timestamp_ms: float, payload: bytes) -> bytes:
+    """Build a binary message (used by Python clients and tests)"""
+    header = HEADER.pack(PROTOCOL_VERSION, message_type, 0, sequence & 0xFFFFFFFF, timestamp_ms)
+    return header + payload
+
+
+def decode_legacy_frame(frame_data: str) -> np.ndarray:
+    """JPEG bytes from a legacy base64 (optionally data URL) video message"""
+    encoded_data = frame_data.split(',')[1] if ',' in frame_data else frame_data
+    return np.frombuffer(base64.b64decode(encoded_data), np.uint8)
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+class FrameScheduler:
+    """
+    Latest-frame-wins hand-off between a connection's receive loop and its
+    analysis loop.
+
+    Only one frame is ever pending: submitting a new frame replaces (drops)
+    the one waiting, and a frame that waited longer than the latency budget
+    is discarded instead of analysed. Feedback therefore always describes a
+    recent frame, however slow inference is.
+    """
+
+    def __init__(self, latency_budget_ms: float = 500):
+        self.latency_budget_ms = latency_budget_ms
+
+        self._pending: Optional[Tuple[float, Any]] = None
+        self._ready = asyncio.Event()
+        self._closed = False
+
+        self.received_frames = 0
+        self.processed_frames = 0
+        self.dropped_frames = 0   # Replaced by a newer frame before analysis
+        self.expired_frames = 0   # Waited longer than the latency budget
+        self.last_queue_age_ms = 0.0
+        self.max_queue_age_ms = 0.0
+
+    def submit(self, frame: Any):
+        """Offer a frame for analysis, replacing any frame still waiting"""
+        self.received_frames += 1
+        if self._pending is not None:
+            self.dropped_frames += 1
+        self._pending = (time.monotonic(), frame)
+        self._ready.set()
+
+    async def next_frame(self) -> Optional[Any]:
+        """Wait for the newest pending frame; returns None once closed and drained"""
+        while True:
+            if self._pending is None:
+                if self._closed:
+                    return None
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            received_at, frame = self._pending
+            self._pending = None
+
+            queue_age_ms = (time.monotonic() - received_at) * 1000
+            if queue_age_ms > self.latency_budget_ms:
+                self.expired_frames += 1
+                continue
+
+            self.processed_frames += 1
+            self.last_queue_age_ms = queue_age_ms
+            self.max_queue_age_ms = max(self.max_queue_age_ms, queue_age_ms)
+            return frame
+
+    def close(self):
+        """Stop accepting frames; next_frame returns None after the last pending one"""
+        self._closed = True
+        self._ready.set()
+
+    def stats(self) -> Dict:
+        return {
+            "received_frames": self.received_frames,
+            "processed_frames": self.processed_frames,
+            "dropped_frames": self.dropped_frames,
+            "expired_frames": self.expired_frames,
+            "queue_age_ms": round(self.last_queue_age_ms, 1),
+            "max_queue_age_ms": round(self.max_queue_age_ms, 1)
+        }
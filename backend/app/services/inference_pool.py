@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services import inference_worker
+
+logger = logging.getLogger(__name__)
+
+
+class InferencePool:
+    """
+    Runs FaceMesh in separate worker processes so inference never blocks the
+    event loop.
+
+    Each worker is a single-process executor, and a session is pinned to one
+    worker for its whole lifetime. Its frames are therefore processed in
+    order by the same MediaPipe tracker, which keeps tracking state valid,
+    while different sessions spread across workers and scale with cores.
+
+    A worker that dies is respawned on the next call that finds it broken;
+    its sessions lose their trackers and are placed again like new ones.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        face_mesh_options: Dict[str, Dict],
+        default_profile: str,
+        threads_per_worker: int = 1,
+        prewarm_per_worker: int = 1
+    ):
+        # face_mesh_options maps analysis profile names to FaceMesh options;
+        # graphs are pre-warmed for the default profile only
+        self.num_workers = num_workers
+        self.face_mesh_options = face_mesh_options
+        self.default_profile = default_profile
+        self.threads_per_worker = threads_per_worker
+        self.prewarm_per_worker = prewarm_per_worker
+
+        self._executors: List[ProcessPoolExecutor] = []
+        self._assignments: Dict[str, int] = {}
+        self._load: List[int] = []
+        self.respawned_workers = 0
+
+    async def start(self):
+        """Spawn the workers and wait until each one has pre-warmed its graphs"""
+        self._executors = [self._create_executor() for _ in range(self.num_workers)]
+        self._load = [0] * self.num_workers
+
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(
+            loop.run_in_executor(executor, inference_worker.ping)
+            for executor in self._executors
+        ))
+        logger.info(f"Started {len(pids)} inference workers: {pids}")
+
+    async def stop(self):
+        """Shut down every worker process"""
+        for executor in self._executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._executors = []
+        self._assignments = {}
+        self._load = []
+
+    async def detect_landmarks(
+        self,
+        session_id: str,
+        frame_rgb: np.ndarray,
+        profile: Optional[str] = None
+    ) -> Optional[np.ndarray]:
+        """Landmarks for the first face as an (N, 3) array, or None if no face was found"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            worker = self._worker_for(session_id)
+            executor = self._executors[worker]
+            try:
+                return await loop.run_in_executor(
+                    executor,
+                    inference_worker.detect_landmarks,
+                    session_id,
+                    frame_rgb,
+                    profile or self.default_profile
+                )
+            except BrokenProcessPool:
+                self._respawn(worker, executor)
+                if attempt:
+                    raise
+
+    async def release(self, session_id: str):
+        """Free the session's tracker on its worker"""
+        worker = self._assignments.pop(session_id, None)
+        if worker is None:
+            return
+        self._load[worker] -= 1
+        executor = self._executors[worker]
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(executor, inference_worker.release_session, session_id)
+        except BrokenProcessPool:
+            # The tracker died with the worker
+            self._respawn(worker, executor)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=inference_worker.init_worker,
+            initargs=(
+                self.face_mesh_options,
+                self.threads_per_worker,
+                self.prewarm_per_worker,
+                self.default_profile
+            )
+        )
+
+    def _respawn(self, worker: int, broken: ProcessPoolExecutor):
+        """Replace a dead worker and unpin its sessions"""
+        # Concurrent calls on the same dead worker respawn it only once
+        if self._executors[worker] is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executors[worker] = self._create_executor()
+        self.respawned_workers += 1
+
+        orphaned = [session_id for session_id, assigned in self._assignments.items() if assigned == worker]
+        for session_id in orphaned:
+            del self._assignments[session_id]
+        self._load[worker] = 0
+        logger.error(
+            f"Inference worker {worker} died; respawned it and reassigning "
+            f"{len(orphaned)} sessions"
+        )
+
+    def _worker_for(self, session_id: str) -> int:
+        # New sessions go to the worker with the fewest sessions and stay there
+        worker = self._assignments.get(session_id)
+        if worker is None:
+            worker = min(range(self.num_workers), key=self._load.__getitem__)
+            self._assignments[session_id] = worker
+            self._load[worker] += 1
+        return worker
@@ -0,0 +1,80 @@
+"""
+Code that runs inside the FaceMesh inference worker processes.
+
+Only standard library modules are imported at the top level: the thread
+limits set in init_worker must be in the environment before numpy, OpenCV
+and MediaPipe are first imported in the worker.
+"""
+import os
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "TF_NUM_INTRAOP_THREADS",
+    "TF_NUM_INTEROP_THREADS",
+)
+
+# Per-process state, populated by init_worker. FaceMesh options, and so
+# graphs, differ per analysis profile
+_face_mesh_options = {}      # profile -> FaceMesh options
+_session_face_meshes = {}    # session id -> (profile, FaceMesh)
+_idle_face_meshes = {}       # profile -> [FaceMesh]
+
+
+def init_worker(face_mesh_options: dict, num_threads: int, prewarm: int, prewarm_profile: str):
+    """Pin thread counts and pre-warm FaceMesh graphs of the default profile"""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(num_threads)
+
+    import cv2
+    cv2.setNumThreads(num_threads)
+
+    _face_mesh_options.update(face_mesh_options)
+    for profile in _face_mesh_options:
+        _idle_face_meshes[profile] = []
+    for _ in range(prewarm):
+        _idle_face_meshes[prewarm_profile].append(_create_face_mesh(prewarm_profile))
+
+
+def ping() -> int:
+    """Used at startup to make sure the worker process is up"""
+    return os.getpid()
+
+
+def detect_landmarks(session_id: str, frame_rgb, profile: str):
+    """Run FaceMesh on an RGB frame with the session's own tracker"""
+    entry = _session_face_meshes.get(session_id)
+    if entry is None:
+        idle = _idle_face_meshes[profile]
+        entry = (profile, idle.pop() if idle else _create_face_mesh(profile))
+        _session_face_meshes[session_id] = entry
+    face_mesh = entry[1]
+
+    results = face_mesh.process(frame_rgb)
+    if not results.multi_face_landmarks:
+        return None
+    return landmarks_to_array(results.multi_face_landmarks[0])
+
+
+def release_session(session_id: str):
+    """Reset the session's tracker and return it to the idle list"""
+    entry = _session_face_meshes.pop(session_id, None)
+    if entry is not None:
+        profile, face_mesh = entry
+        face_mesh.reset()
+        _idle_face_meshes[profile].append(face_mesh)
+
+
+def landmarks_to_array(face_landmarks):
+    """Convert a NormalizedLandmarkList to an (N, 3) float32 array of x, y, z"""
+    import numpy as np
+    return np.array(
+        [(point.x, point.y, point.z) for point in face_landmarks.landmark],
+        dtype=np.float32
+    )
+
+
+def _create_face_mesh(profile: str):
+    import mediapipe as mp
+    return mp.solutions.face_mesh.FaceMesh(**_face_mesh_options[profile])
@@ -0,0 +1,105 @@
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Landmarks followed with optical flow between full inferences: nose tip,
+# mouth corners and lips, inner brows, forehead
+TRACKED_LANDMARKS = [1, 61, 291, 13, 14, 46, 276, 71, 301]
+
+class MotionGate:
+    """
+    Skips FaceMesh on frames that barely differ from the last analysed one.
+
+    Each frame is reduced to a small grayscale copy. If its mean absolute
+    difference from the last analysed copy is under `threshold` (in 0-255
+    gray levels), the previous landmarks are reused, shifted by the median
+    Lucas-Kanade flow of a few key landmarks. A full inference is still
+    forced every `full_interval` frames, and whenever tracking fails.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 4.0,
+        full_interval: int = 3,
+        track_size: Tuple[int, int] = (160, 120),
+        diff_size: Tuple[int, int] = (32, 24)
+    ):
+        self.threshold = threshold
+        self.full_interval = full_interval
+        self.track_size = track_size
+        self.diff_size = diff_size
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        return self.full_interval > 1
+
+    def reset(self):
+        self._reference: Optional[np.ndarray] = None  # Diff thumbnail of the last analysed frame
+        self._previous: Optional[np.ndarray] = None   # Tracking image of the previous frame
+        self._landmarks: Optional[np.ndarray] = None
+        self._frames_since_inference = 0
+        self.inference_calls = 0
+        self.skipped_frames = 0
+
+    def prepare(self, frame: np.ndarray) -> np.ndarray:
+        """Small grayscale copy of a BGR frame used for diffing and tracking"""
+        small = cv2.resize(frame, self.track_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def needs_inference(self, gray: np.ndarray) -> bool:
+        if not self.enabled or self._reference is None:
+            return True
+        if self._frames_since_inference + 1 >= self.full_interval:
+            return True
+        thumbnail = cv2.resize(gray, self.diff_size, interpolation=cv2.INTER_AREA)
+        return float(cv2.absdiff(thumbnail, self._reference).mean()) > self.threshold
+
+    def record_inference(self, gray: np.ndarray, landmarks: Optional[np.ndarray]):
+        """Remember a fully analysed frame and its landmarks"""
+        self.inference_calls += 1
+        self._frames_since_inference = 0
+        self._reference = cv2.resize(gray, self.diff_size, interpolation=cv2.INTER_AREA)
+        self._previous = gray
+        self._landmarks = landmarks
+
+    def track(self, gray: np.ndarray) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Landmarks for a skipped frame, following the previous ones with
+        optical flow. Returns (ok, landmarks); ok is False when tracking
+        failed and the frame needs full inference after all.
+        """
+        if self._landmarks is None:
+            # No face last time and nothing changed: still no face
+            self._skip(gray)
+            return True, None
+
+        width, height = self.track_size
+        points = self._landmarks[TRACKED_LANDMARKS, :2] * (width, height)
+        points = points.astype(np.float32).reshape(-1, 1, 2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._previous, gray, points, None, winSize=(15, 15), maxLevel=2
+        )
+        found = status.ravel() == 1
+        if found.sum() < len(TRACKED_LANDMARKS) // 2:
+            return False, None
+
+        shift = np.median((moved - points).reshape(-1, 2)[found], axis=0) / (width, height)
+        landmarks = self._landmarks.copy()
+        landmarks[:, :2] += shift.astype(np.float32)
+
+        self._landmarks = landmarks
+        self._skip(gray)
+        return True, landmarks
+
+    def stats(self):
+        return {
+            "inference_calls": self.inference_calls,
+            "skipped_frames": self.skipped_frames
+        }
+
+    def _skip(self, gray: np.ndarray):
+        self.skipped_frames += 1
+        self._frames_since_inference += 1
+        self._previous = gray
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+# bcrypt only uses the first 72 bytes of a password
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification off the event loop.
+
+    Each hash costs tens to hundreds of milliseconds of CPU, so it runs on a
+    small dedicated thread pool (bcrypt releases the GIL while it works).
+    At most `max_concurrency` calls run at once; the rest wait their turn
+    on a semaphore, so a burst of logins queues up instead of competing
+    with live sessions for every core. Time spent waiting is recorded so
+    the queue can be watched in stats().
+    """
+
+    # Queue waits longer than this are logged
+    SLOW_QUEUE_SECONDS = 1.0
+
+    def __init__(self, rounds: int = 12, max_concurrency: int = 2):
+        self.rounds = rounds
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.total_queue_seconds = 0.0
+        self.max_queue_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(bcrypt.hashpw, self._encode(password), bcrypt.gensalt(self.rounds))
+        return hashed.decode()
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        try:
+            return await self._run(bcrypt.checkpw, self._encode(password), hashed_password.encode())
+        except ValueError:
+            # Not a bcrypt hash
+            return False
+
+    def stats(self) -> Dict:
+        return {
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "avg_queue_ms": round(1000 * self.total_queue_seconds / self.completed, 1) if self.completed else 0.0,
+            "max_queue_ms": round(1000 * self.max_queue_seconds, 1),
+            "avg_run_ms": round(1000 * self.total_run_seconds / self.completed, 1) if self.completed else 0.0
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, function, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="password-hasher")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started_at = time.perf_counter()
+        self._record_queue_time(started_at - queued_at)
+
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self.total_run_seconds += time.perf_counter() - started_at
+            self._semaphore.release()
+
+    def _record_queue_time(self, seconds: float):
+        self.total_queue_seconds += seconds
+        self.max_queue_seconds = max(self.max_queue_seconds, seconds)
+        if seconds > self.SLOW_QUEUE_SECONDS:
+            logger.warning(f"Password hashing queued for {seconds * 1000:.0f} ms ({self.waiting} still waiting)")
+
+    @staticmethod
+    def _encode(password: str) -> bytes:
+        # Truncate like bcrypt < 5 did silently, so existing hashes still verify
+        return password.encode()[:BCRYPT_MAX_PASSWORD_BYTES]
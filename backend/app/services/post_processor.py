@@ -1,10 +1,11 @@
 import numpy as np
-import cv2
-from typing import List, Dict, Tuple
+from typing import AsyncIterator, List, Dict, Tuple
 from datetime import datetime
 
 from app.services.speech_analyzer import SpeechAnalyzer
 from app.services.video_processor import VideoProcessor
+from app.services.frame_decoder import FrameDecoder
+from app.services.frame_metrics_store import FrameMetricsStore, CENTERED
 from app.db.models.analysis_models import (
     SpeechAnalysisResult,
     VisualAnalysisResult,
@@ -17,6 +18,7 @@ class PostProcessor:
         self.analysis_storage = analysis_storage
         self.speech_analyzer = SpeechAnalyzer()
         self.video_processor = VideoProcessor()
+        self.frame_decoder = FrameDecoder(self.video_processor.profile.max_input_width)
         
     async def process_recording(self, recording_id: str, session_id: str) -> str:
         """Process a complete recording and generate analysis"""
@@ -24,13 +26,16 @@ class PostProcessor:
             # Initialize analysis document
             analysis_id = await self.analysis_storage.create_analysis(recording_id, session_id)
             
-            # Get all chunks
+            # Video chunks are streamed; only audio chunk metadata is loaded
+            video_chunks = self.recording_storage.iter_recording_chunks(recording_id, "video")
             try:
-                video_chunks = await self.recording_storage.get_recording_chunks(recording_id, "video")
-                audio_chunks = await self.recording_storage.get_recording_chunks(recording_id, "audio")
+                audio_chunks = [
+                    chunk async for chunk in self.recording_storage.iter_recording_chunks(
+                        recording_id, "audio", fields=("timestamp",)
+                    )
+                ]
             except Exception as e:
                 print(f"Error getting chunks: {e}")
-                video_chunks = []
                 audio_chunks = []
             
             # Initialize default results
@@ -38,11 +43,10 @@ class PostProcessor:
             visual_results = VisualAnalysisResult()
             
             # Process video if available
-            if video_chunks:
-                try:
-                    visual_results = await self._analyze_visual(video_chunks)
-                except Exception as e:
-                    print(f"Visual analysis error: {e}")
+            try:
+                visual_results = await self._analyze_visual(video_chunks)
+            except Exception as e:
+                print(f"Visual analysis error: {e}")
             
             # Process audio if available
             if audio_chunks:
@@ -98,91 +102,63 @@ class PostProcessor:
             print(f"Speech analysis failed: {e}")
             return SpeechAnalysisResult()
 
-    async def _analyze_visual(self, video_chunks: List[Dict]) -> VisualAnalysisResult:
-        """Analyze visual aspects from video chunks"""
-        if not video_chunks:
-            return VisualAnalysisResult()
-            
+    async def _analyze_visual(self, video_chunks: AsyncIterator[Dict]) -> VisualAnalysisResult:
+        """Analyze visual aspects from streamed video chunks, one frame at a time"""
         try:
-            frames = self._decode_video_chunks(video_chunks)
-            
-            attention_scores = []
-            sentiments = []
-            posture_scores = []
-            
-            for frame in frames:
-                feedback = await self.video_processor.get_realtime_feedback(frame)
-                
-                attention_scores.append(1.0 if feedback["attention_status"] == "centered" else 0.0)
-                sentiments.append(feedback["sentiment"])
-                
-                if feedback.get("face_position"):
-                    pos = feedback["face_position"]
-                    pos_score = 1.0 - (abs(pos["x"]/320) + abs(pos["y"]/240))/2
-                    posture_scores.append(max(0.0, pos_score))
-                else:
-                    posture_scores.append(0.0)
+            # The processor records every frame's feedback in its own store
+            self.video_processor.reset()
+            async for timestamp, frame, scale in self._decode_video_chunks(video_chunks):
+                await self.video_processor.get_realtime_feedback(frame, timestamp, scale)
+            metrics = self.video_processor.metrics_store
+            
+            if not len(metrics):
+                return VisualAnalysisResult()
+            
+            attention_scores = metrics.attention == CENTERED
+            
+            # Distance of the face from the frame centre, 1.0 when centred
+            posture_scores = np.where(
+                metrics.face_detected,
+                np.maximum(0.0, 1.0 - (np.abs(metrics.x_offset / 320) + np.abs(metrics.y_offset / 240)) / 2),
+                0.0
+            )
             
             return VisualAnalysisResult(
-                attention_score=np.mean(attention_scores) if attention_scores else 0.0,
-                eye_contact_percentage=len([s for s in attention_scores if s > 0.8]) / max(len(attention_scores), 1) * 100,
-                posture_score=np.mean(posture_scores) if posture_scores else 0.0,
-                expression_changes=sum(1 for i in range(1, len(sentiments)) if sentiments[i] != sentiments[i-1]),
-                dominant_sentiment=max(set(sentiments), key=sentiments.count) if sentiments else "neutral",
-                sentiment_timeline=self._create_sentiment_timeline(sentiments)
+                attention_score=float(np.mean(attention_scores)),
+                eye_contact_percentage=float(np.mean(attention_scores)) * 100,
+                posture_score=float(np.mean(posture_scores)),
+                expression_changes=metrics.expression_changes(),
+                dominant_sentiment=metrics.dominant_sentiment(),
+                sentiment_timeline=self._create_sentiment_timeline(metrics)
             )
             
         except Exception as e:
             print(f"Visual analysis failed: {e}")
             return VisualAnalysisResult()
 
-    def _decode_video_chunks(self, video_chunks: List[Dict]) -> List[np.ndarray]:
-        """Convert base64 encoded video chunks to frames"""
-        frames = []
-        for chunk in video_chunks:
+    async def _decode_video_chunks(
+        self,
+        video_chunks: AsyncIterator[Dict]
+    ) -> AsyncIterator[Tuple[float, np.ndarray, int]]:
+        """Decode raw JPEG video chunks to (timestamp, frame, scale) tuples as they arrive"""
+        async for chunk in video_chunks:
             try:
-                import base64
-                base64_data = chunk["data"].split(",")[-1]
-                nparr = np.frombuffer(base64.b64decode(base64_data), np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+                nparr = np.frombuffer(chunk["data"], np.uint8)
+                frame, scale = self.frame_decoder.decode(nparr)
                 
                 if frame is not None:
-                    frames.append(frame)
+                    timestamp = chunk.get("timestamp")
+                    if isinstance(timestamp, datetime):
+                        timestamp = timestamp.timestamp()
+                    yield timestamp, frame, scale
                     
             except Exception as e:
                 print(f"Error decoding frame: {e}")
                 continue
-                
-        return frames
 
-    def _create_sentiment_timeline(self, sentiments: List[str]) -> List[Dict]:
+    def _create_sentiment_timeline(self, metrics: FrameMetricsStore) -> List[Dict]:
         """Create a timeline of sentiment changes"""
-        timeline = []
-        if not sentiments:
-            return timeline
-            
-        current_sentiment = sentiments[0]
-        start_idx = 0
-        
-        for i, sentiment in enumerate(sentiments[1:], 1):
-            if sentiment != current_sentiment:
-                timeline.append({
-                    "sentiment": current_sentiment,
-                    "start_frame": start_idx,
-                    "end_frame": i-1,
-                    "duration": i - start_idx
-                })
-                current_sentiment = sentiment
-                start_idx = i
-        
-        timeline.append({
-            "sentiment": current_sentiment,
-            "start_frame": start_idx,
-            "end_frame": len(sentiments)-1,
-            "duration": len(sentiments) - start_idx
-        })
-        
-        return timeline
+        return metrics.sentiment_runs()
 
     def _generate_overall_analysis(
         self,
@@ -0,0 +1,88 @@
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.services.frame_decoder import FrameDecoder
+
+class PreviewBuilder:
+    """
+    Collects one small thumbnail per `interval` seconds of a session and
+    packs them into a single JPEG sprite sheet plus an index.
+
+    Only frames that start a new interval are decoded, at reduced DCT scale,
+    so the cost while recording is a few decodes per minute. To keep the
+    sprite bounded, once `max_thumbnails` is reached every other thumbnail
+    is dropped and the interval doubles. Not thread-safe: feed frames from
+    one thread at a time, in order.
+    """
+
+    def __init__(
+        self,
+        interval: float = 5.0,
+        thumb_width: int = 160,
+        columns: int = 10,
+        max_thumbnails: int = 120,
+        quality: int = 70
+    ):
+        self.interval = interval
+        self.thumb_width = thumb_width
+        self.columns = columns
+        self.max_thumbnails = max_thumbnails
+        self.quality = quality
+        self._decoder = FrameDecoder(thumb_width)
+
+        self._start: Optional[float] = None
+        self._thumb_size: Optional[Tuple[int, int]] = None
+        self._thumbnails: List[np.ndarray] = []
+        self._slots: List[int] = []  # Thumbnail i shows time slots[i] * interval
+        self.frame_count = 0
+
+    def add_frame(self, jpeg: bytes, timestamp: float):
+        """Consider a (jpeg, capture timestamp in seconds) frame, oldest first"""
+        self.frame_count += 1
+        if self._start is None:
+            self._start = timestamp
+        slot = int((timestamp - self._start) // self.interval)
+        if self._slots and slot <= self._slots[-1]:
+            return
+
+        frame, _ = self._decoder.decode(np.frombuffer(jpeg, dtype=np.uint8))
+        if frame is None:
+            return
+        if self._thumb_size is None:
+            height, width = frame.shape[:2]
+            self._thumb_size = (self.thumb_width, max(1, round(height * self.thumb_width / width)))
+        self._thumbnails.append(cv2.resize(frame, self._thumb_size, interpolation=cv2.INTER_AREA))
+        self._slots.append(slot)
+
+        if len(self._thumbnails) >= self.max_thumbnails:
+            self.interval *= 2
+            keep = [i for i, kept_slot in enumerate(self._slots) if kept_slot % 2 == 0]
+            self._thumbnails = [self._thumbnails[i] for i in keep]
+            self._slots = [self._slots[i] // 2 for i in keep]
+
+    def build(self) -> Optional[Tuple[bytes, Dict]]:
+        """The sprite JPEG and its index, or None if no thumbnail was taken"""
+        if not self._thumbnails:
+            return None
+
+        width, height = self._thumb_size
+        rows = -(-len(self._thumbnails) // self.columns)
+        columns = min(self.columns, len(self._thumbnails))
+        sprite = np.zeros((rows * height, columns * width, 3), dtype=np.uint8)
+        for i, thumbnail in enumerate(self._thumbnails):
+            row, column = divmod(i, self.columns)
+            sprite[row * height:(row + 1) * height, column * width:(column + 1) * width] = thumbnail
+
+        _, encoded = cv2.imencode(".jpg", sprite, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        index = {
+            "interval": self.interval,
+            "thumb_width": width,
+            "thumb_height": height,
+            "columns": columns,
+            "count": len(self._thumbnails),
+            "offsets": [slot * self.interval for slot in self._slots],
+            "frame_count": self.frame_count
+        }
+        return encoded.tobytes(), index
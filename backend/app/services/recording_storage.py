@@ -1,14 +1,28 @@
 from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
 from bson import ObjectId
+import asyncio
 import base64
+import os
 
 class RecordingStorage:
-    def __init__(self, mongodb_url: str, database_name: str):
-        self.client = AsyncIOMotorClient(mongodb_url)
-        self.db = self.client[database_name]
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
         self.recordings = self.db.recordings
         self.chunks = self.db.recording_chunks
+        # One thumbnail sprite and index per session
+        self.previews = self.db.recording_previews
+        self._videos: Optional[AsyncIOMotorGridFSBucket] = None
+
+    @property
+    def videos(self) -> AsyncIOMotorGridFSBucket:
+        """GridFS bucket of encoded session videos. Created on first use: a
+        bucket ties the client to the current event loop, which at import
+        time isn't the one the app will run on"""
+        if self._videos is None:
+            self._videos = AsyncIOMotorGridFSBucket(self.db, bucket_name="session_videos")
+        return self._videos
         
     async def start_recording(self, session_id: str) -> str:
         """Initialize a new recording entry"""
@@ -75,13 +89,9 @@ class RecordingStorage:
         }
     
     async def get_recording_chunks(self, recording_id: str, chunk_type: str = None):
-        """Retrieve all chunks for a recording in order"""
-        query = {"recording_id": ObjectId(recording_id)}
-        if chunk_type:
-            query["type"] = chunk_type
-            
+        """Retrieve all chunks for a recording in order, base64 encoded"""
         chunks = []
-        async for chunk in self.chunks.find(query).sort("timestamp"):
+        async for chunk in self.iter_recording_chunks(recording_id, chunk_type):
             chunks.append({
                 "id": str(chunk["_id"]),
                 "type": chunk["type"],
@@ -90,6 +100,38 @@ class RecordingStorage:
             })
             
         return chunks
+
+    def iter_recording_chunks(
+        self,
+        recording_id: str,
+        chunk_type: str = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        fields: Iterable[str] = ("type", "data", "timestamp"),
+        batch_size: int = 64
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield a recording's chunk documents in time order, with raw bytes in
+        "data". Only `fields` (plus _id) are fetched, `batch_size` documents
+        per round trip, optionally limited to start_time <= timestamp < end_time.
+        """
+        query = {"recording_id": ObjectId(recording_id)}
+        if chunk_type:
+            query["type"] = chunk_type
+        return self._iter_chunks(query, "timestamp", start_time, end_time, fields, batch_size)
+
+    async def _iter_chunks(self, query, sort_field, start_time, end_time, fields, batch_size):
+        time_range = {}
+        if start_time is not None:
+            time_range["$gte"] = start_time
+        if end_time is not None:
+            time_range["$lt"] = end_time
+        if time_range:
+            query = {**query, "timestamp": time_range}
+
+        cursor = self.chunks.find(query, {field: 1 for field in fields})
+        async for chunk in cursor.sort(sort_field, 1).batch_size(batch_size):
+            yield chunk
     
     async def delete_recording(self, recording_id: str):
         """Delete a recording and its chunks"""
@@ -98,28 +140,126 @@ class RecordingStorage:
         # Delete recording document
         await self.recordings.delete_one({"_id": ObjectId(recording_id)})
     
-    async def store_frame(self, session_id: str, frame_data: bytes, timestamp: float):
-        """Store a video frame"""
-        try:
-            chunk_doc = {
+    async def store_frames(self, session_id: str, frames: List[Tuple[bytes, float, int]]):
+        """Store a batch of (jpeg, timestamp, order) video frames in one round trip"""
+        await self.chunks.insert_many(
+            [
+                {
+                    "session_id": session_id,
+                    "timestamp": timestamp,
+                    "type": "video",
+                    "data": frame_data,
+                    "order": order
+                }
+                for frame_data, timestamp, order in frames
+            ],
+            ordered=False
+        )
+
+    async def store_session_video(self, session_id: str, path: str, content_type: str):
+        """Upload an encoded session video file to GridFS"""
+        extension = os.path.splitext(path)[1]
+        grid_in = self.videos.open_upload_stream(
+            f"{session_id}{extension}",
+            metadata={"session_id": session_id, "content_type": content_type}
+        )
+        with open(path, "rb") as video_file:
+            while True:
+                block = await asyncio.to_thread(video_file.read, 1024 * 1024)
+                if not block:
+                    break
+                await grid_in.write(block)
+        await grid_in.close()
+        return grid_in._id
+
+    async def store_preview(self, session_id: str, sprite: bytes, index: Dict):
+        """Store (or replace) a session's thumbnail sprite and its index"""
+        await self.previews.replace_one(
+            {"session_id": session_id},
+            {
                 "session_id": session_id,
-                "timestamp": timestamp,
-                "type": "video",
-                "data": frame_data,
-                "order": int(timestamp * 30)  # Assume 30fps for ordering
-            }
-            await self.chunks.insert_one(chunk_doc)
-        except Exception as e:
-            logger.error(f"Failed to store frame: {e}")
+                "created_at": datetime.utcnow(),
+                "sprite_size": len(sprite),
+                **index,
+                "sprite": sprite
+            },
+            upsert=True
+        )
 
-    async def get_session_video(self, session_id: str) -> bytes:
-        """Get all video frames for a session in order"""
-        try:
-            chunks = await self.chunks.find(
-                {"session_id": session_id, "type": "video"}
-            ).sort("order", 1).to_list(length=None)
-            
-            return b''.join(chunk["data"] for chunk in chunks)
-        except Exception as e:
-            logger.error(f"Failed to get video: {e}")
-            return b''
+    async def get_session_history(
+        self,
+        user_id: str,
+        limit: int,
+        before: Optional[Tuple[datetime, ObjectId]] = None
+    ) -> List[Dict]:
+        """
+        A user's sessions, newest first, each with a summary of its latest
+        analysis, in one aggregation. `before` is the (start_time, _id) of
+        the last session on the previous page; paging by key rather than
+        skip keeps deep pages as cheap as the first.
+        """
+        match = {"user_id": user_id}
+        if before is not None:
+            start_time, document_id = before
+            match["$or"] = [
+                {"start_time": {"$lt": start_time}},
+                {"start_time": start_time, "_id": {"$lt": document_id}}
+            ]
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"start_time": -1, "_id": -1}},
+            {"$limit": limit},
+            {"$lookup": {
+                "from": self.db.interview_analyses.name,
+                "localField": "session_id",
+                "foreignField": "session_id",
+                "pipeline": [
+                    {"$sort": {"timestamp": -1}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 0, "overall_metrics": 1, "timestamp": 1}}
+                ],
+                "as": "latest_analysis"
+            }},
+            {"$project": {
+                "session_id": 1,
+                "start_time": 1,
+                "end_time": 1,
+                "duration": 1,
+                "status": 1,
+                "latest_analysis": {"$first": "$latest_analysis"}
+            }}
+        ]
+        return await self.recordings.aggregate(pipeline).to_list(length=limit)
+
+    async def get_preview_index(self, session_id: str) -> Optional[Dict]:
+        """A session's preview index, without the sprite image"""
+        return await self.previews.find_one({"session_id": session_id}, {"sprite": 0})
+
+    async def get_preview_sprite(self, session_id: str) -> Optional[Dict]:
+        """A session's sprite image with its id and creation time"""
+        return await self.previews.find_one({"session_id": session_id}, {"sprite": 1, "created_at": 1})
+
+    async def open_session_video(self, session_id: str):
+        """Latest encoded video for a session as an open GridOut, or None"""
+        cursor = self.videos.find({"metadata.session_id": session_id}).sort("uploadDate", -1).limit(1)
+        async for video in cursor:
+            return await self.videos.open_download_stream(video._id)
+        return None
+
+    async def iter_video_range(
+        self,
+        grid_out,
+        start: int = 0,
+        end: Optional[int] = None,
+        block_size: int = 256 * 1024
+    ) -> AsyncIterator[bytes]:
+        """Yield bytes start..end (inclusive) of an open video, one block at a time"""
+        end = grid_out.length - 1 if end is None else end
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = await grid_out.read(min(block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.services.video_encoder import SessionVideoEncoder
+from app.services.preview_builder import PreviewBuilder
+
+logger = logging.getLogger(__name__)
+
+# Queue marker asking the writer to write its partial batch immediately
+_FLUSH = object()
+
+class RecordingWriter:
+    """
+    Write-behind persistence of one session's recorded frames.
+
+    Frames are queued as they arrive and a background task writes them with
+    insert_many, in batches capped by frame count and payload bytes. A batch
+    is written once it is full or `flush_interval` seconds after its first
+    frame, so by the time a session ends only the last partial batch is left.
+    The queue is bounded: if storage falls that far behind, new frames are
+    dropped (and counted) rather than stalling the live connection.
+
+    With video_fps > 0, each batch is also fed to a SessionVideoEncoder in a
+    worker thread, and the finished video is stored when the writer closes.
+    Likewise with preview_interval > 0 for the thumbnail sprite of a
+    PreviewBuilder.
+    """
+
+    def __init__(
+        self,
+        recording_storage,
+        session_id: str,
+        max_queue_frames: int = 600,
+        batch_frames: int = 50,
+        batch_bytes: int = 4 * 1024 * 1024,
+        flush_interval: float = 1.0,
+        video_fps: float = 0,
+        video_codec: str = "VP80",
+        video_max_width: Optional[int] = 640,
+        preview_interval: float = 0,
+        preview_width: int = 160
+    ):
+        self.recording_storage = recording_storage
+        self.session_id = session_id
+        self.batch_frames = batch_frames
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+
+        self.encoder = SessionVideoEncoder(
+            video_fps, video_codec, video_max_width
+        ) if video_fps > 0 else None
+        self.preview = PreviewBuilder(preview_interval, preview_width) if preview_interval > 0 else None
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_frames)
+        self._task: Optional[asyncio.Task] = None
+        self._next_order = 0
+        self.written_frames = 0
+        self.dropped_frames = 0
+        self.failed_frames = 0
+        self.batches = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, jpeg: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """Queue a frame for writing; returns False if it had to be dropped"""
+        try:
+            self._queue.put_nowait((
+                bytes(jpeg),
+                time.time() if timestamp is None else timestamp,
+                self._next_order
+            ))
+        except asyncio.QueueFull:
+            self.dropped_frames += 1
+            if self.dropped_frames % 100 == 1:
+                logger.warning(f"Recording queue full for session {self.session_id}, dropped {self.dropped_frames} frames")
+            return False
+        self._next_order += 1
+        return True
+
+    async def flush(self):
+        """Wait until every frame submitted so far has been written"""
+        if self._task is None:
+            return
+        await self._queue.put(_FLUSH)
+        await self._queue.join()
+
+    async def close(self):
+        """Write whatever is left, store the encoded video and stop the background task"""
+        if self._task is None:
+            return
+        await self.flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.encoder is not None:
+            await self._store_video()
+        if self.preview is not None:
+            await self._store_preview()
+        logger.info(f"Recording writer for session {self.session_id} closed: {self.stats()}")
+
+    def stats(self) -> Dict:
+        return {
+            "written_frames": self.written_frames,
+            "dropped_frames": self.dropped_frames,
+            "failed_frames": self.failed_frames,
+            "batches": self.batches
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            batch, batch_size, taken = [], 0, 1
+            deadline = loop.time() + self.flush_interval
+
+            # Linger until the batch is full, the interval is up or a flush is requested
+            while item is not _FLUSH:
+                batch.append(item)
+                batch_size += len(item[0])
+                if len(batch) >= self.batch_frames or batch_size >= self.batch_bytes:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                taken += 1
+
+            try:
+                if batch:
+                    await asyncio.gather(self._write(batch), self._encode(batch))
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    async def _encode(self, batch):
+        frames = [(jpeg, timestamp) for jpeg, timestamp, _ in batch]
+        if self.encoder is not None:
+            try:
+                await asyncio.to_thread(self.encoder.add_frames, frames)
+            except Exception as e:
+                logger.error(f"Video encoding failed for session {self.session_id}, continuing without video: {e}")
+                self.encoder.discard()
+                self.encoder = None
+        if self.preview is not None:
+            try:
+                await asyncio.to_thread(self._add_preview_frames, frames)
+            except Exception as e:
+                logger.error(f"Preview failed for session {self.session_id}, continuing without it: {e}")
+                self.preview = None
+
+    def _add_preview_frames(self, frames):
+        for jpeg, timestamp in frames:
+            self.preview.add_frame(jpeg, timestamp)
+
+    async def _store_preview(self):
+        try:
+            built = await asyncio.to_thread(self.preview.build)
+            if built:
+                sprite, index = built
+                await self.recording_storage.store_preview(self.session_id, sprite, index)
+        except Exception as e:
+            logger.error(f"Failed to store preview for session {self.session_id}: {e}")
+
+    async def _store_video(self):
+        try:
+            path = await asyncio.to_thread(self.encoder.finish)
+            if path:
+                await self.recording_storage.store_session_video(
+                    self.session_id, path, self.encoder.media_type
+                )
+                logger.info(
+                    f"Stored {self.encoder.frames_written} frame video for session {self.session_id}"
+                )
+        except Exception as e:
+            logger.error(f"Failed to store video for session {self.session_id}: {e}")
+        finally:
+            self.encoder.discard()
+
+    async def _write(self, batch):
+        try:
+            await self.recording_storage.store_frames(self.session_id, batch)
+            self.written_frames += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed_frames += len(batch)
+            logger.error(f"Failed to write {len(batch)} frames for session {self.session_id}: {e}")
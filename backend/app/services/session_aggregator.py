@@ -0,0 +1,90 @@
+from typing import Dict
+
+import numpy as np
+from pydantic import BaseModel
+
+class VideoAnalysisSummary(BaseModel):
+    eye_contact_score: float = 0.0
+    posture_score: float = 0.0
+    sentiment_score: float = 0.0
+    frame_count: int = 0
+
+# Bit flags packed into one byte per frame of the rolling window
+CENTERED = 1
+GOOD_POSTURE = 2
+POSITIVE = 4
+FLAGS = (CENTERED, GOOD_POSTURE, POSITIVE)
+
+class SessionAggregator:
+    """
+    Incremental replacement for keeping every frame's feedback dict.
+
+    Whole-session scores come from running counters, and the most recent
+    `window` frames are kept as one byte each in a ring buffer, so both
+    summaries cost O(1) per frame and O(1) per read regardless of session
+    length.
+    """
+
+    def __init__(self, window: int = 300):
+        self.window = window
+        self._ring = np.zeros(window, dtype=np.uint8)
+        self.reset()
+
+    def reset(self):
+        self.frame_count = 0
+        self._totals = dict.fromkeys(FLAGS, 0)
+        self._window_totals = dict.fromkeys(FLAGS, 0)
+        self._ring_pos = 0
+        self._ring_filled = 0
+
+    def add(self, feedback: Dict):
+        """Count one frame of real-time feedback"""
+        flags = 0
+        if feedback.get("attention_status") == "centered":
+            flags |= CENTERED
+        if feedback.get("attention_status") != "poor posture":
+            flags |= GOOD_POSTURE
+        if feedback.get("sentiment") == "positive":
+            flags |= POSITIVE
+
+        self.frame_count += 1
+        if self._ring_filled == self.window:
+            evicted = int(self._ring[self._ring_pos])
+            for flag in FLAGS:
+                if evicted & flag:
+                    self._window_totals[flag] -= 1
+        else:
+            self._ring_filled += 1
+
+        self._ring[self._ring_pos] = flags
+        self._ring_pos = (self._ring_pos + 1) % self.window
+        for flag in FLAGS:
+            if flags & flag:
+                self._totals[flag] += 1
+                self._window_totals[flag] += 1
+
+    def summary(self) -> VideoAnalysisSummary:
+        """Scores over the whole session so far"""
+        return self._summarize(self._totals, self.frame_count)
+
+    def window_summary(self) -> VideoAnalysisSummary:
+        """Scores over the most recent `window` frames"""
+        return self._summarize(self._window_totals, self._ring_filled)
+
+    def snapshot(self) -> Dict:
+        """Mid-session view for live dashboards"""
+        return {
+            "session": self.summary().dict(),
+            "recent": self.window_summary().dict(),
+            "window_frames": self.window
+        }
+
+    def _summarize(self, totals: Dict[int, int], frame_count: int) -> VideoAnalysisSummary:
+        if frame_count == 0:
+            return VideoAnalysisSummary()
+        return VideoAnalysisSummary(
+            eye_contact_score=round(totals[CENTERED] / frame_count * 100, 1),
+            posture_score=round(totals[GOOD_POSTURE] / frame_count * 100, 1),
+            sentiment_score=round(totals[POSITIVE] / frame_count * 100, 1),
+            frame_count=frame_count
+        )
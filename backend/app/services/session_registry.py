@@ -0,0 +1,380 @@
+import asyncio
+import base64
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from app.services.video_processor import VideoProcessor, VideoAnalysisSummary
+from app.services.analysis_profiles import get_profile
+from app.services.speech_analyzer import SpeechAnalyzer
+from app.services.frame_decoder import FrameDecoder
+from app.services.recording_writer import RecordingWriter
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisManager:
+    """Per-session analysis state: one VideoProcessor and the frames recorded so far"""
+
+    def __init__(
+        self,
+        session_id: str,
+        video_processor: VideoProcessor,
+        speech_analyzer: Optional[SpeechAnalyzer],
+        max_recorded_frames: int,
+        recording_writer: Optional[RecordingWriter] = None
+    ):
+        self.session_id = session_id
+        self.video_processor = video_processor
+        self.speech_analyzer = speech_analyzer
+        # With a writer, frames are persisted as they arrive; without one
+        # they are kept in memory until the session is ended
+        self.recording_writer = recording_writer
+        # Decode no larger than the profile's inference input
+        self.frame_decoder = FrameDecoder(video_processor.profile.max_input_width)
+        # Oldest frames fall off once the cap is reached
+        self.recorded_frames = deque(maxlen=max_recorded_frames)
+        self.last_activity = time.monotonic()
+        # Open WebSocket connections using this session; while any are
+        # attached the session is never reaped or released under them
+        self.connections = 0
+        self.release_pending = False
+
+    def touch(self):
+        """Mark the session as active"""
+        self.last_activity = time.monotonic()
+
+    def record_frame(self, jpeg: np.ndarray, timestamp_ms: Optional[float] = None):
+        """Keep a received frame for the session recording"""
+        self.touch()
+        if self.recording_writer is not None:
+            self.recording_writer.submit(jpeg, timestamp_ms / 1000 if timestamp_ms is not None else None)
+        else:
+            self.recorded_frames.append(jpeg)
+
+    async def flush_recording(self):
+        """Wait until every frame recorded so far is persisted"""
+        if self.recording_writer is not None:
+            await self.recording_writer.flush()
+
+    async def process_jpeg(self, jpeg: np.ndarray, timestamp_ms: Optional[float] = None):
+        """
+        Decode raw JPEG bytes (a uint8 array, usually a view into the received
+        WebSocket message), pass to VideoProcessor, return real-time feedback.
+        Recording is separate, see record_frame.
+        """
+        self.touch()
+        try:
+            frame, scale = self.frame_decoder.decode(jpeg)
+
+            if frame is None:
+                return {
+                    "face_detected": False,
+                    "attention_status": "error",
+                    "sentiment": "neutral"
+                }
+
+            timestamp = timestamp_ms / 1000 if timestamp_ms is not None else None
+            feedback = await self.video_processor.get_realtime_feedback(frame, timestamp, scale)
+            return feedback
+
+        except Exception as e:
+            logger.error(f"Error processing frame in session {self.session_id}: {e}")
+            return {
+                "face_detected": False,
+                "attention_status": "error",
+                "sentiment": "neutral"
+            }
+
+    async def process_audio(self, audio_data: Union[str, bytes]):
+        """Process and analyze audio chunk (base64 text or raw bytes)"""
+        self.touch()
+        try:
+            if self.speech_analyzer is None:
+                raise ValueError("Speech analyzer is not configured")
+
+            if isinstance(audio_data, str):
+                # Get base64 data
+                encoded_data = audio_data.split(',')[1] if ',' in audio_data else audio_data
+
+                # Convert to binary
+                audio_binary = base64.b64decode(encoded_data)
+            else:
+                audio_binary = bytes(audio_data)
+
+            # Get real-time feedback
+            feedback = await self.speech_analyzer.get_realtime_feedback(audio_binary)
+            return feedback
+
+        except Exception as e:
+            logger.error(f"Error processing audio in session {self.session_id}: {e}")
+            return {
+                "text": "",
+                "is_filler_word": False,
+                "confidence": None
+            }
+
+    async def get_recorded_frames(self) -> List[bytes]:
+        """Get the frames kept in memory (none when a recording writer is used) as JPEG bytes"""
+        return [bytes(frame) for frame in self.recorded_frames]
+
+    async def clear_frames(self):
+        """Clear stored frames"""
+        self.recorded_frames.clear()
+
+    async def get_session_summary(self):
+        """Get summary of the entire session"""
+        video_summary = await self.video_processor.get_session_summary()
+        return {
+            "video_metrics": video_summary.dict()
+        }
+
+    async def get_session_snapshot(self):
+        """Live view of the session's scores so far"""
+        return {
+            "session_id": self.session_id,
+            "video_metrics": await self.video_processor.get_session_snapshot()
+        }
+
+
+class SessionRegistry:
+    """
+    Maps session ids to their AnalysisManager. VideoProcessors are pre-warmed
+    into a pool at startup and returned to it when a session is released, so
+    a new connection never pays the FaceMesh graph start-up cost.
+
+    Processors are pooled per analysis profile; only the default profile is
+    pre-warmed, other profiles are created on first use and pooled after.
+
+    WebSocket handlers attach() to a session and detach() when they close.
+    Idle reaping skips attached sessions, and release() of an attached
+    session is deferred until the last connection detaches.
+
+    finalize() releases a session in the background: closing its recording
+    writer encodes and uploads the video and preview, which can take a
+    while for long sessions. is_finalizing() reports whether that is done.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 4,
+        idle_timeout: float = 300,
+        reap_interval: float = 30,
+        max_recorded_frames: int = 18000,
+        summary_window: int = 300,
+        default_profile: str = "balanced",
+        motion_threshold: float = 4.0,
+        roi_padding: float = 0.5,
+        inference_pool=None,
+        recording_storage=None,
+        recording_options: Optional[Dict] = None
+    ):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self.max_recorded_frames = max_recorded_frames
+        self.summary_window = summary_window
+        self.default_profile = get_profile(default_profile).name
+        self.motion_threshold = motion_threshold
+        self.roi_padding = roi_padding
+        self.inference_pool = inference_pool
+        # Frames are persisted by a per-session RecordingWriter when storage is given
+        self.recording_storage = recording_storage
+        self.recording_options = recording_options or {}
+
+        self.sessions: Dict[str, AnalysisManager] = {}
+        self._idle_processors: Dict[str, List[VideoProcessor]] = {}
+        self._speech_analyzer: Optional[SpeechAnalyzer] = None
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._finalizing: Dict[str, asyncio.Task] = {}
+
+    async def start(self):
+        """Pre-warm the processor pool and start reaping idle sessions"""
+        idle = self._idle_processors.setdefault(self.default_profile, [])
+        while len(idle) < self.pool_size:
+            idle.append(self._create_processor(self.default_profile))
+        logger.info(f"Pre-warmed {len(idle)} '{self.default_profile}' video processors")
+
+        if self._reaper_task is None:
+            self._reaper_task = asyncio.create_task(self._reap_idle_sessions())
+
+    async def stop(self):
+        """Stop the reaper and release every session and pooled processor"""
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            try:
+                await self._reaper_task
+            except asyncio.CancelledError:
+                pass
+            self._reaper_task = None
+
+        if self._finalizing:
+            await asyncio.gather(*self._finalizing.values(), return_exceptions=True)
+        for session_id in list(self.sessions):
+            await self._release(session_id)
+        for idle in self._idle_processors.values():
+            for processor in idle:
+                processor.close()
+        self._idle_processors = {}
+
+    def acquire(self, session_id: str, profile: Optional[str] = None) -> AnalysisManager:
+        """
+        Return the session's manager, creating it on first use with the given
+        analysis profile (the default one if None). An existing session keeps
+        the profile it was created with. Raises ValueError for unknown profiles.
+        """
+        manager = self.sessions.get(session_id)
+        if manager is None:
+            profile = get_profile(profile or self.default_profile).name
+            idle = self._idle_processors.get(profile)
+            processor = idle.pop() if idle else self._create_processor(profile)
+            processor.session_id = session_id
+            recording_writer = None
+            if self.recording_storage is not None:
+                recording_writer = RecordingWriter(
+                    self.recording_storage, session_id, **self.recording_options
+                )
+                recording_writer.start()
+            manager = AnalysisManager(
+                session_id,
+                processor,
+                self._get_speech_analyzer(),
+                self.max_recorded_frames,
+                recording_writer
+            )
+            self.sessions[session_id] = manager
+            logger.info(
+                f"Opened analysis session {session_id} with profile '{profile}' "
+                f"({len(self.sessions)} active)"
+            )
+        manager.touch()
+        return manager
+
+    def attach(self, session_id: str, profile: Optional[str] = None) -> AnalysisManager:
+        """acquire() on behalf of a connection; pair with detach() when it closes"""
+        manager = self.acquire(session_id, profile)
+        manager.connections += 1
+        return manager
+
+    async def detach(self, session_id: str):
+        """
+        A connection closed. A release() deferred while it was open is
+        started in the background, see finalize().
+        """
+        manager = self.sessions.get(session_id)
+        if manager is None:
+            return
+        manager.connections = max(0, manager.connections - 1)
+        manager.touch()
+        if manager.connections == 0 and manager.release_pending:
+            self._release_in_background(session_id)
+
+    def get(self, session_id: str) -> Optional[AnalysisManager]:
+        """Look up a live session without creating one"""
+        return self.sessions.get(session_id)
+
+    async def release(self, session_id: str):
+        """
+        Drop a session and return its processor to the pool. If connections
+        are still attached, the release happens when the last one detaches.
+        """
+        manager = self.sessions.get(session_id)
+        if manager is None:
+            return
+        if manager.connections > 0:
+            manager.release_pending = True
+            logger.info(
+                f"Deferring release of analysis session {session_id} "
+                f"until {manager.connections} connection(s) close"
+            )
+            return
+        await self._release(session_id)
+
+    def finalize(self, session_id: str) -> bool:
+        """
+        release() in a background task, so callers don't wait for the
+        recording to be finished. Returns False if the session isn't live.
+        """
+        if session_id not in self.sessions:
+            return False
+        self._release_in_background(session_id)
+        return True
+
+    def is_finalizing(self, session_id: str) -> bool:
+        """
+        Whether a finalize()d session's recording is still being finished:
+        its release is deferred until connections close, or its writer is
+        still closing
+        """
+        manager = self.sessions.get(session_id)
+        return session_id in self._finalizing or (manager is not None and manager.release_pending)
+
+    def _release_in_background(self, session_id: str):
+        # Tracked until _release() returns, i.e. the video and preview are stored
+        if session_id not in self._finalizing:
+            self._finalizing[session_id] = asyncio.create_task(self._finalize(session_id))
+
+    async def _finalize(self, session_id: str):
+        try:
+            await self.release(session_id)
+        except Exception as e:
+            logger.error(f"Finalizing analysis session {session_id} failed: {e}")
+        finally:
+            self._finalizing.pop(session_id, None)
+
+    async def _release(self, session_id: str):
+        manager = self.sessions.pop(session_id, None)
+        if manager is None:
+            return
+
+        await manager.clear_frames()
+        if manager.recording_writer is not None:
+            await manager.recording_writer.close()
+        if self.inference_pool is not None:
+            await self.inference_pool.release(session_id)
+        processor = manager.video_processor
+        idle = self._idle_processors.setdefault(processor.profile.name, [])
+        if len(idle) < self.pool_size:
+            processor.reset()
+            idle.append(processor)
+        else:
+            processor.close()
+        logger.info(f"Released analysis session {session_id} ({len(self.sessions)} active)")
+
+    async def get_session_summary(self, session_id: str):
+        """Summary for a session, or empty metrics if it is no longer live"""
+        manager = self.get(session_id)
+        if manager is None:
+            logger.warning(f"No live analysis session for {session_id}")
+            return {"video_metrics": VideoAnalysisSummary().dict()}
+        return await manager.get_session_summary()
+
+    def _create_processor(self, profile: str) -> VideoProcessor:
+        return VideoProcessor(
+            self.inference_pool,
+            profile=profile,
+            summary_window=self.summary_window,
+            motion_threshold=self.motion_threshold,
+            roi_padding=self.roi_padding
+        )
+
+    def _get_speech_analyzer(self) -> Optional[SpeechAnalyzer]:
+        # SpeechAnalyzer is stateless, so every session shares one instance
+        if self._speech_analyzer is None:
+            try:
+                self._speech_analyzer = SpeechAnalyzer()
+            except ValueError as e:
+                logger.warning(f"Speech analyzer unavailable: {e}")
+        return self._speech_analyzer
+
+    async def _reap_idle_sessions(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            cutoff = time.monotonic() - self.idle_timeout
+            for session_id, manager in list(self.sessions.items()):
+                if manager.connections == 0 and manager.last_activity < cutoff:
+                    logger.info(f"Reaping idle analysis session {session_id}")
+                    await self.release(session_id)
@@ -4,11 +4,38 @@ from pydantic import BaseModel
 import os
 from dotenv import load_dotenv
 import math
+import logging
+import tempfile
 from datetime import datetime
 
+from app.core.config import get_settings
+from app.services.transcription_client import TranscriptionClient
+from app.services.transcript_cache import TranscriptCache
+
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# One pooled HTTP client, and one limit on concurrent jobs, for every analyzer
+transcription_client = TranscriptionClient(
+    settings.ASSEMBLY_AI_API_KEY,
+    max_concurrency=settings.TRANSCRIPTION_CONCURRENCY,
+    request_timeout=settings.TRANSCRIPTION_REQUEST_TIMEOUT_SECONDS,
+    upload_timeout=settings.TRANSCRIPTION_UPLOAD_TIMEOUT_SECONDS,
+    poll_interval=settings.TRANSCRIPTION_POLL_INTERVAL_SECONDS,
+    job_timeout=settings.TRANSCRIPTION_JOB_TIMEOUT_SECONDS
+)
+
+# Finished transcripts by audio content and options, so re-analysing the same
+# audio is scored locally instead of transcribed again
+transcript_cache = TranscriptCache(
+    settings.TRANSCRIPT_CACHE_DIR or os.path.join(tempfile.gettempdir(), "intreview", "transcripts"),
+    settings.TRANSCRIPT_CACHE_MAX_BYTES
+) if settings.TRANSCRIPT_CACHE_MAX_BYTES > 0 else None
+
 class SpeechMetrics(BaseModel):
     words_per_minute: float = 0.0
     filler_word_count: int = 0
@@ -28,13 +55,17 @@ class SpeechMetrics(BaseModel):
     interview_date: str = ""
 
 class SpeechAnalyzer:
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[TranscriptionClient] = None,
+        cache: Optional[TranscriptCache] = None
+    ):
         api_key = os.getenv('ASSEMBLY_AI_API_KEY')
         if not api_key:
             raise ValueError("ASSEMBLY_AI_API_KEY not found in environment variables")
 
-        # Set the API key globally for the aai client
-        aai.settings.api_key = api_key
+        self.transcription_client = client or transcription_client
+        self.transcript_cache = cache if cache is not None else transcript_cache
 
         # Single-word fillers
         self.single_word_fillers = {
@@ -166,89 +197,116 @@ class SpeechAnalyzer:
             # Exponential decay for worse performances
             return max(0.2, math.exp(-fillers_per_minute/10))
 
-    async def analyze_speech(self, audio_file) -> SpeechMetrics:
+    def transcription_config(self) -> aai.TranscriptionConfig:
+        return aai.TranscriptionConfig(
+            speaker_labels=True,
+            word_boost=[
+                "um", "umm", "uh", "uhh", "ah", "ahh", "er", "erm",  # Non-lexical fillers
+                *sorted(self.single_word_fillers)  # Regular filler words, in a stable order
+            ],
+            content_safety=True,
+            speech_threshold=0.05,
+            format_text=False,
+            disfluencies=True
+        )
+
+    async def analyze_speech(self, audio_file, audio_digest: Optional[str] = None) -> SpeechMetrics:
         """
-        Analyze speech patterns, confidence, and metrics
+        Analyze speech patterns, confidence, and metrics. `audio_digest`
+        is the file's SHA-256 hex digest if the caller already has it
         """
         try:
-            # Get the transcript with detailed analysis
-            config = aai.TranscriptionConfig(
-                speaker_labels=True,
-                word_boost=[
-                    "um", "umm", "uh", "uhh", "ah", "ahh", "er", "erm",  # Non-lexical fillers
-                    *self.single_word_fillers  # Regular filler words
-                ],
-                content_safety=True,
-                speech_threshold=0.05,
-                format_text=False,
-                disfluencies=True
-            )
-
-            # Create transcriber and transcribe the file
-            transcriber = aai.Transcriber()
-            transcript = transcriber.transcribe(audio_file, config=config)
-
-            words = [word.text for word in transcript.words]
-
-            # Find filler words and phrases
-            filler_words = self.find_filler_phrases(words)
-
-            # Calculate words per minute
-            duration_minutes = transcript.audio_duration / 60
-            word_count = len(transcript.words)
-            wpm = word_count / duration_minutes if duration_minutes > 0 else 0
-
-            # Extract detailed confidence metrics
-            confidence_scores = [word.confidence for word in transcript.words]
-            word_durations = [word.end - word.start for word in transcript.words]
-
-            # Identify low confidence segments
-            low_confidence_segments = [
-                {
-                    "word": word.text,
-                    "confidence": word.confidence,
-                    "timestamp": word.start,
-                    "duration": word.end - word.start
-                }
-                for word in transcript.words if word.confidence < 0.4
-            ]
-
-            # Calculate metrics
-            weighted_confidence = self.calculate_weighted_confidence(confidence_scores, word_durations)
-            filler_word_ratio = len(filler_words) / len(words) if words else 0
-            filler_word_score = self.calculate_filler_word_score(len(filler_words), duration_minutes)
-            
-            # Updated speech intelligibility calculation with proper weighting
-            speech_intelligibility = (
-                weighted_confidence * 0.6 +  # Base confidence has higher weight
-                filler_word_score * 0.4      # Filler word score has lower weight
-            )
-
-            # Get current date and time
-            interview_date = datetime.now().isoformat()
-
-            return SpeechMetrics(
-                words_per_minute=wpm,
-                filler_word_count=len(filler_words),
-                speech_intelligibility=speech_intelligibility,
-                pronunciation_accuracy=0.0,  # Placeholder
-                articulation_enunciation=0.0,  # Placeholder
-                silent_pause_ratio=0.0,  # Placeholder
-                speech_intelligibility_score=speech_intelligibility,
-                confidence_scores=confidence_scores,
-                confidence=weighted_confidence,
-                low_confidence_segments=low_confidence_segments,
-                segment_confidences=[],  # Placeholder for future implementation
-                filler_words=filler_words,
-                raw_transcript=transcript.text,
-                words=words,
-                duration_minutes=duration_minutes,
-                interview_date=interview_date
+            config = self.transcription_config().raw.model_dump(exclude_none=True)
+            transcript = None
+            if self.transcript_cache is not None:
+                if audio_digest is None:
+                    audio_digest = await self.transcript_cache.file_digest(audio_file)
+                cache_key = self.transcript_cache.cache_key(audio_digest, config)
+                transcript = await self.transcript_cache.get(cache_key)
+
+            if transcript is None:
+                # Get the transcript with detailed analysis; the job is awaited,
+                # so other requests keep being served while AssemblyAI works
+                transcript = await self.transcription_client.transcribe(audio_file, config)
+                if self.transcript_cache is not None:
+                    try:
+                        await self.transcript_cache.put(cache_key, transcript)
+                    except OSError as e:
+                        logger.warning(f"Could not cache transcript: {e}")
+
+            return self.score_transcript(
+                transcript.get("text") or "",
+                transcript.get("words") or [],
+                transcript.get("audio_duration") or 0
             )
 
         except Exception as e:
             raise Exception(f"Speech analysis failed: {str(e)}")
 
+    def score_transcript(self, text: str, transcript_words: List[Dict], audio_duration: float) -> SpeechMetrics:
+        """
+        Speech metrics for a transcript: its text, its words as
+        {text, start, end, confidence} (times in ms) and the audio duration
+        in seconds
+        """
+        words = [word["text"] for word in transcript_words]
+
+        # Find filler words and phrases
+        filler_words = self.find_filler_phrases(words)
+
+        # Calculate words per minute
+        duration_minutes = audio_duration / 60
+        word_count = len(transcript_words)
+        wpm = word_count / duration_minutes if duration_minutes > 0 else 0
+
+        # Extract detailed confidence metrics
+        confidence_scores = [word["confidence"] for word in transcript_words]
+        word_durations = [word["end"] - word["start"] for word in transcript_words]
+
+        # Identify low confidence segments
+        low_confidence_segments = [
+            {
+                "word": word["text"],
+                "confidence": word["confidence"],
+                "timestamp": word["start"],
+                "duration": word["end"] - word["start"]
+            }
+            for word in transcript_words if word["confidence"] < 0.4
+        ]
+
+        # Calculate metrics
+        weighted_confidence = self.calculate_weighted_confidence(confidence_scores, word_durations)
+        filler_word_ratio = len(filler_words) / len(words) if words else 0
+        filler_word_score = self.calculate_filler_word_score(len(filler_words), duration_minutes)
+        
+        # Updated speech intelligibility calculation with proper weighting
+        speech_intelligibility = (
+            weighted_confidence * 0.6 +  # Base confidence has higher weight
+            filler_word_score * 0.4      # Filler word score has lower weight
+        )
+
+        # Get current date and time
+        interview_date = datetime.now().isoformat()
+
+        return SpeechMetrics(
+            words_per_minute=wpm,
+            filler_word_count=len(filler_words),
+            speech_intelligibility=speech_intelligibility,
+            pronunciation_accuracy=0.0,  # Placeholder
+            articulation_enunciation=0.0,  # Placeholder
+            silent_pause_ratio=0.0,  # Placeholder
+            speech_intelligibility_score=speech_intelligibility,
+            confidence_scores=confidence_scores,
+            confidence=weighted_confidence,
+            low_confidence_segments=low_confidence_segments,
+            segment_confidences=[],  # Placeholder for future implementation
+            filler_words=filler_words,
+            raw_transcript=text,
+            words=words,
+            duration_minutes=duration_minutes,
+            interview_date=interview_date
+        )
+
     async def analyze_sentiment(self, text: str) -> Dict:
         """
         Analyze the emotional tone and sentiment of the speech
@@ -308,19 +366,16 @@ class SpeechAnalyzer:
         Process audio chunks in real-time for immediate feedback
         """
         try:
-            transcriber = aai.Transcriber()
-            transcript = transcriber.transcribe(
+            transcript = await self.transcription_client.transcribe_bytes(
                 audio_chunk,
-                config=aai.TranscriptionConfig(
-                    word_boost=list(self.filler_words),
-                    speech_threshold=0.2
-                )
+                {"word_boost": list(self.single_word_fillers), "speech_threshold": 0.2}
             )
+            text = transcript.get("text") or ""
 
             return {
-                "text": transcript.text,
-                "is_filler_word": any(word in transcript.text.lower() for word in self.filler_words),
-                "confidence": transcript.confidence if hasattr(transcript, 'confidence') else None
+                "text": text,
+                "is_filler_word": any(word in text.lower() for word in self.single_word_fillers),
+                "confidence": transcript.get("confidence")
             }
 
         except Exception as e:
@@ -0,0 +1,154 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the stored layout changes, so old entries are simply missed
+FORMAT_VERSION = 1
+
+class TranscriptCache:
+    """
+    Content-addressed, on-disk cache of finished transcripts.
+
+    Entries are keyed by the SHA-256 of the audio bytes plus the transcript
+    options, so re-analysing the same audio with the same options never
+    calls AssemblyAI again, whatever the file was called. Only what scoring
+    needs is kept (text, duration and the words as parallel columns),
+    gzip-compressed. Reads refresh an entry's mtime, and once the
+    directory grows past `max_bytes` the least recently used entries are
+    deleted down to 90% of it.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._total_bytes: Optional[int] = None
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(audio_digest: str, config: Dict) -> str:
+        options = json.dumps(config, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{FORMAT_VERSION}:{audio_digest}:{options}".encode()).hexdigest()
+
+    @staticmethod
+    async def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+        """SHA-256 of a file, read in a worker thread"""
+        def digest():
+            sha256 = hashlib.sha256()
+            with open(path, "rb") as audio_file:
+                for chunk in iter(lambda: audio_file.read(chunk_size), b""):
+                    sha256.update(chunk)
+            return sha256.hexdigest()
+        return await asyncio.to_thread(digest)
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """The cached transcript as {text, words, audio_duration}, or None"""
+        transcript = await asyncio.to_thread(self._read, key)
+        if transcript is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return transcript
+
+    async def put(self, key: str, transcript: Dict):
+        """Store a completed AssemblyAI transcript"""
+        async with self._lock:
+            await asyncio.to_thread(self._write, key, transcript)
+
+    def stats(self) -> Dict:
+        return {"hits": self.hits, "misses": self.misses, "bytes": self._total_bytes}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def _read(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as entry:
+                columns = json.load(entry)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable transcript cache entry {key}: {e}")
+            self._remove(path)
+            return None
+        return {
+            "text": columns["text"],
+            "audio_duration": columns["audio_duration"],
+            "words": [
+                {"text": text, "start": start, "end": end, "confidence": confidence}
+                for text, start, end, confidence in zip(
+                    columns["words"], columns["start"], columns["end"], columns["confidence"]
+                )
+            ]
+        }
+
+    def _write(self, key: str, transcript: Dict):
+        words: List[Dict] = transcript.get("words") or []
+        columns = {
+            "text": transcript.get("text") or "",
+            "audio_duration": transcript.get("audio_duration") or 0,
+            "words": [word["text"] for word in words],
+            "start": [word["start"] for word in words],
+            "end": [word["end"] for word in words],
+            "confidence": [round(word["confidence"], 4) for word in words],
+        }
+        data = gzip.compress(json.dumps(columns, separators=(",", ":")).encode())
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        # Write then rename, so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as entry:
+            entry.write(data)
+        os.replace(temp_path, path)
+
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        else:
+            self._total_bytes += len(data) - previous
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            evicted += 1
+        self._total_bytes = total
+        logger.info(f"Evicted {evicted} transcript cache entries, {total} bytes left")
+
+    def _entries(self):
+        """(path, size, mtime) of every entry"""
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json.gz"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+class TranscriptionError(Exception):
+    """A transcription job failed, was rejected or took too long"""
+
+class TranscriptionClient:
+    """
+    AssemblyAI transcription jobs over one pooled, asynchronous HTTP client.
+
+    transcribe() uploads a local audio file (transcribe_bytes() an in-memory
+    clip), submits a transcript job and polls it until it completes, awaiting throughout instead of blocking the
+    event loop. Every request has its own timeout, a whole job is bounded by
+    `job_timeout`, and at most `max_concurrency` jobs run at once across
+    the process; further callers wait their turn.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.assemblyai.com",
+        max_concurrency: int = 4,
+        max_connections: int = 10,
+        request_timeout: float = 30.0,
+        upload_timeout: float = 300.0,
+        poll_interval: float = 3.0,
+        job_timeout: float = 900.0,
+        upload_chunk_size: int = 1024 * 1024,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_connections = max_connections
+        self.request_timeout = request_timeout
+        self.upload_timeout = upload_timeout
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.upload_chunk_size = upload_chunk_size
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.running = 0
+        self.waiting = 0
+
+    async def transcribe(self, path: str, config: Optional[Dict] = None) -> Dict:
+        """
+        Transcribe a local audio file with the given transcript options
+        (API field names, e.g. {"disfluencies": True}). Returns the completed
+        transcript JSON: text, words (text/start/end/confidence, times in
+        ms), audio_duration (seconds), ...
+        """
+        if not isinstance(path, (str, os.PathLike)):
+            raise TypeError(f"transcribe() takes a file path, not {type(path).__name__}")
+        return await self._transcribe(lambda: self.upload(path), config)
+
+    async def transcribe_bytes(self, audio: bytes, config: Optional[Dict] = None) -> Dict:
+        """Like transcribe(), for audio already in memory (e.g. a streamed chunk)"""
+        return await self._transcribe(lambda: self.upload_bytes(audio), config)
+
+    async def _transcribe(self, upload: Callable[[], Awaitable[str]], config: Optional[Dict]) -> Dict:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            return await asyncio.wait_for(self._run_job(upload, config or {}), self.job_timeout)
+        except asyncio.TimeoutError:
+            raise TranscriptionError(f"Transcription took longer than {self.job_timeout:.0f}s")
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+
+    async def upload(self, path: str) -> str:
+        """Stream a local file to AssemblyAI's upload endpoint; returns its upload URL"""
+        return await self._upload(self._read_chunks(path))
+
+    async def upload_bytes(self, audio: bytes) -> str:
+        """Send in-memory audio to AssemblyAI's upload endpoint; returns its upload URL"""
+        return await self._upload(bytes(audio))
+
+    async def _upload(self, content) -> str:
+        response = await self._request(
+            "POST", "/v2/upload",
+            content=content,
+            headers={"Content-Type": "application/octet-stream"},
+            timeout=httpx.Timeout(self.request_timeout, write=self.upload_timeout)
+        )
+        return response["upload_url"]
+
+    async def submit(self, audio_url: str, config: Dict) -> str:
+        """Start a transcript job; returns its id"""
+        response = await self._request("POST", "/v2/transcript", json={**config, "audio_url": audio_url})
+        return response["id"]
+
+    async def wait(self, transcript_id: str) -> Dict:
+        """Poll a transcript job until it completes"""
+        while True:
+            transcript = await self._request("GET", f"/v2/transcript/{transcript_id}")
+            status = transcript.get("status")
+            if status == "completed":
+                return transcript
+            if status == "error":
+                raise TranscriptionError(f"Transcript {transcript_id} failed: {transcript.get('error')}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _run_job(self, upload: Callable[[], Awaitable[str]], config: Dict) -> Dict:
+        started = time.perf_counter()
+        audio_url = await upload()
+        transcript_id = await self.submit(audio_url, config)
+        transcript = await self.wait(transcript_id)
+        logger.info(f"Transcript {transcript_id} completed in {time.perf_counter() - started:.1f}s")
+        return transcript
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": self.api_key},
+                timeout=self.request_timeout,
+                limits=httpx.Limits(max_connections=self.max_connections),
+                transport=self._transport
+            )
+        try:
+            response = await self._client.request(method, path, **kwargs)
+            response.raise_for_status()
+        except httpx.TimeoutException as e:
+            raise TranscriptionError(f"AssemblyAI request timed out: {method} {path}") from e
+        except httpx.HTTPStatusError as e:
+            raise TranscriptionError(
+                f"AssemblyAI returned {e.response.status_code} for {method} {path}: {e.response.text[:200]}"
+            ) from e
+        except httpx.HTTPError as e:
+            raise TranscriptionError(f"AssemblyAI request failed: {method} {path}: {e}") from e
+        return response.json()
+
+    async def _read_chunks(self, path: str) -> AsyncIterator[bytes]:
+        with open(path, "rb") as audio_file:
+            while True:
+                chunk = await asyncio.to_thread(audio_file.read, self.upload_chunk_size)
+                if not chunk:
+                    break
+                yield chunk
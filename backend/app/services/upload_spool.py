@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+class UploadTooLarge(ValueError):
+    """The upload exceeded the spool's size cap"""
+
+class SpooledUpload:
+    """An upload copied to disk: its path, size and SHA-256 hex digest"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = 0
+        self.sha256: Optional[str] = None
+
+class UploadSpool:
+    """
+    Managed scratch area for uploaded files.
+
+    spool() copies an upload to a file in `directory` chunk by chunk, so it
+    never sits whole in memory, hashing it on the way. Uploads over
+    `max_upload_bytes` are cut off with UploadTooLarge. The file is deleted
+    when the `async with` block exits, however it exits, and
+    remove_stale() clears files left behind by a crashed process. stats()
+    reports the bytes this process is spooling and the size of the whole
+    directory, which other workers may share.
+
+    Several worker processes may share the directory, so remove_stale()
+    only deletes files untouched for `stale_after` seconds, never another
+    worker's in-flight upload.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_upload_bytes: int = 200 * 1024 * 1024,
+        chunk_size: int = 1024 * 1024,
+        stale_after: float = 3600
+    ):
+        self.directory = directory
+        self.max_upload_bytes = max_upload_bytes
+        self.chunk_size = chunk_size
+        self.stale_after = stale_after
+        self.spooling_bytes = 0
+        self.active = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def spool(self, upload: UploadFile, suffix: str = "") -> AsyncIterator[SpooledUpload]:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix=suffix)
+        spooled = SpooledUpload(path)
+        self.active += 1
+        try:
+            with os.fdopen(fd, "wb") as spool_file:
+                sha256 = hashlib.sha256()
+                while True:
+                    chunk = await upload.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    if spooled.size + len(chunk) > self.max_upload_bytes:
+                        self.rejected += 1
+                        raise UploadTooLarge(f"Upload exceeds {self.max_upload_bytes} bytes")
+                    sha256.update(chunk)
+                    await asyncio.to_thread(spool_file.write, chunk)
+                    spooled.size += len(chunk)
+                    self.spooling_bytes += len(chunk)
+            spooled.sha256 = sha256.hexdigest()
+            yield spooled
+        finally:
+            self.active -= 1
+            self.spooling_bytes -= spooled.size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def remove_stale(self) -> int:
+        """Delete files left by crashed processes: those older than `stale_after`"""
+        removed = 0
+        if not os.path.isdir(self.directory):
+            return removed
+        cutoff = time.time() - self.stale_after
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                try:
+                    if entry.stat().st_mtime >= cutoff:
+                        continue
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"Could not remove stale upload {entry.path}: {e}")
+        if removed:
+            logger.info(f"Removed {removed} stale uploads from {self.directory}")
+        return removed
+
+    def stats(self) -> Dict:
+        return {
+            "spooling_bytes": self.spooling_bytes,
+            "directory_bytes": self.directory_bytes(),
+            "active": self.active,
+            "rejected": self.rejected
+        }
+
+    def directory_bytes(self) -> int:
+        """Size of every file in the spool directory, from any process"""
+        total = 0
+        if not os.path.isdir(self.directory):
+            return total
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.is_file():
+                    total += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
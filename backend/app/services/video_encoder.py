@@ -0,0 +1,124 @@
+import logging
+import os
+import tempfile
+from typing import Iterable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.services.frame_decoder import FrameDecoder
+
+logger = logging.getLogger(__name__)
+
+# Container for each supported codec
+CODEC_EXTENSIONS = {
+    "VP80": ".webm",
+    "VP90": ".webm",
+    "mp4v": ".mp4",
+}
+
+CODEC_MEDIA_TYPES = {
+    ".webm": "video/webm",
+    ".mp4": "video/mp4",
+}
+
+class SessionVideoEncoder:
+    """
+    Encodes a session's JPEG frames into a compressed video file while the
+    session is live.
+
+    Frames arrive at a variable rate, so they are resampled to a constant
+    `fps` from their capture timestamps. A frame is repeated to fill gaps,
+    and when several frames land in one output slot only the last is kept.
+    Frames wider than `max_width` are scaled down (the encoder's bitrate
+    grows with the frame area). Not thread-safe: feed frames from one
+    thread at a time, in order.
+    """
+
+    # Longest gap filled by repeating a frame, so a clock jump can't balloon the file
+    MAX_GAP_SECONDS = 10
+
+    def __init__(
+        self,
+        fps: float = 10,
+        codec: str = "VP80",
+        max_width: Optional[int] = 640,
+        directory: Optional[str] = None
+    ):
+        if codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unsupported codec: {codec}")
+        self.fps = fps
+        self.codec = codec
+        self.max_width = max_width
+        self.directory = directory
+        self._decoder = FrameDecoder(max_width)
+
+        self.path: Optional[str] = None
+        self._writer: Optional[cv2.VideoWriter] = None
+        self._size: Optional[Tuple[int, int]] = None
+        self._start: Optional[float] = None
+        self._pending: Optional[np.ndarray] = None
+        self._pending_slot = 0
+        self.frames_written = 0
+
+    @property
+    def media_type(self) -> str:
+        return CODEC_MEDIA_TYPES[CODEC_EXTENSIONS[self.codec]]
+
+    def add_frames(self, frames: Iterable[Tuple[bytes, float]]):
+        """Add (jpeg, capture timestamp in seconds) frames, oldest first"""
+        for jpeg, timestamp in frames:
+            self.add_frame(jpeg, timestamp)
+
+    def add_frame(self, jpeg: bytes, timestamp: float):
+        frame, _ = self._decoder.decode(np.frombuffer(jpeg, dtype=np.uint8))
+        if frame is None:
+            return
+
+        if self._writer is None:
+            self._open(frame, timestamp)
+        if (frame.shape[1], frame.shape[0]) != self._size:
+            frame = cv2.resize(frame, self._size, interpolation=cv2.INTER_AREA)
+
+        slot = round((timestamp - self._start) * self.fps)
+        if slot > self._pending_slot:
+            # The pending frame covers every slot up to this one
+            repeats = min(slot - self._pending_slot, int(self.MAX_GAP_SECONDS * self.fps))
+            for _ in range(repeats):
+                self._writer.write(self._pending)
+            self.frames_written += repeats
+            self._pending_slot = slot
+        self._pending = frame
+
+    def finish(self) -> Optional[str]:
+        """Write the last frame and close the file; returns its path, or None if no frames came"""
+        if self._writer is None:
+            return None
+        self._writer.write(self._pending)
+        self.frames_written += 1
+        self._writer.release()
+        self._writer = None
+        return self.path
+
+    def discard(self):
+        """Close and delete the output file"""
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _open(self, frame: np.ndarray, timestamp: float):
+        fd, self.path = tempfile.mkstemp(suffix=CODEC_EXTENSIONS[self.codec], dir=self.directory)
+        os.close(fd)
+        height, width = frame.shape[:2]
+        if self.max_width and width > self.max_width:
+            height, width = round(height * self.max_width / width), self.max_width
+        # Even dimensions keep every codec's chroma subsampling happy
+        self._size = (width - width % 2, height - height % 2)
+        self._writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.codec), self.fps, self._size)
+        if not self._writer.isOpened():
+            self._writer = None
+            raise RuntimeError(f"Could not open {self.codec} video writer")
+        self._start = timestamp
+        self._pending_slot = 0
@@ -1,29 +1,67 @@
 import cv2
 import numpy as np
 import mediapipe as mp
-from typing import Dict, List, Tuple, Optional
-from pydantic import BaseModel
+from mediapipe.framework.formats import landmark_pb2
+from typing import Dict, List, Tuple, Optional, Union
 import logging
 
+from app.services.inference_worker import landmarks_to_array
+from app.services.session_aggregator import SessionAggregator, VideoAnalysisSummary
+from app.services.frame_metrics_store import FrameMetricsStore
+from app.services.motion_gate import MotionGate
+from app.services.analysis_profiles import AnalysisProfile, get_profile
+
 logger = logging.getLogger(__name__)
 
-# Move VideoAnalysisSummary class definition before VideoProcessor
-class VideoAnalysisSummary(BaseModel):
-    eye_contact_score: float = 0.0
-    posture_score: float = 0.0
-    sentiment_score: float = 0.0
-    frame_count: int = 0
+# Output modes: "metrics" only computes feedback; "annotated" also draws the
+# face mesh onto the frame for debug and preview consumers
+OUTPUT_METRICS = "metrics"
+OUTPUT_ANNOTATED = "annotated"
 
 class VideoProcessor:
-    def __init__(self):
+    def __init__(
+        self,
+        inference_pool=None,
+        profile: Union[str, AnalysisProfile] = "accurate",
+        output_mode: str = OUTPUT_METRICS,
+        summary_window: int = 300,
+        motion_threshold: float = 4.0,
+        roi_padding: float = 0.5
+    ):
+        if output_mode not in (OUTPUT_METRICS, OUTPUT_ANNOTATED):
+            raise ValueError(f"Unknown output mode: {output_mode}")
+        if isinstance(profile, str):
+            profile = get_profile(profile)
+        self.profile = profile
+
         self.mp_face_mesh = mp.solutions.face_mesh
         self.mp_drawing = mp.solutions.drawing_utils
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.3,
-            min_tracking_confidence=0.3
+        self.output_mode = output_mode
+
+        # With an inference pool, FaceMesh runs in a worker process keyed by
+        # session_id; otherwise it runs in-process (offline post-processing)
+        self.inference_pool = inference_pool
+        self.session_id: Optional[str] = None
+        self.face_mesh = None
+        if inference_pool is None:
+            self.face_mesh = self.mp_face_mesh.FaceMesh(**profile.face_mesh_options())
+
+        # Reuses tracked landmarks on near-identical frames; an interval of 1
+        # runs FaceMesh on every frame
+        self.motion_gate = MotionGate(
+            threshold=motion_threshold,
+            full_interval=profile.full_inference_interval
         )
+
+        # Face ROI: once a face is found, only a padded square around it is
+        # converted, scaled to at most roi_size and passed to FaceMesh.
+        # roi_size=None always uses the full frame.
+        self.roi_size = profile.roi_size
+        self.roi_padding = roi_padding
+        self._face_box: Optional[Tuple[int, int, int, int]] = None
+
+        # Reused outputs of the per-frame resize and colour conversion
+        self._buffers: Dict[str, np.ndarray] = {}
         
         # Key landmark indices
         # Mouth landmarks
@@ -44,18 +82,47 @@ class VideoProcessor:
         self.left_forehead = 71      # Point above left eyebrow
         self.right_forehead = 301    # Point above right eyebrow
         
-        self.frame_metrics = []  # Store metrics for final analysis
+        # Running scores are the one source for the summary and snapshots;
+        # the compact per-frame columns are only kept for timelines (see
+        # PostProcessor)
+        self.metrics_store = FrameMetricsStore()
+        self.aggregator = SessionAggregator(window=summary_window)
+
+    def reset(self):
+        """Clear per-session state so the processor can be reused by another session"""
+        self.metrics_store.clear()
+        self.aggregator.reset()
+        self.motion_gate.reset()
+        self._face_box = None
+        self.session_id = None
+        if self.face_mesh is not None:
+            self.face_mesh.reset()
+
+    def close(self):
+        """Release the underlying MediaPipe graph"""
+        if self.face_mesh is not None:
+            self.face_mesh.close()
+
+    async def detect_landmarks(self, frame_rgb: np.ndarray) -> Optional[np.ndarray]:
+        """Landmarks of the first face as an (N, 3) array of normalized x, y, z"""
+        if self.inference_pool is not None:
+            return await self.inference_pool.detect_landmarks(self.session_id, frame_rgb, self.profile.name)
+
+        results = self.face_mesh.process(frame_rgb)
+        if not results.multi_face_landmarks:
+            return None
+        return landmarks_to_array(results.multi_face_landmarks[0])
         
-    def analyze_sentiment(self, landmarks) -> str:
+    def analyze_sentiment(self, landmarks: np.ndarray) -> str:
         try:
             # Check smile first (mouth corners higher than center)
-            left = landmarks.landmark[self.left_mouth]
-            right = landmarks.landmark[self.right_mouth]
-            top = landmarks.landmark[self.top_mouth]
-            bottom = landmarks.landmark[self.bottom_mouth]
+            left = landmarks[self.left_mouth]
+            right = landmarks[self.right_mouth]
+            top = landmarks[self.top_mouth]
+            bottom = landmarks[self.bottom_mouth]
             
-            mouth_corners_y = (left.y + right.y) / 2
-            mouth_center_y = (top.y + bottom.y) / 2
+            mouth_corners_y = (left[1] + right[1]) / 2
+            mouth_center_y = (top[1] + bottom[1]) / 2
             mouth_difference = mouth_corners_y - mouth_center_y
             
             # Determine sentiment
@@ -67,15 +134,19 @@ class VideoProcessor:
         except Exception:
             return "neutral"
         
-    async def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, Dict]:
+    async def process_frame(self, frame: np.ndarray, output_mode: Optional[str] = None) -> Tuple[np.ndarray, Dict]:
+        """
+        Run landmark detection on a BGR frame. The frame is returned as-is in
+        metrics mode; in annotated mode the face mesh is drawn onto it.
+        """
+        annotate = (output_mode or self.output_mode) == OUTPUT_ANNOTATED
         try:
             if frame is None or frame.size == 0:
                 raise ValueError("Invalid frame provided")
 
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             frame_height, frame_width = frame.shape[:2]
             
-            results = self.face_mesh.process(frame_rgb)
+            face_landmarks = await self._gated_landmarks(frame)
             
             frame_metrics = {
                 "face_detected": False,
@@ -83,23 +154,15 @@ class VideoProcessor:
                 "sentiment": "neutral"
             }
             
-            if results.multi_face_landmarks:
-                face_landmarks = results.multi_face_landmarks[0]
+            if face_landmarks is not None:
                 frame_metrics["face_detected"] = True
                 
-                self.mp_drawing.draw_landmarks(
-                    image=frame,
-                    landmark_list=face_landmarks,
-                    connections=self.mp_face_mesh.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=self.mp_drawing.DrawingSpec(color=(0,255,0), thickness=1)
-                )
-                
-                nose_tip = face_landmarks.landmark[1]
-                face_center_x = int(nose_tip.x * frame_width)
-                face_center_y = int(nose_tip.y * frame_height)
+                nose_tip = face_landmarks[1]
+                face_center_x = int(nose_tip[0] * frame_width)
+                face_center_y = int(nose_tip[1] * frame_height)
                 
-                cv2.circle(frame, (face_center_x, face_center_y), 5, (0, 255, 0), -1)
+                if annotate:
+                    self.draw_annotations(frame, face_landmarks, (face_center_x, face_center_y))
                 
                 frame_center = (frame_width // 2, frame_height // 2)
                 frame_metrics["face_position"] = {
@@ -118,7 +181,113 @@ class VideoProcessor:
                 "sentiment": "neutral"
             }
             
-    async def get_realtime_feedback(self, frame: np.ndarray) -> Dict:
+    async def _gated_landmarks(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """Landmarks for a BGR frame, skipping FaceMesh when the motion gate allows"""
+        if not self.motion_gate.enabled:
+            return await self._infer_landmarks(frame)
+
+        gray = self.motion_gate.prepare(frame)
+        if not self.motion_gate.needs_inference(gray):
+            tracked, landmarks = self.motion_gate.track(gray)
+            if tracked:
+                return landmarks
+
+        landmarks = await self._infer_landmarks(frame)
+        self.motion_gate.record_inference(gray, landmarks)
+        return landmarks
+
+    async def _infer_landmarks(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """Run FaceMesh on the face ROI if one is known, else on the full frame"""
+        frame_height, frame_width = frame.shape[:2]
+
+        if self.roi_size and self._face_box is not None:
+            x0, y0, x1, y1 = self._face_box
+            roi = frame[y0:y1, x0:x1]
+            scale = min(1.0, self.roi_size / max(x1 - x0, y1 - y0))
+            if scale < 1.0:
+                roi = self._resize(roi, (round((x1 - x0) * scale), round((y1 - y0) * scale)), "roi")
+
+            landmarks = await self.detect_landmarks(self._to_rgb(roi, "roi_rgb"))
+            if landmarks is not None:
+                # ROI-normalized to frame-normalized coordinates
+                landmarks[:, 0] = (landmarks[:, 0] * (x1 - x0) + x0) / frame_width
+                landmarks[:, 1] = (landmarks[:, 1] * (y1 - y0) + y0) / frame_height
+                landmarks[:, 2] *= (x1 - x0) / frame_width
+                self._face_box = self._padded_face_box(landmarks, frame_width, frame_height)
+                return landmarks
+            # Tracking lost: look for the face in the whole frame
+
+        full_frame = frame
+        max_width = self.profile.max_input_width
+        if max_width and frame_width > max_width:
+            # Landmarks are normalized, so a smaller input needs no mapping back
+            full_frame = self._resize(
+                frame, (max_width, round(frame_height * max_width / frame_width)), "input"
+            )
+        landmarks = await self.detect_landmarks(self._to_rgb(full_frame, "rgb"))
+        self._face_box = (
+            self._padded_face_box(landmarks, frame_width, frame_height)
+            if self.roi_size and landmarks is not None else None
+        )
+        return landmarks
+
+    def _buffer(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        # Safe to reuse: a frame's inference finishes before the next one starts
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def _resize(self, image: np.ndarray, size: Tuple[int, int], name: str) -> np.ndarray:
+        width, height = size
+        return cv2.resize(
+            image, size, dst=self._buffer(name, (height, width, 3)), interpolation=cv2.INTER_AREA
+        )
+
+    def _to_rgb(self, image: np.ndarray, name: str) -> np.ndarray:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._buffer(name, image.shape))
+
+    def _padded_face_box(self, landmarks: np.ndarray, frame_width: int, frame_height: int) -> Tuple[int, int, int, int]:
+        """Square pixel box around the landmarks, padded and clipped to the frame"""
+        xs = landmarks[:, 0] * frame_width
+        ys = landmarks[:, 1] * frame_height
+        center_x = (xs.min() + xs.max()) / 2
+        center_y = (ys.min() + ys.max()) / 2
+        half = max(xs.max() - xs.min(), ys.max() - ys.min()) * (1 + 2 * self.roi_padding) / 2
+        return (
+            max(0, int(center_x - half)),
+            max(0, int(center_y - half)),
+            min(frame_width, int(center_x + half)),
+            min(frame_height, int(center_y + half))
+        )
+
+    def draw_annotations(self, frame: np.ndarray, face_landmarks: np.ndarray, face_center: Tuple[int, int]):
+        """Draw the face mesh tesselation and the nose tip onto the frame"""
+        self.mp_drawing.draw_landmarks(
+            image=frame,
+            landmark_list=self._to_landmark_list(face_landmarks),
+            connections=self.mp_face_mesh.FACEMESH_TESSELATION,
+            landmark_drawing_spec=None,
+            connection_drawing_spec=self.mp_drawing.DrawingSpec(color=(0,255,0), thickness=1)
+        )
+        cv2.circle(frame, face_center, 5, (0, 255, 0), -1)
+
+    def _to_landmark_list(self, landmarks: np.ndarray) -> landmark_pb2.NormalizedLandmarkList:
+        return landmark_pb2.NormalizedLandmarkList(landmark=[
+            landmark_pb2.NormalizedLandmark(x=x, y=y, z=z) for x, y, z in landmarks.tolist()
+        ])
+            
+    async def get_realtime_feedback(
+        self,
+        frame: np.ndarray,
+        timestamp: Optional[float] = None,
+        source_scale: int = 1
+    ) -> Dict:
+        """
+        Feedback for one frame; timestamp is the capture time in seconds
+        (defaults to now). A frame decoded at 1/source_scale of its original
+        size still reports face_position in original pixels.
+        """
         try:
             if frame is None or frame.size == 0:
                 return {
@@ -142,9 +311,13 @@ class VideoProcessor:
                 elif abs(pos["y"]) > frame.shape[0] * 0.2:
                     feedback["attention_status"] = "poor posture"
                     
-                feedback["face_position"] = pos
+                feedback["face_position"] = {
+                    "x": pos["x"] * source_scale,
+                    "y": pos["y"] * source_scale
+                }
                 
-            self.frame_metrics.append(feedback)
+            self.metrics_store.append(feedback, timestamp)
+            self.aggregator.add(feedback)
             return feedback
                 
         except Exception as e:
@@ -156,38 +329,15 @@ class VideoProcessor:
 
     async def get_session_summary(self) -> VideoAnalysisSummary:
         """Calculate overall metrics for the session"""
-        logger.info(f"Generating session summary from {len(self.frame_metrics)} frames")
+        logger.info(f"Generating session summary from {self.aggregator.frame_count} frames")
         
-        if not self.frame_metrics:
+        if not self.aggregator.frame_count:
             logger.warning("No frame metrics available for summary")
-            return VideoAnalysisSummary()
 
-        total_frames = len(self.frame_metrics)
-        
-        # Calculate eye contact score
-        centered_frames = sum(1 for m in self.frame_metrics 
-                            if m.get("attention_status") == "centered")
-        eye_contact = (centered_frames / total_frames) * 100 if total_frames > 0 else 0
-
-        # Calculate posture score
-        good_posture_frames = sum(1 for m in self.frame_metrics 
-                                if m.get("attention_status") != "poor posture")
-        posture_score = (good_posture_frames / total_frames) * 100 if total_frames > 0 else 0
-
-        # New sentiment calculation
-        positive_frames = sum(1 for m in self.frame_metrics 
-                            if m.get("sentiment") == "positive")
-        sentiment_ratio = (positive_frames / total_frames) if total_frames > 0 else 0
-        
-        # Convert ratio to a descriptive score (0-100 scale)
-        sentiment_score = sentiment_ratio * 100
-
-        summary = VideoAnalysisSummary(
-            eye_contact_score=round(eye_contact, 1),
-            posture_score=round(posture_score, 1),
-            sentiment_score=round(sentiment_score, 1),  # This will be used differently in frontend
-            frame_count=total_frames
-        )
-        
+        summary = self.aggregator.summary()
         logger.info(f"Generated summary: {summary}")
-        return summary
\ No newline at end of file
+        return summary
+
+    async def get_session_snapshot(self) -> Dict:
+        """Whole-session and recent-window scores, cheap enough to poll mid-session"""
+        return self.aggregator.snapshot()
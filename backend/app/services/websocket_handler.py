@@ -1,161 +1,281 @@
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, List
-import json
+from typing import Dict, Optional
 import asyncio
-from datetime import datetime
+import json
+import uuid
 import logging
 
-from app.services.video_processor import VideoProcessor
-from app.services.speech_analyzer import SpeechAnalyzer
-import cv2
-import numpy as np
-import base64
+from app.services.session_registry import SessionRegistry
+from app.services.inference_pool import InferencePool
+from app.services.recording_storage import RecordingStorage
+from app.services.analysis_profiles import all_face_mesh_options
+from app.services.frame_protocol import (
+    decode_message,
+    decode_legacy_frame,
+    ProtocolError,
+    MESSAGE_VIDEO,
+    MESSAGE_AUDIO
+)
+from app.services.frame_scheduler import FrameScheduler
+from app.core.config import get_settings
+from app.db.database import database
 
 logger = logging.getLogger(__name__)
 
-class AnalysisManager:
-    def __init__(self):
-        self.video_processor = VideoProcessor()
-        self.speech_analyzer = SpeechAnalyzer()
-        self.recorded_frames = []  # Store frames during recording
-
-    async def process_frame(self, frame_data: str):
-        """
-        Decode the incoming frame data (base64), pass to VideoProcessor,
-        return real-time feedback.
-        """
-        try:
-            # Decode and store frame
-            encoded_data = frame_data.split(',')[1] if ',' in frame_data else frame_data
-            frame_bytes = base64.b64decode(encoded_data)
-            self.recorded_frames.append(frame_bytes)
-
-            nparr = np.frombuffer(frame_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-            if frame is None:
-                return {
-                    "face_detected": False,
-                    "attention_status": "error",
-                    "sentiment": "neutral"
-                }
-
-            feedback = await self.video_processor.get_realtime_feedback(frame)
-            return feedback
-            
-        except Exception as e:
-            print(f"Error processing frame: {e}")
-            return {
-                "face_detected": False,
-                "attention_status": "error",
-                "sentiment": "neutral"
-            }
+settings = get_settings()
 
-    async def process_audio(self, audio_data: str):
-        """
-        Decode the incoming audio data (base64), pass to SpeechAnalyzer,
-        return real-time feedback (like filler words, partial transcript, etc.).
-        """
-        try:
-            encoded_data = audio_data.split(',')[1] if ',' in audio_data else audio_data
-            audio_binary = base64.b64decode(encoded_data)
+# FaceMesh runs in worker processes so frames never block the event loop
+inference_pool = InferencePool(
+    num_workers=settings.INFERENCE_WORKERS,
+    face_mesh_options=all_face_mesh_options(),
+    default_profile=settings.ANALYSIS_PROFILE,
+    threads_per_worker=settings.INFERENCE_THREADS_PER_WORKER,
+    prewarm_per_worker=settings.INFERENCE_PREWARM_PER_WORKER
+) if settings.INFERENCE_WORKERS > 0 else None
 
-            feedback = await self.speech_analyzer.get_realtime_feedback(audio_binary)
-            return feedback
-            
-        except Exception as e:
-            print(f"Error processing audio: {e}")
-            return {
-                "text": "",
-                "is_filler_word": False,
-                "confidence": None
-            }
+recording_storage = RecordingStorage(database.db)
+
+# One AnalysisManager per live session, handed out by the registry. Frames
+# are written to storage in batches while the session is live
+session_registry = SessionRegistry(
+    pool_size=settings.VIDEO_PROCESSOR_POOL_SIZE,
+    idle_timeout=settings.SESSION_IDLE_TIMEOUT_SECONDS,
+    reap_interval=settings.SESSION_REAP_INTERVAL_SECONDS,
+    max_recorded_frames=settings.MAX_RECORDED_FRAMES,
+    summary_window=settings.SUMMARY_WINDOW_FRAMES,
+    default_profile=settings.ANALYSIS_PROFILE,
+    motion_threshold=settings.MOTION_GATE_THRESHOLD,
+    roi_padding=settings.FACE_ROI_PADDING,
+    inference_pool=inference_pool,
+    recording_storage=recording_storage,
+    recording_options={
+        "max_queue_frames": settings.RECORDING_QUEUE_FRAMES,
+        "batch_frames": settings.RECORDING_BATCH_FRAMES,
+        "batch_bytes": settings.RECORDING_BATCH_BYTES,
+        "flush_interval": settings.RECORDING_FLUSH_INTERVAL_SECONDS,
+        "video_fps": settings.RECORDING_VIDEO_FPS,
+        "video_codec": settings.RECORDING_VIDEO_CODEC,
+        "video_max_width": settings.RECORDING_VIDEO_MAX_WIDTH or None,
+        "preview_interval": settings.PREVIEW_INTERVAL_SECONDS,
+        "preview_width": settings.PREVIEW_THUMBNAIL_WIDTH
+    }
+)
 
-    async def process_audio(self, audio_data: str):
-        """Process and analyze audio chunk"""
+class _Connection:
+    """Serialises sends from the receive loop and the analysis loop"""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self._send_lock = asyncio.Lock()
+
+    async def send_json(self, data: Dict):
+        async with self._send_lock:
+            await self.websocket.send_json(data)
+
+async def _analyze_video(connection: _Connection, analysis_manager, scheduler: FrameScheduler):
+    """Analyse the newest pending frame whenever the previous one is done"""
+    frame_count = 0
+    while True:
+        frame = await scheduler.next_frame()
+        if frame is None:
+            return
+
+        jpeg, sequence, timestamp_ms = frame
+        frame_count += 1
+        if frame_count % 30 == 0:  # Log every 30th frame
+            logger.debug(f"Processing video frame {frame_count} ({scheduler.stats()})")
+
+        feedback = await analysis_manager.process_jpeg(jpeg, timestamp_ms)
+        response = {
+            "type": "video_feedback",
+            "feedback": feedback,
+            "stats": {
+                **scheduler.stats(),
+                **analysis_manager.video_processor.motion_gate.stats()
+            }
+        }
+        if sequence is not None:
+            response["sequence"] = sequence
+            response["timestamp"] = timestamp_ms
         try:
-            # Get base64 data
-            encoded_data = audio_data.split(',')[1] if ',' in audio_data else audio_data
-            
-            # Convert to binary
-            audio_binary = base64.b64decode(encoded_data)
-            
-            # Get real-time feedback
-            feedback = await self.speech_analyzer.get_realtime_feedback(audio_binary)
-            return feedback
-            
+            await connection.send_json(response)
         except Exception as e:
-            print(f"Error processing audio: {e}")
-            return {
-                "text": "",
-                "is_filler_word": False,
-                "confidence": None
-            }
-
-    async def get_recorded_frames(self) -> List[bytes]:
-        """Get all recorded frames"""
-        return self.recorded_frames
+            # The client is gone; the receive loop sees the disconnect and
+            # cleans up, so end quietly instead of failing the task
+            logger.info(f"Stopping video analysis after {frame_count} frames, send failed: {e}")
+            return
 
-    async def clear_frames(self):
-        """Clear stored frames"""
-        self.recorded_frames = []
+async def _analyze_audio(connection: _Connection, analysis_manager, audio_queue: asyncio.Queue):
+    """Transcribe queued audio chunks in order; each one is a whole transcription job"""
+    while True:
+        audio, sequence, timestamp_ms = await audio_queue.get()
+        feedback = await analysis_manager.process_audio(audio)
+        response = {
+            "type": "audio_feedback",
+            "feedback": feedback
+        }
+        if sequence is not None:
+            response["sequence"] = sequence
+            response["timestamp"] = timestamp_ms
+        try:
+            await connection.send_json(response)
+        except Exception as e:
+            logger.info(f"Stopping audio analysis, send failed: {e}")
+            return
 
-    async def get_session_summary(self):
-        """Get summary of the entire session"""
-        video_summary = await self.video_processor.get_session_summary()
+def _queue_audio(audio_queue: asyncio.Queue, chunk) -> Optional[Dict]:
+    """Queue an audio chunk for _analyze_audio; returns an error message if it is full"""
+    try:
+        audio_queue.put_nowait(chunk)
+    except asyncio.QueueFull:
         return {
-            "video_metrics": video_summary.dict()
+            "type": "error",
+            "message": "Audio analysis is falling behind, chunk dropped"
         }
+    return None
 
-# Create a global manager
-analysis_manager = AnalysisManager()
-
-async def handle_websocket(websocket: WebSocket):
-    """Main WebSocket handler"""
+async def handle_websocket(
+    websocket: WebSocket,
+    session_id: Optional[str] = None,
+    profile: Optional[str] = None
+):
+    """
+    Main WebSocket handler. Receiving and analysis run as separate tasks:
+    every frame is recorded as it arrives, but only the newest one waiting is
+    analysed, so feedback stays within the latency budget under load. Audio
+    chunks are transcribed by a third task, so a slow transcription never
+    holds up receiving.
+    """
     logger.info("New WebSocket connection established")
     await websocket.accept()
-    
+    connection = _Connection(websocket)
+
+    session_id = session_id or str(uuid.uuid4())
+    try:
+        analysis_manager = session_registry.attach(session_id, profile)
+    except ValueError as e:
+        await connection.send_json({
+            "type": "error",
+            "message": str(e)
+        })
+        await websocket.close(code=1008)
+        return
+    await connection.send_json({
+        "type": "session_started",
+        "session_id": session_id,
+        "profile": analysis_manager.video_processor.profile.name
+    })
+
+    scheduler = FrameScheduler(latency_budget_ms=settings.FRAME_LATENCY_BUDGET_MS)
+    analysis_task = asyncio.create_task(_analyze_video(connection, analysis_manager, scheduler))
+    audio_queue = asyncio.Queue(maxsize=settings.AUDIO_QUEUE_CHUNKS)
+    audio_task = asyncio.create_task(_analyze_audio(connection, analysis_manager, audio_queue))
+
     try:
-        frame_count = 0
         while True:
-            data = await websocket.receive_json()
-            
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            if message.get("bytes") is not None:
+                # Binary protocol: fixed header followed by the raw payload
+                try:
+                    frame_message = decode_message(message["bytes"])
+                except ProtocolError as e:
+                    await connection.send_json({
+                        "type": "error",
+                        "message": str(e)
+                    })
+                    continue
+
+                if frame_message.message_type == MESSAGE_VIDEO:
+                    analysis_manager.record_frame(frame_message.payload, frame_message.timestamp_ms)
+                    scheduler.submit((
+                        frame_message.payload,
+                        frame_message.sequence,
+                        frame_message.timestamp_ms
+                    ))
+                elif frame_message.message_type == MESSAGE_AUDIO:
+                    error = _queue_audio(audio_queue, (
+                        frame_message.payload,
+                        frame_message.sequence,
+                        frame_message.timestamp_ms
+                    ))
+                    if error is not None:
+                        await connection.send_json({**error, "sequence": frame_message.sequence})
+                else:
+                    await connection.send_json({
+                        "type": "error",
+                        "message": f"Unsupported message type {frame_message.message_type}"
+                    })
+                continue
+
+            # Legacy JSON messages with base64 payloads
+            data = json.loads(message["text"])
+
             if data["type"] == "end_session":
                 logger.info("Received end_session request")
+                # Let the frame being analysed finish so it counts in the summary
+                scheduler.close()
+                try:
+                    await analysis_task
+                except Exception as e:
+                    logger.error(f"Video analysis failed for session {session_id}: {e}")
                 summary = await analysis_manager.get_session_summary()
-                logger.info(f"Session summary generated: {summary}")
-                await websocket.send_json({
+                logger.info(f"Session summary generated: {summary}, frames: {scheduler.stats()}")
+                await connection.send_json({
                     "type": "session_summary",
                     "data": summary
                 })
                 break
 
             if data["type"] == "video":
-                frame_count += 1
-                if frame_count % 30 == 0:  # Log every 30th frame
-                    logger.debug(f"Processing video frame {frame_count}")
-                feedback = await analysis_manager.process_frame(data["frame"])
-                response = {
-                    "type": "video_feedback",
-                    "feedback": feedback
-                }
+                try:
+                    jpeg = decode_legacy_frame(data["frame"])
+                except ValueError as e:
+                    await connection.send_json({
+                        "type": "error",
+                        "message": f"Invalid frame: {e}"
+                    })
+                    continue
+                analysis_manager.record_frame(jpeg)
+                scheduler.submit((jpeg, None, None))
+            elif data["type"] == "get_snapshot":
+                await connection.send_json({
+                    "type": "session_snapshot",
+                    "data": await analysis_manager.get_session_snapshot()
+                })
             elif data["type"] == "audio":
-                feedback = await analysis_manager.process_audio(data["audio"])
-                response = {
-                    "type": "audio_feedback",
-                    "feedback": feedback
-                }
-            
-            await websocket.send_json(response)
-            
+                error = _queue_audio(audio_queue, (data["audio"], None, None))
+                if error is not None:
+                    await connection.send_json(error)
+            else:
+                await connection.send_json({
+                    "type": "error",
+                    "message": f"Unknown message type: {data['type']}"
+                })
+
     except WebSocketDisconnect:
-        print("Client disconnected")
+        logger.info(f"Client disconnected from session {session_id}")
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.error(f"WebSocket error in session {session_id}: {e}")
         try:
-            await websocket.send_json({
+            await connection.send_json({
                 "type": "error",
                 "message": str(e)
             })
-        except:
-            pass
\ No newline at end of file
+        except Exception:
+            pass
+    finally:
+        # Stop analysing before detaching, so a deferred release never resets
+        # the processor under an in-flight frame
+        analysis_task.cancel()
+        audio_task.cancel()
+        await asyncio.gather(analysis_task, audio_task, return_exceptions=True)
+        try:
+            await analysis_manager.flush_recording()
+        except Exception as e:
+            logger.error(f"Error flushing recording for session {session_id}: {e}")
+        # Keep the session around for POST /sessions/{id}/end; the registry
+        # reaps it if that never arrives
+        await session_registry.detach(session_id)
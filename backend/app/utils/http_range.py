@@ -0,0 +1,36 @@
+from typing import Optional, Tuple
+
+class RangeNotSatisfiable(ValueError):
+    """The Range header lies entirely outside the resource (416)"""
+
+def parse_range(header: Optional[str], length: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) byte positions requested by a single-range
+    "bytes=" Range header. Returns None when the header should be ignored
+    and the whole body sent: absent, malformed, another unit, or several
+    ranges. Raises RangeNotSatisfiable if no requested byte exists.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+
+    first, last = (part.strip() for part in spec.split("-", 1))
+    if not (first or last).isdigit() or (first and last and not last.isdigit()):
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0 or length == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, length - suffix), length - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= length:
+        raise RangeNotSatisfiable(header)
+    end = min(int(last), length - 1) if last else length - 1
+    return start, end
@@ -0,0 +1,23 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that wasn't issued by encode_cursor"""
+
+def encode_cursor(start_time: datetime, document_id: ObjectId) -> str:
+    """Opaque keyset cursor pointing just past (start_time, _id)"""
+    position = {"t": start_time.isoformat(), "id": str(document_id)}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(position["t"]), ObjectId(position["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise InvalidCursor(cursor) from e
@@ -1,5 +1,6 @@
 import sys
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,11 +13,53 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from app.api.routes.session_routes import router as session_router
 from app.api.routes.auth_routes import router as auth_router
 from app.api.routes.analysis_routes import router as analysis_router
+from app.services.websocket_handler import session_registry, inference_pool
+from app.core.config import get_settings
+from app.db.database import database
+from app.services.auth_service import password_hasher
+from app.services.speech_analyzer import transcription_client
+from app.api.routes.analysis_routes import upload_spool
+from app.db.indexes import ensure_indexes, check_query_plans
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+async def prepare_database():
+    """Connect the shared client, create missing indexes and optionally
+    check the hot query plans"""
+    try:
+        await database.connect()
+        if settings.MONGODB_ENSURE_INDEXES:
+            await ensure_indexes(database.db)
+        if settings.MONGODB_CHECK_QUERY_PLANS:
+            await check_query_plans(database.db)
+    except Exception as e:
+        # An unreachable database shouldn't keep the API from starting
+        logger.error(f"Database preparation failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await prepare_database()
+    # Uploads left behind by a previous process
+    upload_spool.remove_stale()
+    # Start inference workers, then pre-warm video processors and start
+    # reaping idle analysis sessions
+    if inference_pool is not None:
+        await inference_pool.start()
+    await session_registry.start()
+    yield
+    await session_registry.stop()
+    if inference_pool is not None:
+        await inference_pool.stop()
+    password_hasher.close()
+    await transcription_client.close()
+    database.close()
 
 app = FastAPI(
     title="Intreview API",
     description="Backend API for the Intreview application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -56,6 +99,15 @@ async def root():
         "openapi_url": "/openapi.json"
     }
 
+@app.get("/health")
+async def health():
+    """Liveness plus the shared services' counters, for monitoring"""
+    return {
+        "status": "ok",
+        "upload_spool": upload_spool.stats(),
+        "password_hasher": password_hasher.stats()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
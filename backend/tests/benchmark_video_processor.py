@@ -0,0 +1,190 @@
+"""
+Per-frame cost of VideoProcessor in metrics-only vs annotated output mode,
+or, with --profiles, latency and accuracy of each analysis profile.
+
+Run from the backend directory:
+
+    python tests/benchmark_video_processor.py [--image face.jpg] [--frames 300]
+    python tests/benchmark_video_processor.py --profiles [--video interview.webm]
+
+With --image, real FaceMesh output on that photo is used. Without it the
+landmarks are a synthetic 468-point layout of the face mesh graph (spectral
+embedding of FACEMESH_TESSELATION, so connected points sit close together
+like on a real face) and inference is skipped, which isolates the
+rendering cost.
+
+--profiles runs real FaceMesh in-process over the frames of --video (or a
+drawn cartoon face drifting across the frame) with each profile, and
+compares landmarks, attention status and sentiment with "accurate".
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.video_processor import VideoProcessor, OUTPUT_METRICS, OUTPUT_ANNOTATED
+from app.services.analysis_profiles import PROFILES
+
+def synthetic_landmarks(processor: VideoProcessor, num_points: int = 468) -> np.ndarray:
+    """Lay the tesselation graph out in 2D so that mesh edges are short"""
+    adjacency = np.zeros((num_points, num_points))
+    for a, b in processor.mp_face_mesh.FACEMESH_TESSELATION:
+        adjacency[a, b] = adjacency[b, a] = 1
+    laplacian = np.diag(adjacency.sum(axis=1)) - adjacency
+    _, vectors = np.linalg.eigh(laplacian)
+    layout = vectors[:, 1:3]
+    layout = (layout - layout.min(axis=0)) / np.ptp(layout, axis=0)
+
+    landmarks = np.zeros((num_points, 3), dtype=np.float32)
+    landmarks[:, 0] = 0.35 + layout[:, 0] * 0.3  # Face spans ~30% of the width
+    landmarks[:, 1] = 0.25 + layout[:, 1] * 0.5
+    return landmarks
+
+async def time_mode(processor: VideoProcessor, frame: np.ndarray, output_mode: str, frames: int) -> float:
+    """Mean milliseconds per process_frame call"""
+    # Warm up caches and the MediaPipe graph
+    for _ in range(10):
+        await processor.process_frame(frame.copy(), output_mode)
+
+    copies = [frame.copy() for _ in range(frames)]
+    start = time.perf_counter()
+    for copy in copies:
+        await processor.process_frame(copy, output_mode)
+    return (time.perf_counter() - start) * 1000 / frames
+
+def synthetic_face_frames(count: int) -> list:
+    """A simple drawn face that FaceMesh detects, drifting left and right"""
+    frames = []
+    for i in range(count):
+        frame = np.full((480, 640, 3), (180, 200, 220), dtype=np.uint8)
+        cx = 320 + int(120 * np.sin(i / 15))
+        cy = 240 + int(20 * np.sin(i / 7))
+        cv2.ellipse(frame, (cx, cy), (90, 120), 0, 0, 360, (140, 170, 210), -1)
+        for eye_x in (cx - 35, cx + 35):
+            cv2.ellipse(frame, (eye_x, cy - 25), (18, 9), 0, 0, 360, (255, 255, 255), -1)
+            cv2.circle(frame, (eye_x, cy - 25), 7, (40, 30, 20), -1)
+            cv2.line(frame, (eye_x - 20, cy - 50), (eye_x + 20, cy - 52), (40, 50, 70), 4)
+        cv2.line(frame, (cx, cy - 15), (cx - 8, cy + 30), (110, 140, 180), 3)
+        cv2.ellipse(frame, (cx, cy + 60), (30, 10), 0, 0, 180, (60, 60, 160), 4)
+        frames.append(frame)
+    return frames
+
+def read_video(path: str, limit: int) -> list:
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    if not frames:
+        raise SystemExit(f"Could not read {path}")
+    return frames
+
+async def run_profile(name: str, frames: list):
+    """Mean ms per frame, plus per-frame landmarks and feedback"""
+    processor = VideoProcessor(profile=name)
+    landmarks, feedback = [], []
+
+    async def recording_detect(frame_rgb, detect=processor.detect_landmarks):
+        result = await detect(frame_rgb)
+        landmarks[-1] = result
+        return result
+
+    processor.detect_landmarks = recording_detect
+    elapsed = 0.0
+    for frame in frames:
+        landmarks.append(None)
+        start = time.perf_counter()
+        feedback.append(await processor.get_realtime_feedback(frame))
+        elapsed += time.perf_counter() - start
+        if landmarks[-1] is None and feedback[-1]["face_detected"]:
+            landmarks[-1] = processor.motion_gate._landmarks  # Tracked, not inferred
+    processor.close()
+    return elapsed * 1000 / len(frames), landmarks, feedback
+
+async def compare_profiles(args):
+    if args.video:
+        frames = read_video(args.video, args.frames)
+        source = args.video
+    else:
+        frames = synthetic_face_frames(args.frames)
+        source = "synthetic drawn face"
+
+    height, width = frames[0].shape[:2]
+    print(f"\nAnalysis profiles, {width}x{height}, {len(frames)} frames ({source})")
+    results = {name: await run_profile(name, frames) for name in PROFILES}
+    _, reference_landmarks, reference_feedback = results["accurate"]
+
+    print(f"{'profile':<10} {'ms/frame':>9} {'faces':>7} {'landmark err':>13} {'attention':>10} {'sentiment':>10}")
+    for name, (ms, landmarks, feedback) in results.items():
+        faces = np.mean([f["face_detected"] for f in feedback])
+        errors = [
+            np.abs(ours[:468, :2] - ref[:468, :2]).mean() * width
+            for ours, ref in zip(landmarks, reference_landmarks)
+            if ours is not None and ref is not None
+        ]
+        attention = np.mean([
+            ours["attention_status"] == ref["attention_status"]
+            for ours, ref in zip(feedback, reference_feedback)
+        ])
+        sentiment = np.mean([
+            ours["sentiment"] == ref["sentiment"]
+            for ours, ref in zip(feedback, reference_feedback)
+        ])
+        error = f"{np.mean(errors):.2f} px" if errors else "-"
+        print(f"{name:<10} {ms:>9.2f} {faces:>7.0%} {error:>13} {attention:>10.0%} {sentiment:>10.0%}")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--image", help="Photo with a face to run real inference on")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--profiles", action="store_true", help="Compare analysis profiles")
+    parser.add_argument("--video", help="Recording with a face for --profiles")
+    args = parser.parse_args()
+
+    if args.profiles:
+        await compare_profiles(args)
+        return
+
+    processor = VideoProcessor()
+    if args.image:
+        frame = cv2.imread(args.image)
+        if frame is None:
+            raise SystemExit(f"Could not read {args.image}")
+        source = args.image
+    else:
+        frame = np.full((480, 640, 3), 127, dtype=np.uint8)
+        landmarks = synthetic_landmarks(processor)
+
+        async def canned_landmarks(frame_rgb):
+            return landmarks
+
+        processor.detect_landmarks = canned_landmarks
+        source = "synthetic landmarks, inference skipped"
+
+    _, metrics = await processor.process_frame(frame.copy())
+    if not metrics["face_detected"]:
+        raise SystemExit("No face detected, nothing to render")
+
+    print(f"\nVideoProcessor.process_frame, {frame.shape[1]}x{frame.shape[0]}, {args.frames} frames ({source})")
+    metrics_ms = await time_mode(processor, frame, OUTPUT_METRICS, args.frames)
+    annotated_ms = await time_mode(processor, frame, OUTPUT_ANNOTATED, args.frames)
+
+    print(f"- metrics:   {metrics_ms:.3f} ms/frame")
+    print(f"- annotated: {annotated_ms:.3f} ms/frame")
+    print(f"- saving:    {annotated_ms - metrics_ms:.3f} ms/frame "
+          f"({(annotated_ms - metrics_ms) / annotated_ms:.0%})")
+
+    processor.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,176 @@
+"""
+Fakes and fixtures shared by the API and storage tests.
+
+FakeCollection keeps documents in memory and evaluates the subset of
+MongoDB queries, projections and aggregation stages the app uses, so tests
+can check what a query returns rather than only how it is built.
+"""
+import sys
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("ASSEMBLY_AI_API_KEY", "test")
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+USER_ID = "user-1"
+
+def _get(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return None
+        doc = doc[part]
+    return doc
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(_matches(doc, option) for option in condition):
+                return False
+        elif isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+            value = _get(doc, field)
+            for operator, operand in condition.items():
+                if operator == "$lt" and not (value is not None and value < operand):
+                    return False
+        elif _get(doc, field) != condition:
+            return False
+    return True
+
+def _sort(docs, sort):
+    # Stable sorts applied from the last key to the first
+    for field, direction in reversed(list(sort)):
+        docs = sorted(docs, key=lambda doc: _get(doc, field), reverse=direction < 0)
+    return docs
+
+def _project(doc, projection):
+    if not any(spec for path, spec in projection.items() if path != "_id"):
+        # Exclusion projection
+        return {field: value for field, value in doc.items() if projection.get(field, 1)}
+    paths = [path for path, spec in projection.items() if spec and path != "_id"]
+    if any(other.startswith(path + ".") for path in paths for other in paths):
+        raise ValueError("Path collision")
+    result = {} if projection.get("_id", 1) == 0 else {"_id": doc.get("_id")}
+    for path, spec in projection.items():
+        if path == "_id" or not spec:
+            continue
+        if isinstance(spec, dict):
+            (operator, source), = spec.items()
+            values = _get(doc, source.lstrip("$"))
+            if operator == "$first":
+                result[path] = values[0] if values else None
+            continue
+        source, target, parts = doc, result, path.split(".")
+        for part in parts[:-1]:
+            source = source.get(part, {})
+            target = target.setdefault(part, {})
+        if parts[-1] in source:
+            target[parts[-1]] = source[parts[-1]]
+    return result
+
+class FakeCollection:
+    """In-memory collection: find_one, insert_one and aggregate over `docs`"""
+
+    def __init__(self, name="collection", docs=None, database=None):
+        self.name = name
+        self.docs = list(docs or [])
+        self.database = database
+        self.calls = []
+
+    async def find_one(self, query, projection=None, sort=None):
+        self.calls.append((query, projection, sort))
+        docs = [doc for doc in self.docs if _matches(doc, query)]
+        if sort:
+            docs = _sort(docs, sort)
+        if not docs:
+            return None
+        return _project(docs[0], projection) if projection else dict(docs[0])
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+        return SimpleNamespace(inserted_id=doc.get("_id"))
+
+    def aggregate(self, pipeline):
+        self.pipeline = pipeline
+        docs = self._run(list(self.docs), pipeline)
+
+        async def to_list(length=None):
+            return docs if length is None else docs[:length]
+        return SimpleNamespace(to_list=to_list)
+
+    def _run(self, docs, pipeline):
+        for stage in pipeline:
+            (operator, spec), = stage.items()
+            if operator == "$match":
+                docs = [doc for doc in docs if _matches(doc, spec)]
+            elif operator == "$sort":
+                docs = _sort(docs, spec.items())
+            elif operator == "$limit":
+                docs = docs[:spec]
+            elif operator == "$project":
+                docs = [_project(doc, spec) for doc in docs]
+            elif operator == "$lookup":
+                foreign = self.database[spec["from"]]
+                docs = [
+                    {
+                        **doc,
+                        spec["as"]: foreign._run(
+                            [other for other in foreign.docs
+                             if other.get(spec["foreignField"]) == doc.get(spec["localField"])],
+                            spec.get("pipeline", [])
+                        )
+                    }
+                    for doc in docs
+                ]
+            else:
+                raise NotImplementedError(operator)
+        return docs
+
+class FakeDatabase:
+    """Collections by attribute or item, created empty on first use"""
+
+    def __init__(self, **collections):
+        self._collections = {}
+        for name, docs in collections.items():
+            self[name].docs.extend(docs)
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(name, database=self)
+        return self._collections[name]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+def owned_recordings(*session_ids, user_id=USER_ID):
+    """Recording documents for sessions owned by `user_id`"""
+    return [
+        {"_id": f"recording-{i}", "session_id": session_id, "user_id": user_id}
+        for i, session_id in enumerate(session_ids, 1)
+    ]
+
+@pytest.fixture
+def api_client(monkeypatch):
+    """
+    Factory for a TestClient around one routes module, signed in as
+    USER_ID, with the module's globals replaced by the given fakes:
+    api_client(session_routes, recording_storage=FakeStorage())
+    """
+    from app.api.routes.auth_routes import auth_service
+
+    def make(module, prefix="", **fakes):
+        for name, fake in fakes.items():
+            monkeypatch.setattr(module, name, fake)
+        app = FastAPI()
+        app.include_router(module.router, prefix=prefix)
+        user = SimpleNamespace(id=USER_ID)
+        app.dependency_overrides[auth_service.get_current_user_claims] = lambda: user
+        app.dependency_overrides[auth_service.get_current_user] = lambda: user
+        return TestClient(app)
+    return make
@@ -0,0 +1,120 @@
+import asyncio
+import sys
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+os.environ.setdefault("ASSEMBLY_AI_API_KEY", "test")
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.services import auth_service
+from app.services.auth_service import AuthService
+from app.utils.ttl_cache import TTLCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class FakeUsers:
+    def __init__(self):
+        self.docs = {}
+        self.reads = 0
+
+    async def find_one(self, query):
+        self.reads += 1
+        doc = self.docs.get(query["email"])
+        return dict(doc) if doc else None
+
+def make_service():
+    users = FakeUsers()
+    users.docs["ada@example.com"] = {
+        "_id": ObjectId(),
+        "email": "ada@example.com",
+        "name": "Ada",
+        "hashed_password": "unused",
+        "created_at": datetime(2024, 1, 1),
+        "is_active": True
+    }
+    return AuthService(SimpleNamespace(users=users)), users
+
+def test_ttl_cache_expires_and_evicts():
+    clock = FakeClock()
+    cache = TTLCache(max_size=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=3)
+    assert cache.get("a") == 1  # "a" is now the most recently used
+    clock.now = 5
+    assert cache.get("b") is None
+    cache.set("c", 3)
+    cache.set("d", 4)  # evicts "a", the least recently used
+    assert cache.get("a") is None
+    assert cache.get("c") == 3 and cache.get("d") == 4
+    assert cache.stats()["hits"] == 3
+
+def test_current_user_is_cached_until_invalidated():
+    async def run():
+        service, users = make_service()
+        token = service.create_access_token({"sub": "ada@example.com"})
+        first = await service.get_current_user(token)
+        second = await service.get_current_user(token)
+        assert first == second and users.reads == 1
+
+        users.docs["ada@example.com"]["is_active"] = False
+        service.invalidate_user("ada@example.com")
+        with pytest.raises(HTTPException) as error:
+            await service.get_current_user(token)
+        assert error.value.status_code == 401
+        assert users.reads == 2
+
+    asyncio.run(run())
+
+def test_claims_are_not_trusted_by_default():
+    async def run():
+        service, users = make_service()
+        user = await service.get_current_user(service.create_access_token({"sub": "ada@example.com"}))
+        users.docs["ada@example.com"]["is_active"] = False
+        service._user_cache.pop(user.email)
+
+        token = service.create_access_token({"sub": user.email}, user=user)
+        with pytest.raises(HTTPException):
+            await service.get_current_user_claims(token)
+
+    asyncio.run(run())
+
+def test_trusted_claims_skip_the_database(monkeypatch):
+    monkeypatch.setattr(auth_service.settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+
+    async def run():
+        service, users = make_service()
+        user = await service.get_current_user(service.create_access_token({"sub": "ada@example.com"}))
+        users.reads = 0
+
+        token = service.create_access_token({"sub": user.email}, user=user)
+        assert await service.get_current_user_claims(token) == user
+        assert users.reads == 0
+
+        # After invalidation, tokens issued earlier go back to the database
+        service.invalidate_user(user.email)
+        assert await service.get_current_user_claims(token) == user
+        assert users.reads == 1
+
+    asyncio.run(run())
+
+def test_bad_tokens_are_rejected():
+    async def run():
+        service, _ = make_service()
+        for token in ["not-a-jwt", service.create_access_token({"sub": "nobody@example.com"})]:
+            with pytest.raises(HTTPException) as error:
+                await service.get_current_user_claims(token)
+            assert error.value.status_code == 401
+
+    asyncio.run(run())
@@ -0,0 +1,54 @@
+import asyncio
+import sys
+import os
+
+os.environ.setdefault("ASSEMBLY_AI_API_KEY", "test")
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+
+from app.db.database import Database
+from app.services.recording_storage import RecordingStorage
+from app.db.models.analysis_models import AnalysisStorage
+
+# Nothing listens here, so connecting fails fast
+UNREACHABLE = "mongodb://127.0.0.1:1"
+
+def test_pool_options_are_applied():
+    database = Database(
+        UNREACHABLE, "test_db",
+        max_pool_size=7, min_pool_size=2, connect_timeout_ms=1500,
+        server_selection_timeout_ms=200, compressors=["zlib"]
+    )
+    options = database.client.delegate.options
+    assert options.pool_options.max_pool_size == 7
+    assert options.pool_options.min_pool_size == 2
+    assert options.pool_options.connect_timeout == 1.5
+    assert options.server_selection_timeout == 0.2
+    assert database.db.name == "test_db"
+    database.close()
+
+def test_services_share_the_client_without_binding_a_loop():
+    """Building services at import time must not tie the client to that
+    moment's event loop, or the app's own loop can't use it"""
+    database = Database(UNREACHABLE, "test_db")
+    recording_storage = RecordingStorage(database.db)
+    analysis_storage = AnalysisStorage(database.db)
+    assert recording_storage.db.client is database.client
+    assert analysis_storage.db.client is database.client
+    assert database.client._io_loop is None
+    database.close()
+
+def test_connect_reports_an_unreachable_server():
+    database = Database(UNREACHABLE, "test_db", server_selection_timeout_ms=200)
+
+    async def run():
+        with pytest.raises(ServerSelectionTimeoutError):
+            await database.connect()
+        assert not database.connected
+        database.close()
+
+    asyncio.run(run())
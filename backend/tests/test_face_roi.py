@@ -0,0 +1,75 @@
+import asyncio
+import sys
+import os
+import numpy as np
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.video_processor import VideoProcessor
+from app.services.analysis_profiles import get_profile
+
+# Full-resolution input and a 128px ROI
+ROI_PROFILE = get_profile("accurate")._replace(roi_size=128)
+
+def square_face(left, top, size, num_points=478):
+    """Landmarks spread over a normalized square"""
+    grid = np.linspace(0, 1, num_points, dtype=np.float32)
+    landmarks = np.zeros((num_points, 3), dtype=np.float32)
+    landmarks[:, 0] = left + grid * size
+    landmarks[:, 1] = top + grid[::-1] * size
+    landmarks[:, 2] = 0.1
+    return landmarks
+
+def test_roi_inference_maps_back_to_frame_coordinates():
+    """After the first detection only a small crop reaches FaceMesh"""
+    async def run():
+        processor = VideoProcessor(profile=ROI_PROFILE, roi_padding=0.5)
+        inputs = []
+
+        async def fake_detect(frame_rgb):
+            inputs.append(frame_rgb.shape[:2])
+            if len(inputs) == 1:
+                # Full 640x480 frame: face at x 256-384, y 192-320 pixels
+                return np.column_stack([
+                    np.linspace(256, 384, 478) / 640,
+                    np.linspace(192, 320, 478) / 480,
+                    np.full(478, 0.1)
+                ]).astype(np.float32)
+            # ROI-normalized face filling the middle third of the crop
+            return square_face(1 / 3, 1 / 3, 1 / 3)
+
+        processor.detect_landmarks = fake_detect
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+        await processor._infer_landmarks(frame)
+        assert inputs[0] == (480, 640)
+        assert processor._face_box == (192, 128, 448, 384)
+
+        second = await processor._infer_landmarks(frame)
+        assert inputs[1] == (128, 128)
+        np.testing.assert_allclose(second[:, 0].min() * 640, 192 + 256 / 3, atol=0.5)
+        np.testing.assert_allclose(second[:, 1].max() * 480, 128 + 2 * 256 / 3, atol=0.5)
+        np.testing.assert_allclose(second[:, 2], 0.1 * 256 / 640, atol=1e-6)
+        processor.close()
+
+    asyncio.run(run())
+
+def test_lost_face_falls_back_to_full_frame():
+    """A miss inside the ROI is retried on the whole frame"""
+    async def run():
+        processor = VideoProcessor(profile=ROI_PROFILE)
+        processor._face_box = (100, 100, 300, 300)
+        inputs = []
+
+        async def fake_detect(frame_rgb):
+            inputs.append(frame_rgb.shape[:2])
+            return None
+
+        processor.detect_landmarks = fake_detect
+        assert await processor._infer_landmarks(np.zeros((480, 640, 3), dtype=np.uint8)) is None
+        assert inputs == [(128, 128), (480, 640)]
+        assert processor._face_box is None
+        processor.close()
+
+    asyncio.run(run())
@@ -0,0 +1,50 @@
+import asyncio
+import sys
+import os
+import cv2
+import numpy as np
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.frame_decoder import FrameDecoder, jpeg_size
+from app.services.video_processor import VideoProcessor
+
+def encode_jpeg(width, height):
+    rng = np.random.default_rng(0)
+    image = cv2.resize(rng.integers(0, 255, (height // 40, width // 40, 3), dtype=np.uint8), (width, height))
+    _, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    return jpeg.ravel()
+
+def test_jpeg_size_reads_the_frame_header():
+    assert jpeg_size(encode_jpeg(1280, 720)) == (1280, 720)
+    assert jpeg_size(b"not a jpeg") is None
+
+def test_reduced_decode_keeps_the_target_width():
+    """The largest DCT reduction that stays at or above the target is used"""
+    jpeg = encode_jpeg(1280, 720)
+    for target, scale in [(None, 1), (960, 1), (480, 2), (320, 4), (100, 8)]:
+        frame, used = FrameDecoder(target, use_turbojpeg=False).decode(jpeg)
+        assert used == scale
+        assert frame.shape == (720 // scale, 1280 // scale, 3)
+
+def test_undecodable_data_returns_none():
+    frame, scale = FrameDecoder(320, use_turbojpeg=False).decode(np.frombuffer(b"\xff\xd8garbage", np.uint8))
+    assert frame is None and scale == 1
+
+def test_face_position_is_reported_in_source_pixels():
+    """A frame decoded at reduced scale reports offsets in original pixels"""
+    async def run():
+        processor = VideoProcessor()
+
+        async def fake_detect(frame_rgb):
+            landmarks = np.zeros((478, 3), dtype=np.float32)
+            landmarks[1] = (0.75, 0.5, 0.0)  # Nose tip right of centre
+            return landmarks
+
+        processor.detect_landmarks = fake_detect
+        feedback = await processor.get_realtime_feedback(np.zeros((180, 320, 3), np.uint8), source_scale=4)
+        assert feedback["face_position"] == {"x": 320, "y": 0}
+        processor.close()
+
+    asyncio.run(run())
@@ -0,0 +1,78 @@
+import sys
+import os
+import random
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.frame_metrics_store import FrameMetricsStore
+
+def random_feedbacks(count):
+    rng = random.Random(11)
+    feedbacks = []
+    for _ in range(count):
+        feedback = {
+            "face_detected": rng.random() > 0.2,
+            "attention_status": rng.choice(["centered", "centered", "looking away", "poor posture"]),
+            "sentiment": rng.choice(["neutral", "neutral", "positive"])
+        }
+        if feedback["face_detected"]:
+            feedback["face_position"] = {"x": rng.randint(-320, 320), "y": rng.randint(-240, 240)}
+        feedbacks.append(feedback)
+    return feedbacks
+
+def reference_timeline(sentiments):
+    """The original loop-based timeline"""
+    timeline = []
+    current_sentiment = sentiments[0]
+    start_idx = 0
+    for i, sentiment in enumerate(sentiments[1:], 1):
+        if sentiment != current_sentiment:
+            timeline.append({
+                "sentiment": current_sentiment,
+                "start_frame": start_idx,
+                "end_frame": i-1,
+                "duration": i - start_idx
+            })
+            current_sentiment = sentiment
+            start_idx = i
+    timeline.append({
+        "sentiment": current_sentiment,
+        "start_frame": start_idx,
+        "end_frame": len(sentiments)-1,
+        "duration": len(sentiments) - start_idx
+    })
+    return timeline
+
+def test_columns_round_trip_and_grow():
+    """Appending past the initial capacity keeps every row"""
+    feedbacks = random_feedbacks(100)
+    store = FrameMetricsStore(capacity=8)
+    for i, feedback in enumerate(feedbacks):
+        store.append(feedback, timestamp=i * 0.1)
+
+    assert len(store) == 100
+    assert store.timestamp[-1] == 99 * 0.1
+    assert store.face_detected.tolist() == [f["face_detected"] for f in feedbacks]
+    assert store.x_offset.tolist() == [f.get("face_position", {}).get("x", 0) for f in feedbacks]
+
+def test_matches_list_based_metrics():
+    """Vectorized metrics agree with the per-dict computations they replace"""
+    feedbacks = random_feedbacks(500)
+    store = FrameMetricsStore()
+    for feedback in feedbacks:
+        store.append(feedback)
+
+    sentiments = [f["sentiment"] for f in feedbacks]
+    assert store.sentiment_runs() == reference_timeline(sentiments)
+    assert store.expression_changes() == sum(
+        1 for i in range(1, len(sentiments)) if sentiments[i] != sentiments[i-1]
+    )
+    assert store.dominant_sentiment() == "neutral"
+
+def test_empty_store():
+    store = FrameMetricsStore()
+    assert len(store) == 0
+    assert store.sentiment_runs() == []
+    assert store.expression_changes() == 0
+    assert store.dominant_sentiment() == "neutral"
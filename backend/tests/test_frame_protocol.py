@@ -0,0 +1,46 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.frame_protocol import (
+    decode_message,
+    encode_message,
+    ProtocolError,
+    HEADER,
+    MESSAGE_VIDEO
+)
+
+def test_round_trip():
+    """Header fields and payload survive encoding and decoding"""
+    payload = bytes(range(256)) * 4
+    data = encode_message(MESSAGE_VIDEO, 42, 1700000000123.5, payload)
+    assert len(data) == HEADER.size + len(payload)
+
+    message = decode_message(data)
+    assert message.message_type == MESSAGE_VIDEO
+    assert message.sequence == 42
+    assert message.timestamp_ms == 1700000000123.5
+    assert message.payload.tobytes() == payload
+
+def test_payload_is_a_view():
+    """Decoding must not copy the JPEG payload"""
+    data = encode_message(MESSAGE_VIDEO, 1, 0.0, b"\xff\xd8jpeg\xff\xd9")
+    message = decode_message(data)
+    assert np.shares_memory(message.payload, np.frombuffer(data, np.uint8))
+
+def test_rejects_bad_messages():
+    """Short messages, other versions and unknown types are refused"""
+    with pytest.raises(ProtocolError):
+        decode_message(b"\x01\x01")
+
+    unknown_version = bytearray(encode_message(MESSAGE_VIDEO, 1, 0.0, b""))
+    unknown_version[0] = 99
+    with pytest.raises(ProtocolError):
+        decode_message(bytes(unknown_version))
+
+    with pytest.raises(ProtocolError):
+        decode_message(encode_message(7, 1, 0.0, b""))
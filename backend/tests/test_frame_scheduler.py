@@ -0,0 +1,126 @@
+import asyncio
+import sys
+import os
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.frame_scheduler import FrameScheduler
+
+def test_newest_frame_wins():
+    """Frames submitted while one is pending replace it"""
+    async def run():
+        scheduler = FrameScheduler(latency_budget_ms=1000)
+        for frame in range(5):
+            scheduler.submit(frame)
+
+        assert await scheduler.next_frame() == 4
+        stats = scheduler.stats()
+        assert stats["received_frames"] == 5
+        assert stats["dropped_frames"] == 4
+        assert stats["processed_frames"] == 1
+
+    asyncio.run(run())
+
+def test_stale_frames_expire():
+    """A frame that waited past the latency budget is not analysed"""
+    async def run():
+        scheduler = FrameScheduler(latency_budget_ms=10)
+        scheduler.submit("stale")
+        await asyncio.sleep(0.05)
+        scheduler.submit("fresh")
+        assert await scheduler.next_frame() == "fresh"
+
+        scheduler.submit("expires")
+        await asyncio.sleep(0.05)
+        scheduler.close()
+        assert await scheduler.next_frame() is None
+        assert scheduler.expired_frames == 1
+
+    asyncio.run(run())
+
+def test_slow_consumer_keeps_up():
+    """A consumer slower than the producer only sees recent frames"""
+    async def run():
+        scheduler = FrameScheduler(latency_budget_ms=1000)
+        seen = []
+
+        async def consume():
+            while (frame := await scheduler.next_frame()) is not None:
+                seen.append(frame)
+                await asyncio.sleep(0.03)
+
+        consumer = asyncio.create_task(consume())
+        for frame in range(20):
+            scheduler.submit(frame)
+            await asyncio.sleep(0.005)
+        scheduler.close()
+        await consumer
+
+        assert seen[-1] == 19
+        assert len(seen) < 20
+        assert scheduler.dropped_frames == 20 - len(seen)
+
+    asyncio.run(run())
+
+def test_analysis_loop_survives_a_closed_socket():
+    """A failed send ends the analysis task quietly instead of raising"""
+    os.environ.setdefault("ASSEMBLY_AI_API_KEY", "test")
+    from types import SimpleNamespace
+    from app.services.websocket_handler import _analyze_video
+
+    class ClosedConnection:
+        async def send_json(self, data):
+            raise RuntimeError("Cannot call send once a close message has been sent")
+
+    async def process_jpeg(jpeg, timestamp_ms):
+        return {"face_detected": True}
+
+    async def run():
+        manager = SimpleNamespace(
+            process_jpeg=process_jpeg,
+            video_processor=SimpleNamespace(motion_gate=SimpleNamespace(stats=lambda: {}))
+        )
+        scheduler = FrameScheduler(latency_budget_ms=1000)
+        task = asyncio.create_task(_analyze_video(ClosedConnection(), manager, scheduler))
+        scheduler.submit((b"jpeg", 1, 0.0))
+        await asyncio.wait_for(task, 1)
+        assert task.exception() is None
+
+    asyncio.run(run())
+
+def test_audio_chunks_are_analysed_off_the_receive_loop():
+    """Queued chunks are transcribed in order; a full queue rejects new ones"""
+    os.environ.setdefault("ASSEMBLY_AI_API_KEY", "test")
+    from app.services.websocket_handler import _analyze_audio, _queue_audio
+
+    class Connection:
+        def __init__(self):
+            self.sent = []
+
+        async def send_json(self, data):
+            self.sent.append(data)
+
+    class SlowSpeech:
+        async def process_audio(self, audio):
+            await asyncio.sleep(0.01)
+            return {"text": audio}
+
+    async def run():
+        connection = Connection()
+        audio_queue = asyncio.Queue(maxsize=2)
+        task = asyncio.create_task(_analyze_audio(connection, SlowSpeech(), audio_queue))
+        # Queuing never waits for a transcription
+        assert _queue_audio(audio_queue, ("a", 1, 10.0)) is None
+        assert _queue_audio(audio_queue, ("b", None, None)) is None
+        assert _queue_audio(audio_queue, ("c", 3, 30.0))["type"] == "error"
+
+        while len(connection.sent) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        assert connection.sent == [
+            {"type": "audio_feedback", "feedback": {"text": "a"}, "sequence": 1, "timestamp": 10.0},
+            {"type": "audio_feedback", "feedback": {"text": "b"}},
+        ]
+
+    asyncio.run(run())
@@ -0,0 +1,75 @@
+import asyncio
+import sys
+import os
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db.indexes import INDEXES, HOT_QUERIES, ensure_indexes, check_query_plans, plan_stages
+
+def ixscan(name):
+    return {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": name}}
+
+class FakeCursor:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def limit(self, count):
+        return self
+
+    def sort(self, keys):
+        return self
+
+    async def explain(self):
+        return {"queryPlanner": {"winningPlan": self.plan}}
+
+class FakeCollection:
+    def __init__(self, plan=None):
+        self.plan = plan or ixscan("some_index")
+        self.created = []
+
+    async def create_indexes(self, indexes):
+        self.created.extend(indexes)
+        return [index.document["name"] for index in indexes]
+
+    def find(self, query):
+        return FakeCursor(self.plan)
+
+class FakeDatabase:
+    def __init__(self, plans=None):
+        self.collections = {}
+        self.plans = plans or {}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(self.plans.get(name))
+        return self.collections[name]
+
+def test_plan_stages_walks_nested_plans():
+    """Classic single/multi-input plans and slot-based wrappers are all walked"""
+    assert plan_stages(ixscan("a")) == ["FETCH", "IXSCAN"]
+    merged = {"stage": "SORT_MERGE", "inputStages": [ixscan("a"), {"stage": "COLLSCAN"}]}
+    assert plan_stages(merged) == ["SORT_MERGE", "FETCH", "IXSCAN", "COLLSCAN"]
+    sbe = {"queryPlan": {"stage": "LIMIT", "inputStage": {"stage": "COLLSCAN"}}, "slotBasedPlan": {}}
+    assert plan_stages(sbe) == ["LIMIT", "COLLSCAN"]
+
+def test_every_hot_query_collection_has_indexes():
+    """ensure_indexes creates the declared indexes, and each hot query has some"""
+    async def run():
+        db = FakeDatabase()
+        created = await ensure_indexes(db)
+        assert len(created) == sum(len(indexes) for indexes in INDEXES.values())
+        for collection, _, _ in HOT_QUERIES:
+            assert db[collection].created
+
+    asyncio.run(run())
+
+def test_check_query_plans_flags_collection_scans():
+    async def run():
+        db = FakeDatabase({"interview_analyses": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}})
+        report = await check_query_plans(db)
+        assert len(report) == len(HOT_QUERIES)
+        flagged = {entry["collection"] for entry in report if entry["collscan"]}
+        assert flagged == {"interview_analyses"}
+
+    asyncio.run(run())
@@ -0,0 +1,63 @@
+import asyncio
+import sys
+import os
+import numpy as np
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.inference_pool import InferencePool
+from app.services.analysis_profiles import all_face_mesh_options
+
+def test_sessions_stick_to_one_worker():
+    """A session's frames always go to the worker it was first assigned"""
+    async def run():
+        pool = InferencePool(
+            num_workers=2,
+            face_mesh_options=all_face_mesh_options(),
+            default_profile="balanced"
+        )
+        await pool.start()
+        try:
+            frame = np.zeros((240, 320, 3), dtype=np.uint8)
+            results = await asyncio.gather(
+                pool.detect_landmarks("session-a", frame),
+                pool.detect_landmarks("session-b", frame, "fast"),
+                pool.detect_landmarks("session-a", frame)
+            )
+            assert results == [None, None, None]
+            assert pool._assignments["session-a"] != pool._assignments["session-b"]
+
+            await pool.release("session-a")
+            assert "session-a" not in pool._assignments
+            assert sorted(pool._load) == [0, 1]
+        finally:
+            await pool.stop()
+
+    asyncio.run(run())
+
+def test_dead_worker_is_respawned():
+    """After a worker process dies, its sessions carry on on a new worker"""
+    async def run():
+        pool = InferencePool(
+            num_workers=1,
+            face_mesh_options=all_face_mesh_options(),
+            default_profile="balanced"
+        )
+        await pool.start()
+        try:
+            frame = np.zeros((240, 320, 3), dtype=np.uint8)
+            assert await pool.detect_landmarks("session-a", frame) is None
+
+            for process in list(pool._executors[0]._processes.values()):
+                process.kill()
+                process.join()
+
+            assert await pool.detect_landmarks("session-a", frame) is None
+            assert pool.respawned_workers == 1
+            assert pool._assignments == {"session-a": 0} and pool._load == [1]
+            await pool.release("session-a")
+        finally:
+            await pool.stop()
+
+    asyncio.run(run())
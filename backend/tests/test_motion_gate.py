@@ -0,0 +1,65 @@
+import sys
+import os
+import cv2
+import numpy as np
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.motion_gate import MotionGate
+
+def textured_frame(shift_x=0, shift_y=0):
+    """A 640x480 frame of smooth blobs, translated by the given pixels"""
+    rng = np.random.default_rng(3)
+    noise = rng.integers(0, 255, (48, 64), dtype=np.uint8)
+    base = cv2.resize(noise, (800, 600), interpolation=cv2.INTER_CUBIC)
+    gray = base[60 + shift_y:540 + shift_y, 80 + shift_x:720 + shift_x]
+    return cv2.cvtColor(np.ascontiguousarray(gray), cv2.COLOR_GRAY2BGR)
+
+def face_landmarks():
+    rng = np.random.default_rng(5)
+    landmarks = np.zeros((478, 3), dtype=np.float32)
+    landmarks[:, :2] = 0.3 + rng.random((478, 2)) * 0.4
+    return landmarks
+
+def test_static_frames_follow_the_interval():
+    """Identical frames only get full inference every `full_interval` frames"""
+    gate = MotionGate(threshold=4.0, full_interval=4)
+    frame = textured_frame()
+    landmarks = face_landmarks()
+
+    for _ in range(20):
+        gray = gate.prepare(frame)
+        if gate.needs_inference(gray):
+            gate.record_inference(gray, landmarks)
+        else:
+            tracked, result = gate.track(gray)
+            assert tracked
+            np.testing.assert_allclose(result, landmarks, atol=1e-3)
+
+    assert gate.inference_calls == 5
+    assert gate.skipped_frames == 15
+
+def test_small_motion_is_tracked():
+    """A small shift is followed with optical flow instead of inference"""
+    gate = MotionGate(threshold=40.0, full_interval=10)
+    landmarks = face_landmarks()
+    gate.record_inference(gate.prepare(textured_frame()), landmarks)
+
+    # Content moves 8px left and 4px up on the 640x480 frame
+    gray = gate.prepare(textured_frame(shift_x=8, shift_y=4))
+    assert not gate.needs_inference(gray)
+    tracked, result = gate.track(gray)
+    assert tracked
+    np.testing.assert_allclose(result[:, 0] - landmarks[:, 0], -8 / 640, atol=2 / 640)
+    np.testing.assert_allclose(result[:, 1] - landmarks[:, 1], -4 / 480, atol=2 / 480)
+
+def test_large_change_forces_inference():
+    gate = MotionGate(threshold=4.0, full_interval=10)
+    gate.record_inference(gate.prepare(textured_frame()), face_landmarks())
+    assert gate.needs_inference(gate.prepare(255 - textured_frame()))
+
+def test_interval_of_one_disables_gating():
+    gate = MotionGate(full_interval=1)
+    assert not gate.enabled
+    assert gate.needs_inference(gate.prepare(textured_frame()))
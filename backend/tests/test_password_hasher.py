@@ -0,0 +1,58 @@
+import asyncio
+import sys
+import os
+import time
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import bcrypt
+
+from app.services.password_hasher import PasswordHasher
+
+def test_hash_and_verify():
+    async def run():
+        hasher = PasswordHasher(rounds=4)
+        hashed = await hasher.hash("correct horse")
+        assert hashed.startswith("$2b$04$")
+        assert await hasher.verify("correct horse", hashed)
+        assert not await hasher.verify("wrong horse", hashed)
+        assert not await hasher.verify("correct horse", "not-a-hash")
+        # Hashes made elsewhere, with another cost factor, still verify
+        assert await hasher.verify("legacy", bcrypt.hashpw(b"legacy", bcrypt.gensalt(5)).decode())
+        # Only the first 72 bytes count, as with older bcrypt releases
+        long_hash = await hasher.hash("x" * 100)
+        assert await hasher.verify("x" * 72, long_hash)
+        hasher.close()
+
+    asyncio.run(run())
+
+def test_hashing_is_capped_and_keeps_the_loop_responsive():
+    async def run():
+        hasher = PasswordHasher(rounds=8, max_concurrency=2)
+        peak, gaps = 0, []
+
+        async def watch():
+            nonlocal peak
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+                peak = max(peak, hasher.running)
+
+        watcher = asyncio.create_task(watch())
+        hashes = await asyncio.gather(*(hasher.hash(f"password-{i}") for i in range(6)))
+        watcher.cancel()
+
+        assert len(set(hashes)) == 6
+        assert peak <= 2
+        stats = hasher.stats()
+        assert stats["completed"] == 6 and stats["waiting"] == 0
+        assert stats["max_queue_ms"] > 0  # four calls had to wait
+        # The loop kept ticking while bcrypt ran
+        assert max(gaps) < 0.1
+        hasher.close()
+
+    asyncio.run(run())
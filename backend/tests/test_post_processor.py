@@ -0,0 +1,45 @@
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+
+os.environ.setdefault("ASSEMBLY_AI_API_KEY", "test")
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.post_processor import PostProcessor
+
+async def raw_chunks(count):
+    """Video chunk documents as yielded by RecordingStorage.iter_recording_chunks"""
+    jpeg = cv2.imencode(".jpg", np.zeros((48, 64, 3), np.uint8))[1].tobytes()
+    start = datetime(2024, 5, 1, 12, 0, 0)
+    for i in range(count):
+        yield {"type": "video", "data": jpeg, "timestamp": start + timedelta(seconds=i / 10)}
+    yield {"type": "video", "data": b"corrupt", "timestamp": start}
+
+def test_visual_analysis_consumes_streamed_chunks():
+    """Raw chunk bytes are decoded one by one, corrupt chunks are skipped"""
+    async def run():
+        processor = PostProcessor(recording_storage=None, analysis_storage=None)
+        frames = []
+
+        async def fake_detect(frame_rgb):
+            frames.append(frame_rgb.shape)
+            return None
+
+        processor.video_processor.detect_landmarks = fake_detect
+        result = await processor._analyze_visual(raw_chunks(5))
+        assert frames == [(48, 64, 3)] * 5
+        assert result.dominant_sentiment == "neutral"
+        assert result.sentiment_timeline[0]["duration"] == 5
+        # One row per frame, in the processor's own store, at capture time
+        store = processor.video_processor.metrics_store
+        assert len(store) == 5
+        assert store.timestamp[-1] == datetime(2024, 5, 1, 12, 0, 0, 400000).timestamp()
+        processor.video_processor.close()
+
+    asyncio.run(run())
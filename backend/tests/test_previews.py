@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import cv2
+import numpy as np
+import pytest
+
+from app.api.routes import session_routes
+from app.services.preview_builder import PreviewBuilder
+from app.services.recording_storage import RecordingStorage
+from tests.conftest import FakeDatabase, owned_recordings
+
+def jpeg_frame(shade):
+    frame = np.full((720, 1280, 3), shade, dtype=np.uint8)
+    return cv2.imencode(".jpg", frame)[1].tobytes()
+
+def test_thumbnails_are_taken_at_fixed_intervals():
+    builder = PreviewBuilder(interval=5, thumb_width=160, columns=4)
+    for i in range(300):  # 30 s at 10 FPS
+        builder.add_frame(jpeg_frame(i % 256), 100.0 + i / 10)
+
+    sprite, index = builder.build()
+    assert index["offsets"] == [0, 5, 10, 15, 20, 25]
+    assert (index["thumb_width"], index["thumb_height"]) == (160, 90)
+    assert index["frame_count"] == 300
+
+    image = cv2.imdecode(np.frombuffer(sprite, np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape == (2 * 90, 4 * 160, 3)
+    # Thumbnail 1 is the frame at 5 s (shade 50)
+    assert abs(int(image[45, 160 + 80, 0]) - 50) <= 3
+
+def test_long_sessions_double_the_interval():
+    """The sprite stays bounded: the interval doubles instead of growing the grid"""
+    builder = PreviewBuilder(interval=1, max_thumbnails=8)
+    for second in range(20):
+        builder.add_frame(jpeg_frame(0), float(second))
+
+    _, index = builder.build()
+    assert index["interval"] == 4
+    assert index["offsets"] == [0, 4, 8, 12, 16]
+
+def test_no_frames_means_no_preview():
+    assert PreviewBuilder().build() is None
+
+@pytest.fixture
+def client(api_client):
+    builder = PreviewBuilder(interval=5)
+    for i in range(100):
+        builder.add_frame(jpeg_frame(i), i / 10)
+    sprite, index = builder.build()
+    preview = {
+        "_id": "preview-1",
+        "session_id": "session-a",
+        "created_at": datetime(2024, 5, 1, 12, 0),
+        "sprite": sprite,
+        **index
+    }
+    storage = RecordingStorage(FakeDatabase(
+        recordings=owned_recordings("session-a"),
+        recording_previews=[preview]
+    ))
+    return api_client(session_routes, prefix="/api", recording_storage=storage)
+
+def test_preview_endpoints_are_cacheable(client):
+    index = client.get("/api/sessions/session-a/preview")
+    assert index.status_code == 200
+    assert index.json()["offsets"] == [0, 5]
+    assert index.json()["sprite_url"] == "/api/sessions/session-a/preview/sprite.jpg"
+    assert "max-age" in index.headers["cache-control"]
+
+    sprite = client.get(index.json()["sprite_url"])
+    assert sprite.status_code == 200
+    assert sprite.headers["content-type"] == "image/jpeg"
+
+    cached = client.get(index.json()["sprite_url"], headers={"If-None-Match": sprite.headers["etag"]})
+    assert cached.status_code == 304
+
+def test_recording_details_return_the_preview_index(client):
+    response = client.get("/api/sessions/session-a/recording")
+    assert response.status_code == 200
+    assert response.json()["preview"]["count"] == 2
+    assert response.json()["frame_count"] == 100
+
+def test_recording_details_not_found(client):
+    assert client.get("/api/sessions/someone-else/recording").status_code == 404
@@ -13,9 +13,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from app.services.recording_storage import RecordingStorage
 from app.db.models.analysis_models import AnalysisStorage
 from app.services.post_processor import PostProcessor
-from app.core.config import get_settings
-
-settings = get_settings()
+from app.db.database import create_database
 
 async def create_sample_frame():
     """Create a sample video frame with a face-like shape"""
@@ -46,12 +44,14 @@ async def create_sample_audio():
 
 async def main():
     """Test the recording and post-processing pipeline"""
+    database = create_database()
     try:
         print("Starting integration test...")
         
         # Initialize services
-        recording_storage = RecordingStorage(settings.MONGODB_URL, settings.DATABASE_NAME)
-        analysis_storage = AnalysisStorage(recording_storage.db)
+        await database.connect()
+        recording_storage = RecordingStorage(database.db)
+        analysis_storage = AnalysisStorage(database.db)
         post_processor = PostProcessor(recording_storage, analysis_storage)
         
         # Create a test session
@@ -121,6 +121,8 @@ async def main():
     except Exception as e:
         print(f"Test failed: {str(e)}")
         return False
+    finally:
+        database.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
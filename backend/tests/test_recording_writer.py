@@ -0,0 +1,99 @@
+import asyncio
+import sys
+import os
+import cv2
+import numpy as np
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.recording_writer import RecordingWriter
+
+class FakeRecordingStorage:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    async def store_frames(self, session_id, frames):
+        await asyncio.sleep(0.001)
+        if self.fail:
+            raise ConnectionError("storage down")
+        self.batches.append((session_id, list(frames)))
+
+def frame(size=10):
+    return np.zeros(size, dtype=np.uint8)
+
+def test_frames_are_written_in_batches():
+    """Batches close at the frame cap or the byte cap, in submission order"""
+    async def run():
+        storage = FakeRecordingStorage()
+        writer = RecordingWriter(storage, "session-a", batch_frames=4, batch_bytes=25, flush_interval=5)
+        writer.start()
+        for i in range(6):
+            writer.submit(frame(), timestamp=float(i))
+        await writer.flush()
+
+        sizes = [len(frames) for _, frames in storage.batches]
+        assert sizes == [3, 3]  # 30 bytes reaches the 25 byte cap
+        orders = [order for _, frames in storage.batches for _, _, order in frames]
+        assert orders == list(range(6))
+        assert writer.written_frames == 6
+        await writer.close()
+
+    asyncio.run(run())
+
+def test_flush_does_not_wait_for_the_interval():
+    """A partial batch is written as soon as a flush is requested"""
+    async def run():
+        storage = FakeRecordingStorage()
+        writer = RecordingWriter(storage, "session-a", batch_frames=100, flush_interval=60)
+        writer.start()
+        writer.submit(frame())
+        await asyncio.wait_for(writer.close(), timeout=1)
+        assert len(storage.batches) == 1
+
+    asyncio.run(run())
+
+def test_full_queue_drops_frames():
+    """Frames beyond the queue bound are counted and dropped, failures are counted"""
+    async def run():
+        storage = FakeRecordingStorage(fail=True)
+        writer = RecordingWriter(storage, "session-a", max_queue_frames=3, flush_interval=0)
+        writer.start()
+        accepted = [writer.submit(frame()) for _ in range(5)]
+        assert accepted == [True, True, True, False, False]
+        await writer.close()
+        assert writer.dropped_frames == 2
+        assert writer.failed_frames == 3
+
+    asyncio.run(run())
+
+def test_video_and_preview_are_stored_on_close():
+    """With video_fps and preview_interval set, the encoded file and sprite go to storage"""
+    class VideoStorage(FakeRecordingStorage):
+        async def store_session_video(self, session_id, path, content_type):
+            self.video = (session_id, os.path.getsize(path), content_type)
+
+        async def store_preview(self, session_id, sprite, index):
+            self.preview = (session_id, index["offsets"])
+
+    async def run():
+        storage = VideoStorage()
+        writer = RecordingWriter(
+            storage, "session-a", flush_interval=0, video_fps=10, preview_interval=0.2
+        )
+        writer.start()
+        image = np.full((120, 160, 3), 128, dtype=np.uint8)
+        jpeg = np.frombuffer(cv2.imencode(".jpg", image)[1].tobytes(), np.uint8)
+        for i in range(5):
+            writer.submit(jpeg, timestamp=i / 10)
+        await writer.close()
+
+        session_id, size, content_type = storage.video
+        assert session_id == "session-a" and size > 0
+        assert content_type == "video/webm"
+        assert writer.encoder.frames_written == 5
+        assert not os.path.exists(writer.encoder.path)
+        assert storage.preview == ("session-a", [0, 0.2, 0.4])
+
+    asyncio.run(run())
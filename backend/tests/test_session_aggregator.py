@@ -0,0 +1,64 @@
+import sys
+import os
+import random
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.session_aggregator import SessionAggregator, VideoAnalysisSummary
+
+def reference_summary(feedbacks):
+    """The original list-scanning computation"""
+    total = len(feedbacks)
+    if not total:
+        return VideoAnalysisSummary()
+    centered = sum(1 for m in feedbacks if m.get("attention_status") == "centered")
+    good_posture = sum(1 for m in feedbacks if m.get("attention_status") != "poor posture")
+    positive = sum(1 for m in feedbacks if m.get("sentiment") == "positive")
+    return VideoAnalysisSummary(
+        eye_contact_score=round(centered / total * 100, 1),
+        posture_score=round(good_posture / total * 100, 1),
+        sentiment_score=round(positive / total * 100, 1),
+        frame_count=total
+    )
+
+def random_feedbacks(count):
+    rng = random.Random(7)
+    return [
+        {
+            "attention_status": rng.choice(["centered", "looking away", "poor posture"]),
+            "sentiment": rng.choice(["positive", "neutral"])
+        }
+        for _ in range(count)
+    ]
+
+def test_matches_list_based_summary():
+    """Running counters give the same summary as scanning every frame"""
+    feedbacks = random_feedbacks(1000)
+    aggregator = SessionAggregator(window=50)
+    for count, feedback in enumerate(feedbacks, 1):
+        aggregator.add(feedback)
+        if count % 97 == 0:
+            assert aggregator.summary() == reference_summary(feedbacks[:count])
+
+    assert aggregator.summary() == reference_summary(feedbacks)
+
+def test_window_covers_recent_frames():
+    """The recent-window summary only counts the last `window` frames"""
+    feedbacks = random_feedbacks(333)
+    aggregator = SessionAggregator(window=40)
+    for feedback in feedbacks:
+        aggregator.add(feedback)
+
+    assert aggregator.window_summary() == reference_summary(feedbacks[-40:])
+    snapshot = aggregator.snapshot()
+    assert snapshot["session"]["frame_count"] == 333
+    assert snapshot["recent"]["frame_count"] == 40
+
+def test_empty_and_reset():
+    aggregator = SessionAggregator(window=10)
+    assert aggregator.summary() == VideoAnalysisSummary()
+    aggregator.add({"attention_status": "centered", "sentiment": "positive"})
+    aggregator.reset()
+    assert aggregator.summary() == VideoAnalysisSummary()
+    assert aggregator.window_summary() == VideoAnalysisSummary()
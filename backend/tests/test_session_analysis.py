@@ -0,0 +1,73 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.api.routes import session_routes
+from app.db.models.analysis_models import AnalysisStorage
+from app.services.recording_storage import RecordingStorage
+from tests.conftest import FakeDatabase, owned_recordings
+
+ANALYSES = [
+    {
+        "recording_id": "recording-1",
+        "session_id": "session-a",
+        "timestamp": datetime(2024, 5, 1, 12, minute),
+        "overall_metrics": {"overall_score": score},
+        "speech_analysis": {"words_per_minute": 120.0 + minute, "transcript": "long transcript"},
+        "status": "completed"
+    }
+    for minute, score in [(0, 50), (30, 80), (10, 60)]
+]
+
+@pytest.fixture
+def storage():
+    return AnalysisStorage(FakeDatabase(interview_analyses=ANALYSES))
+
+@pytest.fixture
+def client(api_client, storage):
+    recordings = RecordingStorage(FakeDatabase(recordings=owned_recordings("session-a", "session-b")))
+    return api_client(session_routes, recording_storage=recordings, analysis_storage=storage)
+
+def test_latest_analysis_is_one_sorted_read(storage):
+    latest = asyncio.run(storage.get_latest_analysis("session-a"))
+    assert latest.overall_metrics == {"overall_score": 80}
+    assert storage.collection.calls == [({"session_id": "session-a"}, None, [("timestamp", -1)])]
+    assert asyncio.run(storage.get_latest_analysis("session-b")) is None
+
+def test_latest_analysis_fields_are_projected(storage):
+    fields = asyncio.run(storage.get_latest_analysis_fields(
+        "session-a", ["overall_metrics", "speech_analysis.words_per_minute"]
+    ))
+    assert fields == {
+        "overall_metrics": {"overall_score": 80},
+        "speech_analysis": {"words_per_minute": 150.0},
+        "timestamp": datetime(2024, 5, 1, 12, 30)
+    }
+
+def test_overlapping_fields_are_merged(storage):
+    fields = asyncio.run(storage.get_latest_analysis_fields(
+        "session-a", ["speech_analysis.words_per_minute", "speech_analysis", "timestamp.year"]
+    ))
+    assert fields["speech_analysis"]["transcript"] == "long transcript"
+    assert fields["timestamp"] == datetime(2024, 5, 1, 12, 30)
+
+def test_analysis_endpoint_returns_latest(client):
+    body = client.get("/sessions/session-a/analysis").json()
+    assert body["analysis"]["overall_metrics"] == {"overall_score": 80}
+    assert body["analysis"]["speech_analysis"]["transcript"] == "long transcript"
+
+def test_analysis_endpoint_fields(client):
+    body = client.get("/sessions/session-a/analysis", params={"fields": "overall_metrics"}).json()
+    assert set(body["analysis"]) == {"overall_metrics", "timestamp"}
+    response = client.get("/sessions/session-a/analysis", params={"fields": "overall_metrics,password"})
+    assert response.status_code == 400
+    response = client.get(
+        "/sessions/session-a/analysis",
+        params={"fields": "speech_analysis,speech_analysis.words_per_minute"}
+    )
+    assert response.status_code == 200
+
+def test_analysis_endpoint_not_found(client):
+    assert client.get("/sessions/session-b/analysis").status_code == 404
+    assert client.get("/sessions/someone-else/analysis").status_code == 404
@@ -0,0 +1,131 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.api.routes import session_routes
+from app.services.recording_storage import RecordingStorage
+from app.utils.pagination import encode_cursor, decode_cursor, InvalidCursor
+from tests.conftest import FakeDatabase
+
+START = datetime(2024, 5, 1, 12, 0, 0)
+
+class HistoryStorage(RecordingStorage):
+    """The real aggregation over an in-memory database, counting calls"""
+
+    def __init__(self, db):
+        super().__init__(db)
+        self.calls = []
+
+    async def get_session_history(self, user_id, limit, before=None):
+        self.calls.append((user_id, limit, before))
+        return await super().get_session_history(user_id, limit, before)
+
+def make_database(count):
+    recordings, analyses = [], []
+    for i in range(count):
+        recordings.append({
+            "_id": ObjectId(),
+            "session_id": f"session-{i}",
+            "user_id": "user-1",
+            # Pairs share a start time so the _id tie-break matters
+            "start_time": START + timedelta(minutes=i // 2),
+            "status": "completed",
+            "preview_frames": ["large"]
+        })
+        if i % 3 == 0:
+            # An older and a newer analysis; only the newer one is joined
+            for minute, score in [(1, i - 100), (2, i)]:
+                analyses.append({
+                    "session_id": f"session-{i}",
+                    "timestamp": START + timedelta(hours=1, minutes=minute),
+                    "overall_metrics": {"score": score},
+                    "speech_analysis": {"transcript": "long transcript"}
+                })
+    recordings.append({
+        "_id": ObjectId(),
+        "session_id": "someone-elses",
+        "user_id": "user-2",
+        "start_time": START
+    })
+    return FakeDatabase(recordings=recordings, interview_analyses=analyses)
+
+@pytest.fixture
+def storage():
+    return HistoryStorage(make_database(7))
+
+@pytest.fixture
+def client(api_client, storage):
+    client = api_client(session_routes, recording_storage=storage)
+    client.storage = storage
+    return client
+
+def newest_first(storage):
+    sessions = [doc for doc in storage.recordings.docs if doc["user_id"] == "user-1"]
+    return sorted(sessions, key=lambda s: (s["start_time"], s["_id"]), reverse=True)
+
+def test_cursor_round_trip():
+    document_id = ObjectId()
+    assert decode_cursor(encode_cursor(START, document_id)) == (START, document_id)
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
+
+def test_history_pages_follow_the_cursor(client):
+    """Walking next_cursor visits every session once, newest first"""
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/sessions/history", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        seen.extend(session["session_id"] for session in body["sessions"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [session["session_id"] for session in newest_first(client.storage)]
+    # One storage call per page, each asking for one extra row
+    assert [call[1] for call in client.storage.calls] == [4, 4, 4]
+
+def test_history_includes_latest_analysis_summary(client):
+    sessions = client.get("/sessions/history", params={"limit": 10}).json()["sessions"]
+    by_id = {session["session_id"]: session for session in sessions}
+    assert by_id["session-3"]["has_analysis"]
+    assert by_id["session-3"]["analysis_summary"]["overall_metrics"] == {"score": 3}
+    assert not by_id["session-1"]["has_analysis"]
+    assert by_id["session-1"]["analysis_summary"] is None
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/sessions/history", params={"cursor": "garbage"}).status_code == 400
+
+def test_history_aggregation_returns_a_page_with_latest_analyses(storage):
+    """The user's sessions after the cursor, newest first, each joined to its newest analysis"""
+    expected = newest_first(storage)
+    before = (expected[1]["start_time"], expected[1]["_id"])
+    page = asyncio.run(storage.get_session_history("user-1", 3, before))
+
+    assert [row["_id"] for row in page] == [session["_id"] for session in expected[2:5]]
+    for row in page:
+        assert set(row) <= {"_id", "session_id", "start_time", "end_time", "duration", "status", "latest_analysis"}
+        number = int(row["session_id"].split("-")[1])
+        if number % 3 == 0:
+            assert row["latest_analysis"] == {
+                "overall_metrics": {"score": number},
+                "timestamp": START + timedelta(hours=1, minutes=2)
+            }
+        else:
+            assert row["latest_analysis"] is None
+
+def test_history_pipeline_limits_before_joining(storage):
+    """Filtering, ordering and the limit all run before the $lookup"""
+    document_id = ObjectId()
+    asyncio.run(storage.get_session_history("user-1", 4, (START, document_id)))
+
+    pipeline = storage.recordings.pipeline
+    stages = [next(iter(stage)) for stage in pipeline]
+    assert stages == ["$match", "$sort", "$limit", "$lookup", "$project"]
+    match = pipeline[0]["$match"]
+    assert match["user_id"] == "user-1"
+    assert {"start_time": START, "_id": {"$lt": document_id}} in match["$or"]
+    assert pipeline[2] == {"$limit": 4}
@@ -0,0 +1,209 @@
+import asyncio
+import numpy as np
+import pytest
+import sys
+import os
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.session_registry import SessionRegistry
+
+def test_sessions_are_isolated():
+    """Each session id gets its own processor and recorded frames"""
+    async def run():
+        registry = SessionRegistry(pool_size=2, max_recorded_frames=3)
+        await registry.start()
+        try:
+            first = registry.acquire("session-a")
+            second = registry.acquire("session-b")
+            assert first is not second
+            assert first.video_processor is not second.video_processor
+            assert registry.acquire("session-a") is first
+
+            for i in range(5):
+                first.recorded_frames.append(bytes([i]))
+            assert await first.get_recorded_frames() == [bytes([2]), bytes([3]), bytes([4])]
+            assert await second.get_recorded_frames() == []
+        finally:
+            await registry.stop()
+
+    asyncio.run(run())
+
+def test_release_returns_processor_to_pool():
+    """Released processors are reset and handed to the next session"""
+    async def run():
+        registry = SessionRegistry(pool_size=1)
+        await registry.start()
+        try:
+            manager = registry.acquire("session-a")
+            processor = manager.video_processor
+            processor.aggregator.add({"attention_status": "centered"})
+
+            await registry.release("session-a")
+            assert registry.get("session-a") is None
+
+            reused = registry.acquire("session-b")
+            assert reused.video_processor is processor
+            assert processor.aggregator.frame_count == 0
+        finally:
+            await registry.stop()
+
+    asyncio.run(run())
+
+def test_idle_sessions_are_reaped():
+    """Sessions with no activity past the idle timeout are released"""
+    async def run():
+        registry = SessionRegistry(pool_size=1, idle_timeout=0.05, reap_interval=0.02)
+        await registry.start()
+        try:
+            registry.acquire("abandoned")
+            await asyncio.sleep(0.2)
+            assert registry.get("abandoned") is None
+        finally:
+            await registry.stop()
+
+    asyncio.run(run())
+
+def test_sessions_use_requested_profile():
+    """Each session gets a processor for its profile; unknown profiles are rejected"""
+    async def run():
+        registry = SessionRegistry(pool_size=1, default_profile="balanced")
+        await registry.start()
+        try:
+            default = registry.acquire("session-a")
+            fast = registry.acquire("session-b", "fast")
+            assert default.video_processor.profile.name == "balanced"
+            assert fast.video_processor.profile.name == "fast"
+            assert fast.video_processor.face_mesh is not default.video_processor.face_mesh
+
+            with pytest.raises(ValueError):
+                registry.acquire("session-c", "ultra")
+
+            await registry.release("session-b")
+            assert registry.acquire("session-d", "fast").video_processor is fast.video_processor
+        finally:
+            await registry.stop()
+
+    asyncio.run(run())
+
+def test_recorded_frames_are_written_behind():
+    """With recording storage, frames are persisted and flushed on release"""
+    class FakeRecordingStorage:
+        def __init__(self):
+            self.frames = []
+
+        async def store_frames(self, session_id, frames):
+            self.frames.extend((session_id, order) for _, _, order in frames)
+
+    async def run():
+        storage = FakeRecordingStorage()
+        registry = SessionRegistry(pool_size=1, recording_storage=storage, recording_options={"flush_interval": 60})
+        await registry.start()
+        try:
+            manager = registry.acquire("session-a")
+            for i in range(3):
+                manager.record_frame(np.frombuffer(bytes([i]), np.uint8), timestamp_ms=i * 100)
+            assert await manager.get_recorded_frames() == []
+
+            await registry.release("session-a")
+            assert storage.frames == [("session-a", 0), ("session-a", 1), ("session-a", 2)]
+        finally:
+            await registry.stop()
+
+    asyncio.run(run())
+
+def test_attached_sessions_are_not_released():
+    """Reaping skips attached sessions and release() waits for the last detach"""
+    async def run():
+        registry = SessionRegistry(pool_size=1, idle_timeout=0.05, reap_interval=0.02)
+        await registry.start()
+        try:
+            manager = registry.attach("live")
+            processor = manager.video_processor
+            processor.aggregator.add({"attention_status": "centered"})
+            await asyncio.sleep(0.2)
+            assert registry.get("live") is manager
+
+            await registry.release("live")
+            assert registry.get("live") is manager
+            assert processor.aggregator.frame_count == 1
+
+            await registry.detach("live")
+            while registry.is_finalizing("live"):
+                await asyncio.sleep(0.01)
+            assert registry.get("live") is None
+            assert processor.aggregator.frame_count == 0
+        finally:
+            await registry.stop()
+
+    asyncio.run(run())
+
+def test_finalize_releases_in_the_background():
+    """finalize() returns at once; the recording is finished by a task"""
+    class SlowRecordingStorage:
+        def __init__(self):
+            self.frames = []
+
+        async def store_frames(self, session_id, frames):
+            await asyncio.sleep(0.05)
+            self.frames.extend(order for _, _, order in frames)
+
+    async def run():
+        storage = SlowRecordingStorage()
+        registry = SessionRegistry(pool_size=1, recording_storage=storage, recording_options={"flush_interval": 60})
+        await registry.start()
+        try:
+            manager = registry.acquire("session-a")
+            manager.record_frame(np.frombuffer(bytes([0]), np.uint8), timestamp_ms=0)
+
+            assert registry.finalize("session-a")
+            assert registry.is_finalizing("session-a")
+            assert storage.frames == []
+            assert not registry.finalize("unknown")
+
+            while registry.is_finalizing("session-a"):
+                await asyncio.sleep(0.01)
+            assert registry.get("session-a") is None
+            assert storage.frames == [0]
+        finally:
+            await registry.stop()
+
+    asyncio.run(run())
+
+def test_finalizing_lasts_until_a_deferred_close_finishes():
+    """finalize() while attached stays finalizing through detach and the writer close"""
+    class SlowRecordingStorage:
+        def __init__(self):
+            self.frames = []
+
+        async def store_frames(self, session_id, frames):
+            await asyncio.sleep(0.05)
+            self.frames.extend(order for _, _, order in frames)
+
+    async def run():
+        storage = SlowRecordingStorage()
+        registry = SessionRegistry(pool_size=1, recording_storage=storage, recording_options={"flush_interval": 60})
+        await registry.start()
+        try:
+            manager = registry.attach("session-a")
+            manager.record_frame(np.frombuffer(bytes([0]), np.uint8), timestamp_ms=0)
+            assert registry.finalize("session-a")
+            await asyncio.sleep(0.01)
+            assert registry.get("session-a") is manager
+            assert registry.is_finalizing("session-a")
+
+            # The handler's finally block doesn't wait for the close
+            await asyncio.wait_for(registry.detach("session-a"), 0.02)
+            await asyncio.sleep(0.01)
+            assert registry.get("session-a") is None
+            assert registry.is_finalizing("session-a")
+            assert storage.frames == []
+
+            while registry.is_finalizing("session-a"):
+                await asyncio.sleep(0.01)
+            assert storage.frames == [0]
+        finally:
+            await registry.stop()
+
+    asyncio.run(run())
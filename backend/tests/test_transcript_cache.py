@@ -0,0 +1,92 @@
+import asyncio
+import sys
+import os
+import time
+
+os.environ.setdefault("ASSEMBLY_AI_API_KEY", "test")
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+from app.services.speech_analyzer import SpeechAnalyzer
+from app.services.transcription_client import TranscriptionClient
+from app.services.transcript_cache import TranscriptCache
+
+WORDS = [
+    {"text": "so", "start": 0, "end": 250, "confidence": 0.91234567},
+    {"text": "scaling", "start": 250, "end": 900, "confidence": 0.8},
+]
+TRANSCRIPT = {"id": "job-0", "status": "completed", "text": "so scaling", "words": WORDS, "audio_duration": 12}
+
+def test_round_trip_keeps_only_what_scoring_needs(tmp_path):
+    async def run():
+        cache = TranscriptCache(str(tmp_path))
+        key = cache.cache_key("abc", {"disfluencies": True})
+        assert await cache.get(key) is None
+        await cache.put(key, TRANSCRIPT)
+        cached = await cache.get(key)
+        assert cached["text"] == "so scaling" and cached["audio_duration"] == 12
+        assert cached["words"][0] == {"text": "so", "start": 0, "end": 250, "confidence": 0.9123}
+        assert cache.stats()["hits"] == 1
+
+    asyncio.run(run())
+
+def test_key_depends_on_audio_and_options():
+    key = TranscriptCache.cache_key("abc", {"a": 1, "b": 2})
+    assert key == TranscriptCache.cache_key("abc", {"b": 2, "a": 1})
+    assert key != TranscriptCache.cache_key("abd", {"a": 1, "b": 2})
+    assert key != TranscriptCache.cache_key("abc", {"a": 1, "b": 3})
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    async def run():
+        words = [{"text": f"word{i}", "start": i, "end": i + 1, "confidence": 0.5} for i in range(200)]
+        transcript = {"text": " ".join(w["text"] for w in words), "words": words, "audio_duration": 60}
+        probe = TranscriptCache(str(tmp_path / "probe"))
+        await probe.put("probe", transcript)
+        entry_size = probe.stats()["bytes"]
+
+        cache = TranscriptCache(str(tmp_path / "cache"), max_bytes=int(entry_size * 3.5))
+        for i in range(3):
+            await cache.put(f"{i:02d}", transcript)
+            os.utime(cache._path(f"{i:02d}"), (time.time() - 100 + i, time.time() - 100 + i))
+        await cache.get("00")  # now the most recently used
+        await cache.put("03", transcript)
+
+        assert await cache.get("01") is None
+        for key in ("00", "02", "03"):
+            assert await cache.get(key) is not None
+        assert cache.stats()["bytes"] <= cache.max_bytes
+
+    asyncio.run(run())
+
+def test_reanalysis_is_scored_from_the_cache(tmp_path):
+    async def run():
+        requests = []
+
+        async def assemblyai(request):
+            requests.append(request.url.path)
+            if request.url.path == "/v2/upload":
+                return httpx.Response(200, json={"upload_url": "https://cdn/upload"})
+            if request.url.path == "/v2/transcript":
+                return httpx.Response(200, json={"id": "job-0"})
+            return httpx.Response(200, json=TRANSCRIPT)
+
+        client = TranscriptionClient("key", poll_interval=0, transport=httpx.MockTransport(assemblyai))
+        analyzer = SpeechAnalyzer(client, TranscriptCache(str(tmp_path / "cache")))
+        first, second = tmp_path / "first.wav", tmp_path / "second.wav"
+        first.write_bytes(b"same audio")
+        second.write_bytes(b"same audio")
+
+        fresh = await analyzer.analyze_speech(str(first))
+        calls = len(requests)
+        cached = await analyzer.analyze_speech(str(second))
+        await client.close()
+
+        assert len(requests) == calls == 3
+        assert cached.words == fresh.words == ["so", "scaling"]
+        assert cached.filler_word_count == fresh.filler_word_count == 1
+        assert abs(cached.confidence - fresh.confidence) < 1e-3
+
+    asyncio.run(run())
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import sys
+import os
+
+os.environ.setdefault("ASSEMBLY_AI_API_KEY", "test")
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+import pytest
+
+from app.services.transcription_client import TranscriptionClient, TranscriptionError
+from app.services.speech_analyzer import SpeechAnalyzer
+from app.services.transcript_cache import TranscriptCache
+
+WORDS = [
+    {"text": "um", "start": 0, "end": 300, "confidence": 0.9},
+    {"text": "I", "start": 300, "end": 400, "confidence": 0.95},
+    {"text": "designed", "start": 400, "end": 900, "confidence": 0.3},
+    {"text": "systems", "start": 900, "end": 1500, "confidence": 0.8},
+]
+
+class FakeAssemblyAI:
+    """AssemblyAI's upload / transcript endpoints; jobs complete after `polls` polls"""
+
+    def __init__(self, polls=2, status="completed", delay=0.0):
+        self.polls = polls
+        self.status = status
+        self.delay = delay
+        self.uploads = []
+        self.submitted = []
+        self.poll_counts = {}
+        self.active = 0
+        self.peak_active = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        assert request.headers["authorization"] == "key"
+        if request.url.path == "/v2/upload":
+            self.uploads.append(await request.aread())
+            return httpx.Response(200, json={"upload_url": f"https://cdn/upload-{len(self.uploads)}"})
+        if request.url.path == "/v2/transcript":
+            transcript_id = f"job-{len(self.submitted)}"
+            self.submitted.append(json.loads(request.content))
+            self.poll_counts[transcript_id] = 0
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            return httpx.Response(200, json={"id": transcript_id, "status": "queued"})
+
+        transcript_id = request.url.path.rsplit("/", 1)[1]
+        await asyncio.sleep(self.delay)
+        self.poll_counts[transcript_id] += 1
+        if self.poll_counts[transcript_id] < self.polls:
+            return httpx.Response(200, json={"id": transcript_id, "status": "processing"})
+        self.active -= 1
+        if self.status == "error":
+            return httpx.Response(200, json={"id": transcript_id, "status": "error", "error": "bad audio"})
+        return httpx.Response(200, json={
+            "id": transcript_id,
+            "status": "completed",
+            "text": "um I designed systems",
+            "words": WORDS,
+            "audio_duration": 30
+        })
+
+def make_client(api, **kwargs):
+    return TranscriptionClient("key", poll_interval=0, transport=httpx.MockTransport(api), **kwargs)
+
+@pytest.fixture
+def audio_path(tmp_path):
+    path = tmp_path / "audio.wav"
+    path.write_bytes(b"RIFF" + bytes(5000))
+    return str(path)
+
+def test_transcribe_uploads_submits_and_polls(audio_path):
+    async def run():
+        api = FakeAssemblyAI(polls=3)
+        client = make_client(api, upload_chunk_size=1024)
+        transcript = await client.transcribe(audio_path, {"disfluencies": True})
+        await client.close()
+
+        assert transcript["words"] == WORDS
+        assert api.uploads == [b"RIFF" + bytes(5000)]
+        assert api.submitted == [{"disfluencies": True, "audio_url": "https://cdn/upload-1"}]
+        assert api.poll_counts == {"job-0": 3}
+
+    asyncio.run(run())
+
+def test_concurrent_jobs_are_capped(audio_path):
+    async def run():
+        api = FakeAssemblyAI(polls=3, delay=0.01)
+        client = make_client(api, max_concurrency=2)
+        await asyncio.gather(*(client.transcribe(audio_path) for _ in range(5)))
+        await client.close()
+        assert len(api.submitted) == 5
+        assert api.peak_active == 2
+
+    asyncio.run(run())
+
+def test_failures_raise_transcription_errors(audio_path):
+    async def run():
+        client = make_client(FakeAssemblyAI(status="error"))
+        with pytest.raises(TranscriptionError, match="bad audio"):
+            await client.transcribe(audio_path)
+        await client.close()
+
+        client = make_client(FakeAssemblyAI(polls=1000), job_timeout=0.05)
+        with pytest.raises(TranscriptionError, match="longer than"):
+            await client.transcribe(audio_path)
+        await client.close()
+
+        async def unauthorized(request):
+            return httpx.Response(401, json={"error": "Invalid API key"})
+        client = make_client(unauthorized)
+        with pytest.raises(TranscriptionError, match="401"):
+            await client.transcribe(audio_path)
+        await client.close()
+
+    asyncio.run(run())
+
+def test_speech_analysis_scores_the_transcript(audio_path, tmp_path):
+    async def run():
+        api = FakeAssemblyAI()
+        analyzer = SpeechAnalyzer(make_client(api), TranscriptCache(str(tmp_path / "cache")))
+        metrics = await analyzer.analyze_speech(audio_path)
+        await analyzer.transcription_client.close()
+
+        assert api.submitted[0]["disfluencies"] is True
+        assert metrics.words == ["um", "I", "designed", "systems"]
+        assert metrics.words_per_minute == 8.0
+        assert metrics.filler_word_count == 1
+        assert [segment["word"] for segment in metrics.low_confidence_segments] == ["designed"]
+        assert metrics.raw_transcript == "um I designed systems"
+
+    asyncio.run(run())
+
+def test_realtime_chunks_are_uploaded_as_bytes(tmp_path):
+    async def run():
+        secret = tmp_path / "secret.txt"
+        secret.write_bytes(b"not audio")
+        api = FakeAssemblyAI(polls=1)
+        analyzer = SpeechAnalyzer(make_client(api), TranscriptCache(str(tmp_path / "cache")))
+
+        # A chunk that happens to spell a path is sent as-is, never opened
+        feedback = await analyzer.get_realtime_feedback(str(secret).encode())
+        with pytest.raises(TypeError):
+            await analyzer.transcription_client.transcribe(str(secret).encode())
+        await analyzer.transcription_client.close()
+
+        assert api.uploads == [str(secret).encode()]
+        assert feedback["is_filler_word"] is True
+
+    asyncio.run(run())
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import time
+
+import pytest
+
+from app.api.routes import analysis_routes
+from app.services.upload_spool import UploadSpool
+
+class FakeAnalyzer:
+    """Records what analyze_speech was given while the spooled file exists"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    async def analyze_speech(self, path, audio_digest=None):
+        with open(path, "rb") as audio_file:
+            self.calls.append((path, audio_file.read(), audio_digest, analysis_routes.upload_spool.stats()))
+        if self.fail:
+            raise RuntimeError("transcription failed")
+        return {"words_per_minute": 120.0}
+
+@pytest.fixture
+def client(api_client, tmp_path):
+    spool = UploadSpool(str(tmp_path / "spool"), max_upload_bytes=10_000, chunk_size=1024)
+    client = api_client(analysis_routes, upload_spool=spool, analyzer=FakeAnalyzer())
+    client.spool = spool
+    return client
+
+def upload(client, data):
+    return client.post("/analysis/speech", files={"audio": ("answer.wav", data, "audio/wav")})
+
+def test_upload_is_spooled_hashed_and_removed(client):
+    audio = os.urandom(5000)
+    response = upload(client, audio)
+    assert response.status_code == 200
+
+    (path, spooled, digest, stats), = analysis_routes.analyzer.calls
+    assert spooled == audio
+    assert digest == hashlib.sha256(audio).hexdigest()
+    assert stats["spooling_bytes"] == stats["directory_bytes"] == 5000 and stats["active"] == 1
+    assert not os.path.exists(path)
+    assert client.spool.stats()["spooling_bytes"] == 0
+
+def test_oversized_and_empty_uploads_are_rejected(client):
+    assert upload(client, bytes(10_001)).status_code == 413
+    assert upload(client, b"").status_code == 400
+    assert os.listdir(client.spool.directory) == []
+    assert client.spool.stats() == {"spooling_bytes": 0, "directory_bytes": 0, "active": 0, "rejected": 1}
+
+def test_spooled_file_is_removed_when_analysis_fails(client, monkeypatch):
+    monkeypatch.setattr(analysis_routes, "analyzer", FakeAnalyzer(fail=True))
+    assert upload(client, b"audio").status_code == 500
+    assert os.listdir(client.spool.directory) == []
+
+def test_stale_uploads_are_removed(tmp_path):
+    spool = UploadSpool(str(tmp_path), stale_after=60)
+    (tmp_path / "left-over.wav").write_bytes(b"x")
+    os.utime(tmp_path / "left-over.wav", (time.time() - 120, time.time() - 120))
+    # Another worker's upload in progress
+    (tmp_path / "in-flight.wav").write_bytes(b"x")
+    assert spool.stats()["directory_bytes"] == 2
+    assert spool.remove_stale() == 1
+    assert os.listdir(tmp_path) == ["in-flight.wav"]
+    # Another worker's files count towards the directory, not this process
+    assert spool.stats()["directory_bytes"] == 1 and spool.stats()["spooling_bytes"] == 0
@@ -8,12 +8,12 @@ import time
 # Add the project root directory to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.services.video_processor import VideoProcessor
+from app.services.video_processor import VideoProcessor, OUTPUT_ANNOTATED
 
 async def test_video_processing():
     """Test video processing with webcam or sample video"""
     print("\n=== Testing Video Processing ===")
-    processor = VideoProcessor()
+    processor = VideoProcessor(output_mode=OUTPUT_ANNOTATED)
     
     try:
         cap = cv2.VideoCapture(1)
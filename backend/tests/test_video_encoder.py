@@ -0,0 +1,48 @@
+import sys
+import os
+import cv2
+import numpy as np
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.video_encoder import SessionVideoEncoder
+
+def jpeg_frame(i):
+    """A 320x240 frame with a moving disc"""
+    frame = np.full((240, 320, 3), 90, dtype=np.uint8)
+    cv2.circle(frame, (40 + i * 4, 120), 30, (0, 0, 255), -1)
+    return cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+
+def count_frames(path):
+    capture = cv2.VideoCapture(path)
+    frames = 0
+    while capture.read()[0]:
+        frames += 1
+    capture.release()
+    return frames
+
+def test_frames_are_resampled_to_a_constant_rate():
+    """Gaps repeat the previous frame, bursts keep only the last frame per slot"""
+    encoder = SessionVideoEncoder(fps=10, codec="VP80")
+    # 0.0-1.9 s at 10 FPS, then a burst at 20 FPS and a 1 s gap
+    timestamps = [i / 10 for i in range(20)] + [2.0, 2.05, 2.1, 2.15, 3.2]
+    jpeg_total = 0
+    for i, timestamp in enumerate(timestamps):
+        jpeg = jpeg_frame(i)
+        jpeg_total += len(jpeg)
+        encoder.add_frame(jpeg, 1000.0 + timestamp)
+
+    path = encoder.finish()
+    try:
+        assert path.endswith(".webm")
+        assert encoder.frames_written == 33  # Slots 0-32 cover 0-3.2 s
+        assert count_frames(path) == 33
+        assert os.path.getsize(path) < jpeg_total
+    finally:
+        encoder.discard()
+    assert not os.path.exists(path)
+
+def test_no_frames_means_no_file():
+    encoder = SessionVideoEncoder()
+    assert encoder.finish() is None
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import pytest
+
+from app.api.routes import session_routes
+from app.services.recording_storage import RecordingStorage
+from app.utils.http_range import parse_range, RangeNotSatisfiable
+from tests.conftest import FakeDatabase, owned_recordings
+
+VIDEO = bytes(range(256)) * 40  # 10240 bytes
+
+class FakeGridOut:
+    """In-memory stand-in for an open GridFS file"""
+
+    def __init__(self, data):
+        self.data = data
+        self.length = len(data)
+        self._id = "65f000000000000000000001"
+        self.filename = "session-a.webm"
+        self.metadata = {"content_type": "video/webm"}
+        self.upload_date = datetime(2024, 5, 1, 12, 0, 0)
+        self.position = 0
+        self.reads = []
+
+    def seek(self, position):
+        self.position = position
+
+    async def read(self, size):
+        self.reads.append(size)
+        block = self.data[self.position:self.position + size]
+        self.position += len(block)
+        return block
+
+class VideoStorage(RecordingStorage):
+    """Real range reads over one in-memory video instead of GridFS"""
+
+    def __init__(self):
+        super().__init__(FakeDatabase(recordings=owned_recordings("session-a")))
+        self.video = FakeGridOut(VIDEO)
+
+    async def open_session_video(self, session_id):
+        self.video.position = 0
+        return self.video
+
+    async def iter_video_range(self, grid_out, start=0, end=None):
+        async for block in super().iter_video_range(grid_out, start, end, block_size=4096):
+            yield block
+
+@pytest.fixture
+def client(api_client):
+    storage = VideoStorage()
+    client = api_client(session_routes, recording_storage=storage)
+    client.storage = storage
+    return client
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=10-19", 100) == (10, 19)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range("bytes=100-", 100)
+
+def test_full_video_is_streamed_in_blocks(client):
+    response = client.get("/sessions/session-a/video")
+    assert response.status_code == 200
+    assert response.content == VIDEO
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-type"] == "video/webm"
+    assert max(client.storage.video.reads) == 4096
+
+def test_range_request_returns_partial_content(client):
+    response = client.get("/sessions/session-a/video", headers={"Range": "bytes=5000-5099"})
+    assert response.status_code == 206
+    assert response.content == VIDEO[5000:5100]
+    assert response.headers["content-range"] == f"bytes 5000-5099/{len(VIDEO)}"
+    assert response.headers["content-length"] == "100"
+
+def test_unsatisfiable_range(client):
+    response = client.get("/sessions/session-a/video", headers={"Range": "bytes=20000-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(VIDEO)}"
+
+def test_conditional_requests(client):
+    first = client.get("/sessions/session-a/video")
+    etag = first.headers["etag"]
+
+    assert client.get("/sessions/session-a/video", headers={"If-None-Match": etag}).status_code == 304
+    not_modified = client.get(
+        "/sessions/session-a/video",
+        headers={"If-Modified-Since": first.headers["last-modified"]}
+    )
+    assert not_modified.status_code == 304
+
+    # A stale If-Range validator gets the whole file instead of the range
+    stale = client.get("/sessions/session-a/video", headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+    assert stale.status_code == 200 and stale.content == VIDEO
@@ -4,6 +4,7 @@ import { Mic, Volume2, RotateCw } from 'lucide-react';
 import LoadingContext from '../contexts/LoadingContext';
 import './Camera.css';
 import { behavioralQuestions } from '../data/interviewQuestions';
+import { encodeMessage, MESSAGE_VIDEO } from '../utils/frameProtocol';
 
 const CameraPage = () => {
   const [isRecording, setIsRecording] = useState(false);
@@ -21,6 +22,7 @@ const CameraPage = () => {
   const [eyeContact, setEyeContact] = useState<boolean>(true);
 
   const wsRef = useRef<WebSocket | null>(null);  // Change ws state to ref
+  const frameSequenceRef = useRef(0);
 
   const videoRef = useRef<HTMLVideoElement>(null);
   const streamRef = useRef<MediaStream | null>(null);
@@ -93,6 +95,7 @@ const CameraPage = () => {
   // -- WebSocket setup --
   useEffect(() => {
     wsRef.current = new WebSocket('ws://localhost:8000/api/ws/video');
+    wsRef.current.binaryType = 'arraybuffer';
     
     wsRef.current.onopen = () => {
       console.log('WebSocket Connected');
@@ -264,13 +267,18 @@ const CameraPage = () => {
           canvas.height = vh;
           ctx?.drawImage(videoRef.current, 0, 0, vw, vh);
 
-          // Reduce quality a bit more to speed up
-          const frameData = canvas.toDataURL('image/jpeg', 0.4);
-
-          wsRef.current.send(JSON.stringify({ 
-            type: 'video', 
-            frame: frameData.split(',')[1],
-          }));
+          // Send raw JPEG bytes behind a small binary header instead of
+          // a base64 data URL inside JSON
+          const capturedAt = Date.now();
+          const sequence = frameSequenceRef.current++;
+          canvas.toBlob(async (blob) => {
+            if (!blob) return;
+            const jpeg = await blob.arrayBuffer();
+            const ws = wsRef.current;
+            if (ws?.readyState === WebSocket.OPEN) {
+              ws.send(encodeMessage(MESSAGE_VIDEO, sequence, capturedAt, jpeg));
+            }
+          }, 'image/jpeg', 0.4);  // Reduce quality a bit more to speed up
         }
       }
 
@@ -0,0 +1,26 @@
+// Binary WebSocket message format shared with backend/app/services/frame_protocol.py
+//
+// 16 byte little-endian header followed by the raw payload (JPEG for video):
+//   version (u8) | type (u8) | reserved (u16) | sequence (u32) | capture time in ms (f64)
+
+export const PROTOCOL_VERSION = 1;
+export const MESSAGE_VIDEO = 1;
+export const MESSAGE_AUDIO = 2;
+export const HEADER_SIZE = 16;
+
+export const encodeMessage = (
+  messageType: number,
+  sequence: number,
+  timestampMs: number,
+  payload: ArrayBuffer
+): ArrayBuffer => {
+  const message = new Uint8Array(HEADER_SIZE + payload.byteLength);
+  const header = new DataView(message.buffer);
+  header.setUint8(0, PROTOCOL_VERSION);
+  header.setUint8(1, messageType);
+  header.setUint16(2, 0, true);
+  header.setUint32(4, sequence >>> 0, true);
+  header.setFloat64(8, timestampMs, true);
+  message.set(new Uint8Array(payload), HEADER_SIZE);
+  return message.buffer;
+};